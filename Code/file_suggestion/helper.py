@@ -1,96 +1,12 @@
-# Add your utilities or helper functions to this file.
+# Kept so notebooks can `import helper`: the implementation lives in agentic_kgraph.helper.
+# Both names refer to the same module object, so state such as the driver is shared.
+import sys
+from pathlib import Path
 
-import os
-from dotenv import load_dotenv, find_dotenv
+_repo_root = str(Path(__file__).resolve().parents[2])
+if _repo_root not in sys.path:
+    sys.path.append(_repo_root)
 
-from google.genai import types # For creating message Content/Parts
-from google.adk.agents import Agent
-from google.adk.sessions import InMemorySessionService, Session
-from google.adk.runners import Runner
-from typing import Optional, Dict, Any
+import agentic_kgraph.helper
 
-# these expect to find a .env file at the directory above the lesson.                                                                                                                     # the format for that file is (without the comment)                                                                                                                                       #API_KEYNAME=AStringThatIsTheLongAPIKeyFromSomeService                                                                                                                                     
-def load_env():
-    _ = load_dotenv(find_dotenv())
-
-def get_openai_api_key():
-    load_env()
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    return openai_api_key
-
-
-def get_neo4j_import_dir():
-    """Gets the neo4j import directory from an environment variable
-    """
-    load_env()
-    neo4j_import_dir = os.getenv("NEO4J_IMPORT_DIR")
-    return neo4j_import_dir
-
-### ADK runner wrapper ###
-
-class AgentCaller:
-    """A simple wrapper class for interacting with an ADK agent."""
-    
-    def __init__(self, agent: Agent, runner: Runner, user_id: str, session_id: str):
-        """Initialize the AgentCaller with required components."""
-        self.agent = agent
-        self.runner = runner
-        self.user_id = user_id
-        self.session_id = session_id
-    
-    def get_session(self):
-        return self.runner.session_service.get_session(app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id)
-
-    async def call(self, query: str, verbose: bool = False):
-        """Call the agent with a query and return the response."""
-        print(f"\n>>> User Query: {query}")
-
-        # Prepare the user's message in ADK format
-        content = types.Content(role='user', parts=[types.Part(text=query)])
-
-        final_response_text = "Agent did not produce a final response." # Default
-
-        # Key Concept: run_async executes the agent logic and yields Events.
-        # We iterate through events to find the final answer.
-        async for event in self.runner.run_async(user_id=self.user_id, session_id=self.session_id, new_message=content):
-            # You can uncomment the line below to see *all* events during execution
-            if verbose:
-                print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
-
-            # Key Concept: is_final_response() marks the concluding message for the turn.
-            if event.is_final_response():
-                if event.content and event.content.parts:
-                    # Assuming text response in the first part
-                    final_response_text = event.content.parts[0].text
-                elif event.actions and event.actions.escalate: # Handle potential errors/escalations
-                    final_response_text = f"Agent escalated: {event.error_message or 'No specific message.'}"
-                if event.author == self.agent.name:
-                    break # Stop processing events once the final response is found
-
-        self.session = self.runner.session_service.get_session(app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id)
-
-        print(f"<<< Agent Response: {final_response_text}")
-        return final_response_text
-
-async def make_agent_caller(agent: Agent, initial_state: Optional[Dict[str, Any]] = {}) -> AgentCaller:
-    """Create and return an AgentCaller instance for the given agent."""
-    session_service = InMemorySessionService()
-    app_name = agent.name + "_app"
-    user_id = agent.name + "_user"
-    session_id = agent.name + "_session_01"
-    
-    # Initialize a session
-    await session_service.create_session(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        state=initial_state
-    )
-    
-    runner = Runner(
-        agent=agent,
-        app_name=app_name,
-        session_service=session_service
-    )
-    
-    return AgentCaller(agent, runner, user_id, session_id)
+sys.modules[__name__] = agentic_kgraph.helper
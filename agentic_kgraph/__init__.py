@@ -0,0 +1,24 @@
+# Shared code for the Agentic KGraph lessons.
+#
+# Every lesson imports these modules (directly, or through the `neo4j_for_adk`, `tools`
+# and `helper` aliases next to each notebook), so a process holds a single Neo4j driver,
+# connection pool and query cache no matter how many lessons' code it loads.
+#
+# Modules:
+#   neo4j_for_adk   - Neo4jForADK wrapper, the shared `graphdb` instance, query templates
+#   tools           - ADK tools for sampling files and constructing the domain graph
+#   helper          - environment helpers, AgentCaller, session services, concurrent runs
+#   admin_import    - compiles construction plans for offline neo4j-admin imports
+#   column_types    - column type inference, and coercion of imported property values
+#   delta_import    - incremental re-imports of construction plans using row fingerprints
+#   edge_list       - single-pass import of typed edge list files like relationships.csv
+#   entity_resolution - clusters and merges duplicate __Entity__ nodes before correlation
+#   graph_stats     - cached graph statistics from the count store and db.schema procedures
+#   local_vectors   - in-process NumPy vector store, an offline alternative to the Neo4j vector index
+#   parallel_import - deadlock-free relationship loading over concurrent sessions
+#   plan_validation - checks construction plans against their source files before importing
+#   retrieval       - vector index and graph-expanded top-k search over document chunks
+#   row_filters     - row predicates for relationship construction rules
+#   tracing         - AgentTracer for structured tracing of agent runs
+#   mock_llm        - ScriptedLlm, a deterministic offline model for running agents without network
+#   mongodb_for_adk - MongoDBForADK wrapper (requires pymongo)
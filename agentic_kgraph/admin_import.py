@@ -0,0 +1,259 @@
+# Offline bulk import of construction plans with `neo4j-admin database import full`.
+#
+# For first-time builds of large graphs, the construction plan which construct_domain_graph consumes
+# is compiled into neo4j-admin header and data files instead of being MERGEd row by row:
+#
+#   - node rules become `<unique column>:ID(<label>)` files, with the property types from the rule's
+#     "property_types" (see column_types), keeping the last row of each duplicated key like LOAD CSV does
+#   - relationship rules become `:START_ID(<label>)`/`:END_ID(<label>)` files, skipping rows failing the
+#     rule's row_filters, rows with empty or dangling endpoints, and earlier duplicates of the same
+#     relationship (MERGE would not create those, and the last row's properties win)
+#
+# Each label has to come from a single node rule: LOAD CSV merges the properties of several rules onto the
+# same nodes, which one `:ID` file per label can't reproduce. The importer creates no constraints or indexes,
+# so the statements creating those of the transactional build are returned, to run once the database is started.
+#
+# Rows are staged in a temporary SQLite file in the output directory, keyed by node id or (start, end),
+# so duplicates and dangling endpoints are resolved on disk and memory use doesn't grow with the graph.
+#
+# The offline importer writes a new database, so incremental updates should stay transactional
+# (construct_domain_graph, optionally in delta mode).
+
+import io
+import os
+import csv
+import shlex
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from .neo4j_for_adk import tool_success, tool_error, validate_identifier, render_query
+from .column_types import coerce_value
+from .row_filters import check_row_filters, row_passes_filters
+
+# column_types names to neo4j-admin header types
+ADMIN_IMPORT_TYPES = {
+    "integer": "long",
+    "float": "double",
+    "date": "date",
+    "datetime": "localdatetime",
+}
+
+RESOLVED_RELATIONSHIPS_QUERY = """
+    SELECT r.line FROM relationships r
+    WHERE r.rule = ?
+      AND EXISTS (SELECT 1 FROM nodes n WHERE n.label = ? AND n.key = r.start_key)
+      AND EXISTS (SELECT 1 FROM nodes n WHERE n.label = ? AND n.key = r.end_key)
+    ORDER BY r.rowid
+"""
+
+
+def _admin_value(value: str, column_type: str) -> str:
+    if column_type == "datetime" and value:
+        # neo4j-admin expects ISO 8601 with a T separator; anything unparseable is left to the importer to report
+        parsed = coerce_value(value, column_type)
+        return parsed.isoformat() if not isinstance(parsed, str) else value
+    return value
+
+def _property_header(column: str, property_types: Dict[str, str]) -> str:
+    admin_type = ADMIN_IMPORT_TYPES.get(property_types.get(column, ""))
+    return f"{column}:{admin_type}" if admin_type else column
+
+def _write_csv(path: Path, rows: List[List[str]]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+class _CsvLine:
+    """Encodes rows as CSV lines, noting whether any value spans lines."""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.multiline = False
+
+    def encode(self, values: List[str]) -> str:
+        self.multiline = self.multiline or any("\n" in value for value in values)
+        self.writer.writerow(values)
+        encoded = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return encoded
+
+def _open_staging(output_path: Path) -> Tuple[sqlite3.Connection, str]:
+    """A scratch SQLite database for the rows being compiled, removed by the caller."""
+    handle, staging_path = tempfile.mkstemp(prefix="admin_import_", suffix=".sqlite", dir=output_path)
+    os.close(handle)
+    connection = sqlite3.connect(staging_path)
+    # scratch data, so no journal or syncing
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("PRAGMA cache_size = -262144")  # 256 MiB
+    connection.execute("CREATE TABLE nodes (label TEXT NOT NULL, key TEXT NOT NULL, rule TEXT NOT NULL, line TEXT NOT NULL, PRIMARY KEY (label, key))")
+    connection.execute("CREATE TABLE relationships (rule TEXT NOT NULL, start_key TEXT NOT NULL, end_key TEXT NOT NULL, line TEXT NOT NULL, PRIMARY KEY (rule, start_key, end_key))")
+    return connection, staging_path
+
+def _check_endpoints(construction_plan: Dict[str, Any]) -> List[str]:
+    """Each label comes from one node rule, and relationship endpoints have to be its node ids (its unique column)."""
+    node_rules: Dict[str, List[str]] = {}
+    node_keys: Dict[str, Set[str]] = {}
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] == "node":
+            node_rules.setdefault(construction["label"], []).append(name)
+            node_keys.setdefault(construction["label"], set()).add(construction["unique_column_name"])
+    problems = [f"{label} nodes come from more than one node rule ({', '.join(names)}), merge them into one rule"
+                for label, names in node_rules.items() if len(names) > 1]
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] != "relationship":
+            continue
+        for side in ("from", "to"):
+            label, column = construction[f"{side}_node_label"], construction[f"{side}_node_column"]
+            if label not in node_keys:
+                problems.append(f"{name}: no node rule creates {label} nodes")
+            elif column not in node_keys[label]:
+                problems.append(f"{name}: {side} column {column} is not the unique column of {label} ({', '.join(sorted(node_keys[label]))})")
+    return problems
+
+def compile_admin_import(construction_plan: Dict[str, Any], import_dir: str, output_dir: str,
+                         database: str = "neo4j") -> Dict[str, Any]:
+    """Write neo4j-admin import files for a construction plan, and the command which imports them.
+
+    Args:
+        construction_plan: Construction rules keyed by name, as for construct_domain_graph.
+        import_dir: Directory the rules' source files are relative to.
+        output_dir: Directory for the header and data files.
+        database: Name of the database to create.
+
+    Returns:
+        Success with 'command' (argument list), 'command_line', 'files', per-rule 'counts', and the
+        'post_import_statements' creating the constraints and range indexes once the database is started,
+        or an error.
+    """
+    problems = _check_endpoints(construction_plan)
+    for construction in construction_plan.values():
+        # the constraint and range index statements splice in the keys as well
+        identifiers = [construction.get("label"), construction.get("from_node_label"), construction.get("to_node_label"),
+                       construction.get("relationship_type"), construction.get("unique_column_name")] + list(construction.get("range_indexes") or [])
+        try:
+            for identifier in filter(None, identifiers):
+                validate_identifier(identifier)
+        except ValueError as e:
+            problems.append(str(e))
+        problems += check_row_filters(construction.get("row_filters"))
+    if problems:
+        return tool_error("Construction plan can't be compiled for neo4j-admin import: " + "; ".join(problems))
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    counts: Dict[str, Dict[str, int]] = {}
+    files: Dict[str, List[str]] = {"nodes": [], "relationships": []}
+    arguments: List[str] = []
+    line = _CsvLine()
+
+    staging, staging_path = _open_staging(output_path)
+    try:
+        # nodes first: a later row with the same key replaces an earlier one
+        for name, construction in construction_plan.items():
+            if construction["construction_type"] != "node":
+                continue
+            label, key = construction["label"], construction["unique_column_name"]
+            property_types = construction.get("property_types") or {}
+            properties = [column for column in construction["properties"] if column != key]
+            rule_counts = {"rows": 0, "written": 0, "empty_keys": 0, "duplicates": 0}
+            with open(Path(import_dir) / construction["source_file"], newline="", encoding="utf-8") as source:
+                def node_rows():
+                    for row in csv.DictReader(source):
+                        rule_counts["rows"] += 1
+                        key_value = row.get(key)
+                        if not key_value:
+                            rule_counts["empty_keys"] += 1
+                            continue
+                        values = [key_value] + [_admin_value(row.get(column) or "", property_types.get(column, "")) for column in properties]
+                        yield label, key_value, name, line.encode(values)
+                staging.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?)", node_rows())
+            counts[name] = rule_counts
+
+        for name, construction in construction_plan.items():
+            if construction["construction_type"] != "node":
+                continue
+            label, key = construction["label"], construction["unique_column_name"]
+            property_types = construction.get("property_types") or {}
+            properties = [column for column in construction["properties"] if column != key]
+            header_file, data_file = output_path / f"{name}.nodes.header.csv", output_path / f"{name}.nodes.csv"
+            _write_csv(header_file, [[f"{key}:ID({label})"] + [_property_header(column, property_types) for column in properties]])
+            rule_counts = counts[name]
+            with open(data_file, "w", newline="", encoding="utf-8") as target:
+                for (staged_line,) in staging.execute("SELECT line FROM nodes WHERE rule = ? ORDER BY rowid", (name,)):
+                    target.write(staged_line)
+                    rule_counts["written"] += 1
+            rule_counts["duplicates"] = rule_counts["rows"] - rule_counts["empty_keys"] - rule_counts["written"]
+            files["nodes"] += [str(header_file), str(data_file)]
+            arguments.append(f"--nodes={label}={header_file},{data_file}")
+
+        for name, construction in construction_plan.items():
+            if construction["construction_type"] != "relationship":
+                continue
+            from_label, to_label = construction["from_node_label"], construction["to_node_label"]
+            from_column, to_column = construction["from_node_column"], construction["to_node_column"]
+            property_types = construction.get("property_types") or {}
+            properties = [column for column in construction["properties"] if column not in (from_column, to_column)]
+            header_file, data_file = output_path / f"{name}.relationships.header.csv", output_path / f"{name}.relationships.csv"
+            _write_csv(header_file, [[f":START_ID({from_label})", f":END_ID({to_label})"] + [_property_header(column, property_types) for column in properties]])
+            row_filters = construction.get("row_filters")
+            rule_counts = {"rows": 0, "written": 0, "filtered": 0, "empty_endpoints": 0, "dangling": 0, "duplicates": 0}
+            with open(Path(import_dir) / construction["source_file"], newline="", encoding="utf-8") as source:
+                def relationship_rows():
+                    for row in csv.DictReader(source):
+                        rule_counts["rows"] += 1
+                        if not row_passes_filters(row, row_filters):
+                            rule_counts["filtered"] += 1
+                            continue
+                        start, end = row.get(from_column), row.get(to_column)
+                        if not start or not end:
+                            rule_counts["empty_endpoints"] += 1
+                            continue
+                        values = [start, end] + [_admin_value(row.get(column) or "", property_types.get(column, "")) for column in properties]
+                        yield name, start, end, line.encode(values)
+                staging.executemany("INSERT OR REPLACE INTO relationships VALUES (?, ?, ?, ?)", relationship_rows())
+
+            # endpoints are checked against the staged node keys by index lookups, not in memory
+            distinct = staging.execute("SELECT count(*) FROM relationships WHERE rule = ?", (name,)).fetchone()[0]
+            with open(data_file, "w", newline="", encoding="utf-8") as target:
+                for (staged_line,) in staging.execute(RESOLVED_RELATIONSHIPS_QUERY, (name, from_label, to_label)):
+                    target.write(staged_line)
+                    rule_counts["written"] += 1
+            rule_counts["duplicates"] = rule_counts["rows"] - rule_counts["filtered"] - rule_counts["empty_endpoints"] - distinct
+            rule_counts["dangling"] = distinct - rule_counts["written"]
+            counts[name] = rule_counts
+            files["relationships"] += [str(header_file), str(data_file)]
+            arguments.append(f"--relationships={construction['relationship_type']}={header_file},{data_file}")
+    except (OSError, KeyError, csv.Error, sqlite3.Error) as e:
+        return tool_error(f"Could not compile the construction plan: {e}")
+    finally:
+        staging.close()
+        os.remove(staging_path)
+
+    command = [
+        "neo4j-admin", "database", "import", "full",
+        "--overwrite-destination=true",
+        "--ignore-empty-strings=true",  # like LOAD CSV, empty fields don't become properties
+    ]
+    if line.multiline:
+        command.append("--multiline-fields=true")
+    command += arguments + [database]
+
+    # the same constraints and range indexes as import_nodes creates
+    statements: List[str] = []
+    for construction in construction_plan.values():
+        if construction["construction_type"] == "node":
+            label = construction["label"]
+            statements.append(render_query("create_uniqueness_constraint", label=label, key=construction["unique_column_name"]))
+            statements += [render_query("create_range_index", label=label, key=key) for key in construction.get("range_indexes") or []]
+
+    return tool_success("admin_import", {
+        "command": command,
+        "command_line": shlex.join(command),
+        "files": files,
+        "counts": counts,
+        "post_import_statements": statements,
+    })
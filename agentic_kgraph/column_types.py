@@ -0,0 +1,134 @@
+# Column type inference and coercion for CSV imports.
+#
+# LOAD CSV reads every field as a string. A profiling pass infers a type per column
+# (integer, float, date or datetime, otherwise string), which construction rules carry
+# as "property_types", so the loaders store native values that range indexes and
+# aggregations can use directly.
+
+import re
+import csv
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+PROPERTY_TYPES = ("integer", "float", "date", "datetime", "string")
+
+INTEGER_PATTERN = re.compile(r"^[+-]?(0|[1-9][0-9]*)$")  # leading zeros are identifiers, not numbers
+FLOAT_PATTERN = re.compile(r"^[+-]?(((0|[1-9][0-9]*)(\.[0-9]*)?)|(\.[0-9]+))([eE][+-]?[0-9]+)?$")  # likewise
+DATE_PATTERN = re.compile(r"^[0-9]{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])$")
+DATETIME_PATTERN = re.compile(r"^[0-9]{4}-(0[1-9]|1[0-2])-(0[1-9]|[12][0-9]|3[01])[T ]([01][0-9]|2[0-3]):[0-5][0-9](:[0-5][0-9](\.[0-9]+)?)?$")
+
+def _cypher_pattern(pattern: re.Pattern) -> str:
+    # =~ matches the whole string, and backslashes are escaped in Cypher string literals
+    return pattern.pattern.strip("^$").replace("\\", "\\\\")
+
+# Cypher expression converting row[k] to the type in $property_types[k].
+# Values which don't convert keep their string value, rather than being dropped or failing the import,
+# like coerce_value. Dates are only converted when they match the patterns above.
+COERCE_PROPERTY_CYPHER = """CASE $property_types[k]
+            WHEN 'integer' THEN coalesce(toInteger(row[k]), row[k])
+            WHEN 'float' THEN coalesce(toFloat(row[k]), row[k])
+            WHEN 'date' THEN CASE WHEN row[k] =~ '""" + _cypher_pattern(DATE_PATTERN) + """' THEN date(row[k]) ELSE row[k] END
+            WHEN 'datetime' THEN CASE WHEN row[k] =~ '""" + _cypher_pattern(DATETIME_PATTERN) + """'
+                THEN localdatetime(replace(row[k], ' ', 'T')) ELSE row[k] END
+            ELSE row[k] END"""
+
+
+def _matches(value: str, column_type: str) -> bool:
+    if column_type == "integer":
+        return bool(INTEGER_PATTERN.match(value))
+    if column_type == "float":
+        return bool(FLOAT_PATTERN.match(value))
+    try:
+        if column_type == "date":
+            return bool(DATE_PATTERN.match(value)) and date.fromisoformat(value) is not None
+        if column_type == "datetime":
+            return bool(DATETIME_PATTERN.match(value)) and datetime.fromisoformat(value) is not None
+    except ValueError:
+        return False
+    return True
+
+def infer_column_type(values: Iterable[str]) -> str:
+    """The narrowest type all the non-empty values have: integer, float, date, datetime or string."""
+    candidates = ["integer", "float", "date", "datetime"]
+    seen = False
+    for value in values:
+        if not value:
+            continue
+        seen = True
+        candidates = [column_type for column_type in candidates if _matches(value, column_type)]
+        if not candidates:
+            return "string"
+    return candidates[0] if seen else "string"
+
+def profile_csv_types(file_path: str, columns: Optional[List[str]] = None,
+                      sample_rows: Optional[int] = None) -> Dict[str, str]:
+    """Infer the type of each column of a CSV file, in one pass.
+
+    Args:
+        file_path: CSV file with a header row.
+        columns: Columns to profile. Defaults to every column.
+        sample_rows: Only look at this many rows. Defaults to the whole file,
+            since one unexpected value makes a column a string.
+
+    Returns:
+        Column name to type.
+    """
+    with open(file_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = columns or list(reader.fieldnames or [])
+        candidates = {column: ["integer", "float", "date", "datetime"] for column in columns}
+        seen = set()
+        for row_number, row in enumerate(reader):
+            if sample_rows is not None and row_number >= sample_rows:
+                break
+            for column in columns:
+                remaining = candidates[column]
+                value = row.get(column)
+                if not remaining or not value:
+                    continue
+                seen.add(column)
+                candidates[column] = [column_type for column_type in remaining if _matches(value, column_type)]
+    return {
+        column: candidates[column][0] if column in seen and candidates[column] else "string"
+        for column in columns
+    }
+
+def infer_property_types(construction: Dict[str, Any], import_dir: str,
+                         sample_rows: Optional[int] = None) -> Dict[str, str]:
+    """Types of a construction rule's properties, leaving out strings.
+
+    Key columns are never typed, since nodes are matched on them as strings.
+    """
+    key_columns = {
+        construction.get("unique_column_name"),
+        construction.get("from_node_column"),
+        construction.get("to_node_column"),
+    }
+    columns = [column for column in construction["properties"] if column not in key_columns]
+    if not columns:
+        return {}
+    types = profile_csv_types(str(Path(import_dir) / construction["source_file"]), columns, sample_rows)
+    return {column: column_type for column, column_type in types.items() if column_type != "string"}
+
+def coerce_value(value: Optional[str], column_type: Optional[str]) -> Any:
+    """Convert a CSV field the same way the Cypher loaders do. Values which don't convert stay strings."""
+    if value is None or value == "" or not column_type or column_type == "string":
+        return value if value != "" else None
+    try:
+        if column_type == "integer":
+            return int(value)
+        if column_type == "float":
+            return float(value)
+        if column_type == "date":
+            return date.fromisoformat(value) if DATE_PATTERN.match(value) else value
+        if column_type == "datetime":
+            return datetime.fromisoformat(value) if DATETIME_PATTERN.match(value) else value
+    except ValueError:
+        return value
+    return value
+
+def coerce_properties(properties: Dict[str, Optional[str]], property_types: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    if not property_types:
+        return properties
+    return {key: coerce_value(value, property_types.get(key)) for key, value in properties.items()}
@@ -0,0 +1,326 @@
+# Incremental (delta) import of construction plans.
+#
+# A fingerprint (hash of the key and property values) of every imported row is kept per construction
+# rule in a local SQLite file. Each run streams the source files, diffs them against the stored
+# fingerprints, and only sends the inserted/updated rows (batched UNWIND ... MERGE ... SET) and the
+# deleted rows (DETACH DELETE for nodes, DELETE for relationships) to Neo4j.
+# Fingerprints are only saved once a rule's writes have succeeded, so a failed rule is retried in full,
+# and only for relationship rows which merged, so rows whose endpoints are missing are sent again next time.
+# Inserting or deleting nodes (DETACH DELETE removes their relationships) forgets the fingerprints of the
+# relationship rows attached to them, so those are re-sent too and delta mode keeps matching full mode.
+#
+# The fingerprint store describes what this client wrote to the graph, so it has to be reset whenever
+# the graph is modified some other way (clear_neo4j_data does this).
+
+import os
+import csv
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .neo4j_for_adk import graphdb, tool_success, tool_error, render_query, WRITE_ACCESS
+from .helper import load_env
+from .column_types import coerce_properties
+from .row_filters import check_row_filters, row_passes_filters
+
+DEFAULT_STATE_PATH = "delta_import_state.db"
+DEFAULT_BATCH_SIZE = 10000
+
+def get_state_path() -> str:
+    """The fingerprint store file: DELTA_STATE_DB, or delta_import_state.db in the working directory."""
+    load_env()
+    return os.getenv("DELTA_STATE_DB") or DEFAULT_STATE_PATH
+
+def _batches(items: Iterator[Any], batch_size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class FingerprintStore:
+    """Row fingerprints per construction rule, kept in a SQLite file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_state_path()
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints (rule TEXT NOT NULL, key TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (rule, key))"
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def clear(self, rule: Optional[str] = None):
+        """Forget the fingerprints of one rule, or of every rule."""
+        if rule is None:
+            self.connection.execute("DELETE FROM fingerprints")
+        else:
+            self.connection.execute("DELETE FROM fingerprints WHERE rule = ?", (rule,))
+        self.connection.commit()
+
+    def forget(self, rule: str, keys: Iterable[str]):
+        """Forget the fingerprints of some of a rule's keys, so those rows are sent again."""
+        self.connection.executemany("DELETE FROM fingerprints WHERE rule = ? AND key = ?", ((rule, key) for key in keys))
+        self.connection.commit()
+
+    def forget_endpoints(self, rule: str, position: int, endpoint_keys: Iterable[str]):
+        """Forget a relationship rule's rows whose endpoint at position (0 from, 1 to) is one of endpoint_keys."""
+        self.connection.execute("DROP TABLE IF EXISTS temp.endpoint_keys")
+        self.connection.execute("CREATE TEMP TABLE endpoint_keys (key TEXT PRIMARY KEY)")
+        self.connection.executemany("INSERT OR IGNORE INTO endpoint_keys VALUES (?)", ((key,) for key in endpoint_keys))
+        self.connection.execute(f"""
+            DELETE FROM fingerprints
+            WHERE rule = ? AND json_extract(key, '$[{int(position)}]') IN (SELECT key FROM temp.endpoint_keys)
+        """, (rule,))
+        self.connection.execute("DROP TABLE temp.endpoint_keys")
+        self.connection.commit()
+
+    def count(self, rule: str) -> int:
+        return self.connection.execute("SELECT count(*) FROM fingerprints WHERE rule = ?", (rule,)).fetchone()[0]
+
+    def stage(self, rows: Iterator[Tuple[str, str, str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Load the current (key, hash, row) triples into a temporary table, the last row winning for a key."""
+        self.connection.execute("DROP TABLE IF EXISTS temp.current_rows")
+        self.connection.execute("CREATE TEMP TABLE current_rows (key TEXT PRIMARY KEY, hash TEXT NOT NULL, row TEXT NOT NULL)")
+        for batch in _batches(rows, batch_size):
+            self.connection.executemany("INSERT OR REPLACE INTO current_rows VALUES (?, ?, ?)", batch)
+
+    def changed_rows(self, rule: str) -> Iterator[Tuple[str, bool]]:
+        """Staged rows which are new or changed since the last import, as (row, is_new)."""
+        return self.connection.execute("""
+            SELECT c.row, f.hash IS NULL FROM current_rows c
+            LEFT JOIN fingerprints f ON f.rule = ? AND f.key = c.key
+            WHERE f.hash IS NULL OR f.hash != c.hash
+        """, (rule,))
+
+    def deleted_keys(self, rule: str) -> Iterator[Tuple[str]]:
+        """Keys imported previously which are no longer staged."""
+        return self.connection.execute("""
+            SELECT f.key FROM fingerprints f
+            WHERE f.rule = ? AND NOT EXISTS (SELECT 1 FROM current_rows c WHERE c.key = f.key)
+        """, (rule,))
+
+    def unchanged_count(self, rule: str) -> int:
+        return self.connection.execute("""
+            SELECT count(*) FROM current_rows c JOIN fingerprints f ON f.rule = ? AND f.key = c.key AND f.hash = c.hash
+        """, (rule,)).fetchone()[0]
+
+    def commit_staged(self, rule: str):
+        """Make the staged fingerprints the rule's fingerprints."""
+        self.connection.execute("""
+            DELETE FROM fingerprints
+            WHERE rule = ? AND NOT EXISTS (SELECT 1 FROM current_rows c WHERE c.key = fingerprints.key)
+        """, (rule,))
+        self.connection.execute("""
+            INSERT OR REPLACE INTO fingerprints (rule, key, hash)
+            SELECT ?, c.key, c.hash FROM current_rows c
+            LEFT JOIN fingerprints f ON f.rule = ? AND f.key = c.key
+            WHERE f.hash IS NULL OR f.hash != c.hash
+        """, (rule, rule))
+        self.connection.execute("DROP TABLE IF EXISTS temp.current_rows")
+        self.connection.commit()
+
+def reset_fingerprints(path: Optional[str] = None):
+    """Forget every fingerprint, so the next delta import sends every row. Does nothing if there is no store."""
+    path = path or get_state_path()
+    if Path(path).exists():
+        store = FingerprintStore(path)
+        store.clear()
+        store.close()
+
+
+### Reading rows ###
+
+def _value(row: Dict[str, str], column: str) -> Optional[str]:
+    # like LOAD CSV, empty fields are null, and setting a property to null removes it
+    value = row.get(column)
+    return value if value else None
+
+def rule_row_fingerprints(construction: Dict[str, Any], import_dir: str) -> Iterator[Tuple[str, str, str]]:
+    """Stream a rule's source file as (key, hash, row) triples.
+
+    The key identifies the node (unique column) or relationship (both endpoint columns),
+    and the hash covers the rule definition too, so editing a rule re-sends all of its rows.
+    """
+    definition_hash = hashlib.blake2b(json.dumps(construction, sort_keys=True).encode(), digest_size=8).hexdigest()
+    is_node = construction["construction_type"] == "node"
+    with open(Path(import_dir) / construction["source_file"], newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if is_node:
+                key_values = [_value(row, construction["unique_column_name"])]
+            else:
+                if not row_passes_filters(row, construction.get("row_filters")):
+                    continue
+                key_values = [_value(row, construction["from_node_column"]), _value(row, construction["to_node_column"])]
+            if any(value is None for value in key_values):
+                continue  # MERGE/MATCH on a null key never imports anything
+            properties = {column: _value(row, column) for column in construction["properties"]}
+            key = json.dumps(key_values)
+            payload = json.dumps([key_values, properties])
+            row_hash = hashlib.blake2b((definition_hash + payload).encode(), digest_size=16).hexdigest()
+            yield key, row_hash, payload
+
+
+### Writing changes ###
+
+def _send_batches(query: str, parameters: Dict[str, Any], name: str, items: Iterator[Any], batch_size: int) -> List[Dict[str, Any]]:
+    """Send items in batches, returning the result records of every batch."""
+    records = []
+    for batch in _batches(items, batch_size):
+        result = graphdb.send_query(query, {**parameters, name: batch}, access_mode=WRITE_ACCESS)
+        if result["status"] == "error":
+            raise RuntimeError(result["error_message"])
+        records += result["query_result"]
+    return records
+
+def import_rule_delta(store: FingerprintStore, rule_name: str, construction: Dict[str, Any],
+                      import_dir: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                      touched_keys: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Send the changes to one construction rule's source file since its last delta import.
+
+    Args:
+        touched_keys: For node rules, collects the keys of the nodes inserted or deleted.
+
+    Returns:
+        Success with counts of inserted, updated, deleted and unchanged rows, or an error.
+        Relationship rules also count the 'unmatched' rows, whose endpoints don't exist.
+    """
+    problems = check_row_filters(construction.get("row_filters"))
+    if problems:
+        return tool_error(f"{rule_name}: " + "; ".join(problems))
+
+    try:
+        store.stage(rule_row_fingerprints(construction, import_dir), batch_size)
+    except (OSError, KeyError, csv.Error) as e:
+        return tool_error(f"Could not read {construction['source_file']}: {e}")
+
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": store.unchanged_count(rule_name)}
+
+    def changes():
+        for payload, is_new in store.changed_rows(rule_name):
+            counts["inserted" if is_new else "updated"] += 1
+            key_values, properties = json.loads(payload)
+            properties = coerce_properties(properties, construction.get("property_types"))
+            if construction["construction_type"] == "node":
+                if is_new and touched_keys is not None:
+                    touched_keys.add(key_values[0])
+                yield {"key": key_values[0], "properties": properties}
+            else:
+                yield {"from_key": key_values[0], "to_key": key_values[1], "properties": properties}
+
+    def deletions():
+        for (key,) in store.deleted_keys(rule_name):
+            counts["deleted"] += 1
+            key_values = json.loads(key)
+            if construction["construction_type"] == "node":
+                if touched_keys is not None:
+                    touched_keys.add(key_values[0])
+                yield key_values[0]
+            else:
+                yield {"from_key": key_values[0], "to_key": key_values[1]}
+
+    try:
+        if construction["construction_type"] == "node":
+            identifiers = {"unique_column_name": construction["unique_column_name"]}
+            parameters = {"label": construction["label"]}
+            # the uniqueness constraint also provides the index the MERGE looks nodes up with
+            constraint_query = render_query("create_uniqueness_constraint", label=construction["label"], key=construction["unique_column_name"])
+            constraint_result = graphdb.send_query(constraint_query)
+            if constraint_result["status"] == "error":
+                return constraint_result
+            _send_batches(render_query("upsert_nodes", **identifiers), parameters, "rows", changes(), batch_size)
+            _send_batches(render_query("delete_nodes", **identifiers), parameters, "keys", deletions(), batch_size)
+        else:
+            identifiers = {
+                "from_node_column": construction["from_node_column"],
+                "to_node_column": construction["to_node_column"],
+            }
+            parameters = {
+                "from_node_label": construction["from_node_label"],
+                "to_node_label": construction["to_node_label"],
+                "relationship_type": construction["relationship_type"],
+            }
+            sent_keys = []
+
+            def sent_changes():
+                for row in changes():
+                    sent_keys.append(json.dumps([row["from_key"], row["to_key"]]))
+                    yield row
+
+            records = _send_batches(render_query("upsert_relationships", **identifiers), parameters, "rows", sent_changes(), batch_size)
+            merged_keys = {json.dumps(key) for record in records for key in record["merged_keys"]}
+            unmatched_keys = [key for key in sent_keys if key not in merged_keys]
+            counts["unmatched"] = len(unmatched_keys)
+            _send_batches(render_query("delete_relationships", **identifiers), parameters, "rows", deletions(), batch_size)
+    except (ValueError, RuntimeError) as e:
+        return tool_error(f"Delta import of {rule_name} failed, it will be retried in full: {e}")
+
+    store.commit_staged(rule_name)
+    if construction["construction_type"] == "relationship":
+        # no relationship was merged for these rows, send them again once their endpoints exist
+        store.forget(rule_name, unmatched_keys)
+    return tool_success("delta", counts)
+
+def forget_touched_relationships(store: FingerprintStore, construction_plan: Dict[str, Any],
+                                 touched: Dict[Tuple[str, str], Set[str]]):
+    """Forget the relationship rows attached to nodes which were inserted or deleted.
+
+    Args:
+        touched: Keys of the inserted or deleted nodes, by (label, unique column).
+    """
+    touched_labels = {label for label, _ in touched}
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] != "relationship":
+            continue
+        for position, side in enumerate(("from", "to")):
+            label, column = construction[f"{side}_node_label"], construction[f"{side}_node_column"]
+            if label not in touched_labels:
+                continue
+            if (label, column) in touched:
+                store.forget_endpoints(name, position, touched[(label, column)])
+            else:
+                # matched on another property than the key, so any of the rule's rows may be affected
+                store.clear(name)
+
+def construct_domain_graph_delta(construction_plan: Dict[str, Any], import_dir: str,
+                                 state_path: Optional[str] = None,
+                                 batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Apply the changes to every rule's source file since the previous delta import.
+
+    Node rules run before relationship rules. Deleting a node also deletes its relationships, so the
+    relationship rows attached to inserted or deleted nodes are sent again.
+
+    Args:
+        construction_plan: Construction rules keyed by name, as for construct_domain_graph.
+        import_dir: Local directory the rules' source files are relative to.
+        state_path: Fingerprint store file. Defaults to get_state_path().
+        batch_size: Rows sent per transaction.
+
+    Returns:
+        Success with the result of each construction rule, keyed by rule name.
+    """
+    store = FingerprintStore(state_path)
+    try:
+        construction_results = {}
+        touched: Dict[Tuple[str, str], Set[str]] = {}
+        for name, construction in construction_plan.items():
+            if construction["construction_type"] == "node":
+                touched_keys = touched.setdefault((construction["label"], construction["unique_column_name"]), set())
+                construction_results[name] = import_rule_delta(store, name, construction, import_dir, batch_size, touched_keys)
+        touched = {node: keys for node, keys in touched.items() if keys}
+        if touched:
+            forget_touched_relationships(store, construction_plan, touched)
+        for name, construction in construction_plan.items():
+            if construction["construction_type"] == "relationship":
+                construction_results[name] = import_rule_delta(store, name, construction, import_dir, batch_size)
+        return tool_success("construction_results", construction_results)
+    finally:
+        store.close()
@@ -0,0 +1,133 @@
+# Import of typed edge lists, files with one relationship per row and its type in a column,
+# like the generated relationships.csv (Source, Target, Type).
+#
+# A relationship construction rule has one static type and endpoint labels, so a file holding several
+# types would be read once per type. Here the file is read once: each row's endpoints are resolved to
+# (label, key column) by the longest matching ID prefix, or by the edge list's per-type lookup map, and
+# rows are grouped by (type, endpoints) and merged in batches with the upsert_relationships template.
+#
+#   edge_list = {
+#       "source_file": "relationships.csv",
+#       "source_column": "Source", "target_column": "Target", "type_column": "Type",
+#       "node_id_prefixes": {"T": {"label": "Trade", "key": "Trade_ID"},
+#                            "ITSM": {"label": "ITSMTicket", "key": "Ticket_ID"}, ...},
+#       "type_endpoints": {"BREAK_OF": {"from": {"label": "Break", "key": "Break_ID"},
+#                                       "to": {"label": "Trade", "key": "Trade_ID"}}},   # optional
+#       "properties": [],                                                                # optional
+#   }
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .neo4j_for_adk import graphdb, tool_success, tool_error, render_query, validate_identifier, WRITE_ACCESS
+
+DEFAULT_BATCH_SIZE = 10000
+MAX_EXAMPLES = 5
+
+# (type, from label, from key, to label, to key)
+EdgeGroup = Tuple[str, str, str, str, str]
+
+
+def resolve_node_id(node_id: str, node_id_prefixes: Dict[str, Dict[str, str]]) -> Optional[Tuple[str, str]]:
+    """The (label, key column) of the longest prefix of node_id, or None."""
+    matches = [prefix for prefix in node_id_prefixes if node_id.startswith(prefix)]
+    if not matches:
+        return None
+    endpoint = node_id_prefixes[max(matches, key=len)]
+    return endpoint["label"], endpoint["key"]
+
+def _check_edge_list(edge_list: Dict[str, Any]) -> List[str]:
+    problems = []
+    endpoints = list((edge_list.get("node_id_prefixes") or {}).values())
+    for relationship_type, type_endpoints in (edge_list.get("type_endpoints") or {}).items():
+        if not isinstance(type_endpoints, dict) or "from" not in type_endpoints or "to" not in type_endpoints:
+            problems.append(f"type_endpoints for {relationship_type} needs 'from' and 'to'")
+        else:
+            endpoints += [type_endpoints["from"], type_endpoints["to"]]
+    if not endpoints:
+        problems.append("edge list needs node_id_prefixes or type_endpoints to resolve its endpoints")
+    for endpoint in endpoints:
+        try:
+            validate_identifier(endpoint["label"])
+            validate_identifier(endpoint["key"])
+        except (ValueError, KeyError, TypeError) as e:
+            problems.append(f"endpoint needs a valid 'label' and 'key': {endpoint!r} ({e})")
+    return problems
+
+def load_edge_list(edge_list: Dict[str, Any], import_dir: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Merge the relationships of an edge list file, reading it once for all of its types.
+
+    Args:
+        edge_list: Edge list definition, see the module comment.
+        import_dir: Local directory the edge list's source file is relative to.
+        batch_size: Rows per transaction.
+
+    Returns:
+        Success with 'edge_list_counts': rows read, rows sent per relationship type, and rows
+        skipped for an empty field or an endpoint no prefix resolves (with examples), or an error.
+    """
+    problems = _check_edge_list(edge_list)
+    if problems:
+        return tool_error("; ".join(problems))
+
+    source_column = edge_list.get("source_column", "Source")
+    target_column = edge_list.get("target_column", "Target")
+    type_column = edge_list.get("type_column", "Type")
+    properties = edge_list.get("properties") or []
+    node_id_prefixes = edge_list.get("node_id_prefixes") or {}
+    type_endpoints = edge_list.get("type_endpoints") or {}
+
+    counts: Dict[str, Any] = {"rows_read": 0, "empty_rows": 0, "unresolved_rows": 0, "unresolved_examples": [],
+                              "batches": 0, "rows_by_type": {}}
+    pending: Dict[EdgeGroup, List[Dict[str, Any]]] = {}
+
+    def flush(group: EdgeGroup):
+        rows = pending.pop(group, [])
+        if not rows:
+            return
+        relationship_type, from_label, from_key, to_label, to_key = group
+        result = graphdb.send_query(
+            render_query("upsert_relationships", from_node_column=from_key, to_node_column=to_key),
+            {"from_node_label": from_label, "to_node_label": to_label, "relationship_type": relationship_type, "rows": rows},
+            access_mode=WRITE_ACCESS,
+        )
+        if result["status"] == "error":
+            raise RuntimeError(result["error_message"])
+        counts["batches"] += 1
+        counts["rows_by_type"][relationship_type] = counts["rows_by_type"].get(relationship_type, 0) + len(rows)
+
+    try:
+        with open(Path(import_dir) / edge_list["source_file"], newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                counts["rows_read"] += 1
+                source, target, relationship_type = row.get(source_column), row.get(target_column), row.get(type_column)
+                if not source or not target or not relationship_type:
+                    counts["empty_rows"] += 1
+                    continue
+                if relationship_type in type_endpoints:
+                    endpoints = type_endpoints[relationship_type]
+                    start, end = (endpoints["from"]["label"], endpoints["from"]["key"]), (endpoints["to"]["label"], endpoints["to"]["key"])
+                else:
+                    start, end = resolve_node_id(source, node_id_prefixes), resolve_node_id(target, node_id_prefixes)
+                if start is None or end is None:
+                    counts["unresolved_rows"] += 1
+                    if len(counts["unresolved_examples"]) < MAX_EXAMPLES:
+                        counts["unresolved_examples"].append(source if start is None else target)
+                    continue
+                group = (relationship_type, *start, *end)
+                pending.setdefault(group, []).append({
+                    "from_key": source,
+                    "to_key": target,
+                    "properties": {column: row.get(column) or None for column in properties},
+                })
+                if len(pending[group]) >= batch_size:
+                    flush(group)
+        for group in list(pending):
+            flush(group)
+    except (OSError, KeyError, csv.Error) as e:
+        return tool_error(f"Could not read {edge_list.get('source_file')}: {e}")
+    except (ValueError, RuntimeError) as e:
+        return tool_error(f"Edge list import failed: {e}")
+
+    return tool_success("edge_list_counts", counts)
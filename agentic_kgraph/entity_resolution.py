@@ -0,0 +1,175 @@
+# Resolution of duplicate __Entity__ nodes created by the KG builder.
+#
+# SimpleKGPipeline creates an entity node for every mention in every chunk, so a trade mentioned in ten
+# emails can become ten Trade entities, and correlating entities with domain nodes multiplies them again.
+# Before correlating, the entities of each label are clustered and every cluster merged into one node:
+#   1. each entity's key (the first of `key_properties` it has) is normalised: lower case, without the
+#      label as a leading word, punctuation or whitespace, so "Trade T-9012" and "t9012" are the same
+#   2. entities with equal normalised keys are clustered
+#   3. distinct keys within a block (same first characters) whose rapidfuzz ratio reaches the similarity
+#      threshold are clustered too, unless their digits differ: "T9012" and "T9013" are different trades
+#   4. each cluster is merged with apoc.refactor.mergeNodes, keeping the properties of the entity with the
+#      most common key and merging relationships (e.g. FROM_CHUNK) onto it, in batches of clusters
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from .neo4j_for_adk import graphdb, tool_success, tool_error, READ_ACCESS, WRITE_ACCESS
+
+DEFAULT_KEY_PROPERTIES = ("name", "id")
+DEFAULT_SIMILARITY = 0.9
+DEFAULT_BLOCK_PREFIX = 2
+DEFAULT_BATCH_SIZE = 500
+MAX_EXAMPLES = 5
+
+ENTITY_LABELS_QUERY = """
+MATCH (n:`__Entity__`)
+UNWIND labels(n) AS label
+WITH DISTINCT label
+WHERE NOT label STARTS WITH '__'
+RETURN label ORDER BY label
+"""
+
+ENTITY_KEYS_QUERY = """
+MATCH (n:$($label):`__Entity__`)
+WITH n, [key IN $key_properties WHERE n[key] IS NOT NULL | toString(n[key])] AS values
+WHERE size(values) > 0
+RETURN elementId(n) AS id, values[0] AS value
+"""
+
+MERGE_CLUSTERS_QUERY = """
+UNWIND $clusters AS cluster
+CALL (cluster) {
+    UNWIND cluster AS id
+    MATCH (n) WHERE elementId(n) = id
+    RETURN collect(n) AS nodes
+}
+// entities with several labels may already have been merged with another label's clusters
+WITH nodes WHERE size(nodes) > 1
+CALL apoc.refactor.mergeNodes(nodes, {properties: 'discard', mergeRels: true}) YIELD node
+RETURN count(node) AS merged_clusters
+"""
+
+
+def normalize_entity_key(label: str, value: str) -> str:
+    """Lower case, without the label as a leading word, punctuation or whitespace."""
+    normalized = value.strip().lower()
+    normalized = re.sub(rf"^{re.escape(label.lower())}\b", "", normalized)
+    return re.sub(r"[\W_]+", "", normalized)
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parents[item] != item:
+            self.parents[item] = self.parents[self.parents[item]]
+            item = self.parents[item]
+        return item
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parents[max(root_a, root_b)] = min(root_a, root_b)
+
+def cluster_keys(keys: Sequence[str], similarity: float = DEFAULT_SIMILARITY,
+                 block_prefix: int = DEFAULT_BLOCK_PREFIX) -> List[List[int]]:
+    """Cluster normalised keys, returning clusters of indexes into keys.
+
+    Equal keys are always clustered. With similarity below 1, distinct keys sharing their first
+    block_prefix characters and the same digits are clustered when their fuzzy ratio reaches it.
+    """
+    distinct = sorted(set(keys))
+    clusters = UnionFind(len(distinct))
+    if similarity < 1.0:
+        # imported here, so importing tools doesn't load them in lessons which never resolve entities
+        import numpy as np
+        from rapidfuzz import fuzz, process
+
+        blocks: Dict[str, List[int]] = {}
+        for index, key in enumerate(distinct):
+            blocks.setdefault(key[:block_prefix], []).append(index)
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            block_keys = [distinct[index] for index in members]
+            scores = process.cdist(block_keys, block_keys, scorer=fuzz.ratio, score_cutoff=similarity * 100,
+                                   dtype=np.uint8, workers=-1)
+            for i, j in zip(*scores.nonzero()):
+                if i < j and re.sub(r"\D", "", block_keys[i]) == re.sub(r"\D", "", block_keys[j]):
+                    clusters.union(members[i], members[j])
+
+    position = {key: clusters.find(index) for index, key in enumerate(distinct)}
+    grouped: Dict[int, List[int]] = {}
+    for index, key in enumerate(keys):
+        grouped.setdefault(position[key], []).append(index)
+    return list(grouped.values())
+
+def resolve_label(label: str, key_properties: Sequence[str] = DEFAULT_KEY_PROPERTIES,
+                  similarity: float = DEFAULT_SIMILARITY, dry_run: bool = False,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Cluster the entities of one label, and merge each cluster unless dry_run.
+
+    Raises:
+        RuntimeError: if a query fails.
+    """
+    result = graphdb.send_query(ENTITY_KEYS_QUERY, {"label": label, "key_properties": list(key_properties)}, access_mode=READ_ACCESS)
+    if result["status"] == "error":
+        raise RuntimeError(result["error_message"])
+    entities = [record for record in result["query_result"] if normalize_entity_key(label, record["value"])]
+    keys = [normalize_entity_key(label, entity["value"]) for entity in entities]
+
+    merges = []
+    sizes: Counter = Counter()
+    examples = []
+    for cluster in cluster_keys(keys, similarity):
+        sizes[len(cluster)] += 1
+        if len(cluster) < 2:
+            continue
+        # the entity with the most common key survives, keeping its properties
+        values = Counter(entities[index]["value"] for index in cluster)
+        survivor = max(cluster, key=lambda index: values[entities[index]["value"]])
+        merges.append([entities[survivor]["id"]] + [entities[index]["id"] for index in cluster if index != survivor])
+        if len(examples) < MAX_EXAMPLES:
+            examples.append(sorted(values))
+
+    if not dry_run:
+        for start in range(0, len(merges), batch_size):
+            result = graphdb.send_query(MERGE_CLUSTERS_QUERY, {"clusters": merges[start:start + batch_size]}, access_mode=WRITE_ACCESS)
+            if result["status"] == "error":
+                raise RuntimeError(result["error_message"])
+
+    return {
+        "entities": len(entities),
+        "clusters": sum(sizes.values()),
+        "merged_entities": sum(len(cluster) - 1 for cluster in merges),
+        "cluster_sizes": dict(sorted(sizes.items())),
+        "largest_cluster": max(sizes) if sizes else 0,
+        "examples": examples,
+    }
+
+def resolve_entities(labels: Optional[Sequence[str]] = None, key_properties: Sequence[str] = DEFAULT_KEY_PROPERTIES,
+                     similarity: float = DEFAULT_SIMILARITY, dry_run: bool = False) -> Dict[str, Any]:
+    """Merge duplicate __Entity__ nodes, label by label.
+
+    Args:
+        labels: Entity labels to resolve, by default every label of an __Entity__ node.
+        key_properties: Properties identifying an entity, the first one an entity has is used.
+        similarity: Fuzzy ratio (0 to 1) at which distinct keys are clustered, 1 for exact matches only.
+        dry_run: Report the clusters without merging them.
+
+    Returns:
+        Success with 'entity_resolution': per label counts of entities, clusters and merged entities,
+        the number of clusters of each size, and example clusters. Or an error.
+    """
+    try:
+        if labels is None:
+            result = graphdb.send_query(ENTITY_LABELS_QUERY, access_mode=READ_ACCESS)
+            if result["status"] == "error":
+                return result
+            labels = [record["label"] for record in result["query_result"]]
+        report = {label: resolve_label(label, key_properties, similarity, dry_run) for label in labels}
+    except RuntimeError as e:
+        return tool_error(f"Entity resolution failed: {e}")
+    return tool_success("entity_resolution", report)
@@ -0,0 +1,112 @@
+# Structural statistics of the graph: labels, relationship types, their counts, the
+# (from labels)-[type]->(to labels) patterns and the property keys of each label and type.
+#
+# Agents and notebooks keep asking these questions. Scanning the graph for them is avoided:
+#   - counts of a single label or relationship type come from the count store
+#     (one query with a UNION ALL branch per label or type, spliced in as validated identifiers)
+#   - patterns and property keys come from the db.schema.* procedures
+# Every query goes through graphdb.cached_query, so the statistics are computed once and reused
+# until a write is sent through graphdb. After writing through another driver, or after an offline
+# import, call graphdb.invalidate_cache() or pass refresh=True.
+
+from typing import Any, Dict, List
+
+from .neo4j_for_adk import graphdb, tool_success, tool_error, validate_identifier, READ_ACCESS
+
+LABELS_QUERY = "CALL db.labels() YIELD label RETURN label ORDER BY label"
+RELATIONSHIP_TYPES_QUERY = "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType ORDER BY relationshipType"
+TOTALS_QUERY = """
+CALL () { MATCH (n) RETURN count(n) AS nodes }
+CALL () { MATCH ()-[r]->() RETURN count(r) AS relationships }
+RETURN nodes, relationships
+"""
+PATTERNS_QUERY = """
+CALL db.schema.visualization() YIELD relationships
+UNWIND relationships AS r
+RETURN DISTINCT labels(startNode(r)) AS from_labels, type(r) AS relationship_type, labels(endNode(r)) AS to_labels
+ORDER BY relationship_type
+"""
+NODE_PROPERTIES_QUERY = """
+CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName, propertyTypes, mandatory
+WHERE propertyName IS NOT NULL
+RETURN nodeLabels AS labels, propertyName AS property, propertyTypes AS types, mandatory
+"""
+RELATIONSHIP_PROPERTIES_QUERY = """
+CALL db.schema.relTypeProperties() YIELD relType, propertyName, propertyTypes, mandatory
+WHERE propertyName IS NOT NULL
+RETURN relType AS relationship_type, propertyName AS property, propertyTypes AS types, mandatory
+"""
+
+
+def _read(cypher_query: str, parameters: Dict[str, Any] = None, refresh: bool = False) -> List[Dict[str, Any]]:
+    if refresh:
+        result = graphdb.send_query(cypher_query, parameters, access_mode=READ_ACCESS)
+    else:
+        result = graphdb.cached_query(cypher_query, parameters)
+    if result["status"] == "error":
+        raise RuntimeError(result["error_message"])
+    return result["query_result"]
+
+def count_store_query(names: List[str], relationships: bool = False) -> str:
+    """One count store lookup per label (or relationship type), combined with UNION ALL.
+
+    Names which aren't plain identifiers fall back to a dynamic label, which may scan.
+    """
+    branches = []
+    for i, name in enumerate(names):
+        try:
+            token = f"`{validate_identifier(name)}`"
+        except ValueError:
+            token = f"$($names[{i}])"
+        pattern = f"()-[x:{token}]->()" if relationships else f"(x:{token})"
+        # aggregating without grouping keys, so the planner can answer from the count store
+        branches.append(f"MATCH {pattern} WITH count(x) AS count RETURN $names[{i}] AS name, count")
+    return "CALL () {\n    " + "\n    UNION ALL\n    ".join(branches) + "\n}\nRETURN name, count"
+
+def get_graph_statistics(include_properties: bool = True, refresh: bool = False) -> Dict[str, Any]:
+    """Labels, relationship types, their counts, the graph's patterns and (optionally) property keys.
+
+    Args:
+        include_properties: Also list the property keys (and their types) of each label and relationship type.
+        refresh: Query the database even if cached statistics are still valid.
+
+    Returns:
+        Success with 'graph_statistics', or an error.
+    """
+    try:
+        labels = [record["label"] for record in _read(LABELS_QUERY, refresh=refresh)]
+        relationship_types = [record["relationshipType"] for record in _read(RELATIONSHIP_TYPES_QUERY, refresh=refresh)]
+        totals = next(iter(_read(TOTALS_QUERY, refresh=refresh)), {"nodes": 0, "relationships": 0})
+        label_counts = {}
+        if labels:
+            records = _read(count_store_query(labels), {"names": labels}, refresh=refresh)
+            label_counts = {record["name"]: record["count"] for record in records}
+        relationship_counts = {}
+        if relationship_types:
+            records = _read(count_store_query(relationship_types, relationships=True), {"names": relationship_types}, refresh=refresh)
+            relationship_counts = {record["name"]: record["count"] for record in records}
+        patterns = _read(PATTERNS_QUERY, refresh=refresh)
+
+        statistics = {
+            "node_count": totals["nodes"],
+            "relationship_count": totals["relationships"],
+            "labels": label_counts,
+            "relationship_types": relationship_counts,
+            "patterns": patterns,
+        }
+        if include_properties:
+            node_properties: Dict[str, Dict[str, List[str]]] = {}
+            for record in _read(NODE_PROPERTIES_QUERY, refresh=refresh):
+                for label in record["labels"]:
+                    node_properties.setdefault(label, {})[record["property"]] = record["types"]
+            relationship_properties: Dict[str, Dict[str, List[str]]] = {}
+            for record in _read(RELATIONSHIP_PROPERTIES_QUERY, refresh=refresh):
+                # relType is formatted like ":`HAS_POSITION`"
+                relationship_type = record["relationship_type"].lstrip(":").strip("`")
+                relationship_properties.setdefault(relationship_type, {})[record["property"]] = record["types"]
+            statistics["node_properties"] = node_properties
+            statistics["relationship_properties"] = relationship_properties
+    except RuntimeError as e:
+        return tool_error(f"Could not read the graph statistics: {e}")
+
+    return tool_success("graph_statistics", statistics)
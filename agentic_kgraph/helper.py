@@ -0,0 +1,287 @@
+# Add your utilities or helper functions to this file.
+
+from __future__ import annotations
+
+import os
+import json
+import math
+import time
+import uuid
+import asyncio
+import weakref
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
+
+# google.adk is only imported by the functions which need it,
+# so importing this module for get_neo4j_import_dir stays cheap.
+if TYPE_CHECKING:
+    from google.genai import types
+    from google.adk.agents import Agent
+    from google.adk.sessions import BaseSessionService
+    from google.adk.runners import Runner
+
+# these expect to find a .env file at the directory above the lesson.                                                                                                                     # the format for that file is (without the comment)                                                                                                                                       #API_KEYNAME=AStringThatIsTheLongAPIKeyFromSomeService                                                                                                                                     
+@lru_cache(maxsize=1)
+def load_env():
+    """Loads the .env file into the environment, once per process."""
+    from dotenv import load_dotenv, find_dotenv
+    _ = load_dotenv(find_dotenv())
+
+def get_openai_api_key():
+    load_env()
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    return openai_api_key
+
+
+def get_neo4j_import_dir():
+    """Gets the neo4j import directory from an environment variable
+    """
+    load_env()
+    neo4j_import_dir = os.getenv("NEO4J_IMPORT_DIR")
+    return neo4j_import_dir
+
+### ADK session services ###
+
+def make_session_service(db_url: Optional[str] = None) -> BaseSessionService:
+    """Creates the session service used by agent callers.
+
+    Sessions are kept in memory unless a database url is given, either as an argument
+    or in the ADK_SESSION_DB_URL environment variable. For example "sqlite:///sessions.db"
+    keeps sessions in a local file so they survive restarts and can be resumed by session id.
+    Any other BaseSessionService implementation can be passed to make_agent_caller directly.
+    """
+    load_env()
+    db_url = db_url or os.getenv("ADK_SESSION_DB_URL")
+    if db_url:
+        from google.adk.sessions import DatabaseSessionService
+        return DatabaseSessionService(db_url=db_url)
+    from google.adk.sessions import InMemorySessionService
+    return InMemorySessionService()
+
+# one lock per session, so concurrent calls on the same session run one turn at a time.
+# Held weakly: a lock goes away once no turn holds or waits for it, so finished sessions
+# aren't kept forever and a later event loop gets a fresh lock.
+_session_locks: weakref.WeakValueDictionary[Tuple[str, str, str], asyncio.Lock] = weakref.WeakValueDictionary()
+
+def get_session_lock(app_name: str, user_id: str, session_id: str) -> asyncio.Lock:
+    """Returns the lock serializing turns within a session."""
+    return _session_locks.setdefault((app_name, user_id, session_id), asyncio.Lock())
+
+def load_state_snapshot(snapshot_path: str) -> Dict[str, Any]:
+    """Reads the session state saved by AgentCaller.snapshot_state, to use as initial_state."""
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        return json.load(f)["state"]
+
+### ADK runner wrapper ###
+
+class AgentCaller:
+    """A simple wrapper class for interacting with an ADK agent."""
+    
+    def __init__(self, agent: Agent, runner: Runner, user_id: str, session_id: str, tracer=None):
+        """Initialize the AgentCaller with required components.
+
+        An optional tracer (see tracing.AgentTracer) records every event of each call.
+        """
+        self.agent = agent
+        self.runner = runner
+        self.user_id = user_id
+        self.session_id = session_id
+        self.tracer = tracer
+        # token usage of the most recent call, summed over its LLM responses
+        self.last_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    
+    def get_session(self):
+        """Fetches the session (and its state) from the session service. Must be awaited."""
+        return self.runner.session_service.get_session(app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id)
+
+    async def snapshot_state(self, snapshot_path: str) -> Dict[str, Any]:
+        """Saves the current session state as JSON, so a long run can be resumed in a new session."""
+        session = await self.get_session()
+        snapshot = {
+            "app_name": self.runner.app_name,
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "state": dict(session.state) if session else {},
+        }
+        with open(snapshot_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, default=str)
+        return snapshot
+
+    async def call(self, query: str, verbose: bool = False, echo: bool = True):
+        """Call the agent with a query and return the response.
+
+        Set echo=False to suppress printing the query and response.
+        """
+        if echo:
+            print(f"\n>>> User Query: {query}")
+
+        from google.genai import types # For creating message Content/Parts
+
+        # Prepare the user's message in ADK format
+        content = types.Content(role='user', parts=[types.Part(text=query)])
+
+        # Turns on the same session are serialized, so concurrent callers don't interleave events.
+        async with get_session_lock(self.runner.app_name, self.user_id, self.session_id):
+            final_response_text = await self._run_turn(content, verbose)
+
+        if echo:
+            print(f"<<< Agent Response: {final_response_text}")
+        return final_response_text
+
+    async def _run_turn(self, content: types.Content, verbose: bool) -> str:
+        final_response_text = "Agent did not produce a final response." # Default
+        self.last_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+        # Key Concept: run_async executes the agent logic and yields Events.
+        # We iterate through events to find the final answer.
+        async for event in self.runner.run_async(user_id=self.user_id, session_id=self.session_id, new_message=content):
+            # You can uncomment the line below to see *all* events during execution
+            if verbose:
+                print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+
+            if self.tracer:
+                self.tracer.record_event(event)
+
+            if event.usage_metadata:
+                self.last_usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                self.last_usage["completion_tokens"] += event.usage_metadata.candidates_token_count or 0
+                self.last_usage["total_tokens"] += event.usage_metadata.total_token_count or 0
+
+            # Key Concept: is_final_response() marks the concluding message for the turn.
+            if event.is_final_response():
+                if event.content and event.content.parts:
+                    # Assuming text response in the first part
+                    final_response_text = event.content.parts[0].text
+                elif event.actions and event.actions.escalate: # Handle potential errors/escalations
+                    final_response_text = f"Agent escalated: {event.error_message or 'No specific message.'}"
+                # With a tracer the run is drained instead, so the after_agent callbacks
+                # still run and close the agent spans.
+                if event.author == self.agent.name and not self.tracer:
+                    break # Stop processing events once the final response is found
+
+        return final_response_text
+
+async def make_agent_caller(
+    agent: Agent,
+    initial_state: Optional[Dict[str, Any]] = None,
+    session_service: Optional[BaseSessionService] = None,
+    session_id: Optional[str] = None,
+    tracer=None,
+) -> AgentCaller:
+    """Create and return an AgentCaller instance for the given agent.
+
+    Args:
+        agent: The agent to call.
+        initial_state: State for a new session.
+        session_service: Where sessions are stored. Defaults to make_session_service().
+        session_id: Resume this session if it exists, otherwise create it.
+            Defaults to a new unique id, so concurrent callers never share a session.
+        tracer: Optional tracing.AgentTracer, which instruments the agent and records its events.
+    """
+    session_service = session_service or make_session_service()
+    app_name = agent.name + "_app"
+    user_id = agent.name + "_user"
+    session_id = session_id or f"{agent.name}_session_{uuid.uuid4().hex[:12]}"
+
+    # Resume an existing session, or initialize a new one
+    existing_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if existing_session is None:
+        await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            state=initial_state or {}
+        )
+    
+    from google.adk.runners import Runner
+
+    runner = Runner(
+        agent=agent,
+        app_name=app_name,
+        session_service=session_service
+    )
+    
+    if tracer:
+        tracer.instrument(agent)
+
+    return AgentCaller(agent, runner, user_id, session_id, tracer)
+
+
+### Concurrent runs ###
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of a list of values, e.g. percentile(latencies, 95)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+async def run_agent_jobs(
+    agent: Agent,
+    jobs: List[Tuple[Optional[Dict[str, Any]], str]],
+    concurrency: int = 4,
+    session_service: Optional[BaseSessionService] = None,
+    tracer=None,
+) -> Dict[str, Any]:
+    """Run many independent (initial_state, query) jobs through the same agent concurrently.
+
+    Each job gets its own session, and at most `concurrency` jobs run at once.
+
+    Returns:
+        A dictionary with a 'jobs' list (final response, end state, latency and token usage per job,
+        or an error) and a 'summary' of latency percentiles and total token usage.
+    """
+    session_service = session_service or make_session_service()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_job(index: int, initial_state: Optional[Dict[str, Any]], query: str) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                caller = await make_agent_caller(agent, initial_state, session_service, tracer=tracer)
+                final_response = await caller.call(query, echo=False)
+                session = await caller.get_session()
+                return {
+                    "job": index,
+                    "session_id": caller.session_id,
+                    "final_response": final_response,
+                    "end_state": dict(session.state) if session else {},
+                    "latency_seconds": time.perf_counter() - started,
+                    "usage": caller.last_usage,
+                }
+            except Exception as e:
+                return {
+                    "job": index,
+                    "error": str(e),
+                    "latency_seconds": time.perf_counter() - started,
+                }
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_job(index, initial_state, query) for index, (initial_state, query) in enumerate(jobs)
+    ))
+    wall_seconds = time.perf_counter() - started
+
+    latencies = [result["latency_seconds"] for result in results if "error" not in result]
+    summary = {
+        "jobs": len(results),
+        "failed": sum(1 for result in results if "error" in result),
+        "wall_seconds": wall_seconds,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=0.0),
+        },
+        "usage": {
+            key: sum(result["usage"][key] for result in results if "usage" in result)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+        },
+    }
+    return {"jobs": list(results), "summary": summary}
@@ -0,0 +1,179 @@
+# In-process vector search over chunk embeddings, for offline runs and small deployments
+# where a Neo4j vector index isn't wanted.
+#
+# A store is a directory holding
+#   vectors.f32   - the embeddings as one contiguous row-major float32 matrix, rows normalised to unit length
+#   chunks.jsonl  - one record per row: chunk_id, text and (optionally) entities
+#   store.json    - dimensions, row count and the length of chunks.jsonl
+# The matrix is memory-mapped, so only the pages a search touches are read. Appends write to the end of both
+# files and then update store.json, so a store interrupted mid-append still opens with its previous rows.
+#
+# Searches are exact: the query batch is multiplied with blocks of rows, and each block's best rows are picked
+# with argpartition and merged. Scores are (1 + cosine) / 2 like the Neo4j vector index, and search() returns
+# the same records as ChunkVectorIndex.search, so either can back make_chunk_search_tool.
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .neo4j_for_adk import graphdb, validate_identifier, READ_ACCESS
+
+DEFAULT_BLOCK_ROWS = 65536
+
+EXPORT_CHUNKS_QUERY_TEMPLATE = """
+    MATCH (chunk:`{label}`)
+    WHERE chunk.`{property}` IS NOT NULL AND elementId(chunk) > $after
+    RETURN elementId(chunk) AS chunk_id, chunk.text AS text, chunk.`{property}` AS embedding
+    ORDER BY chunk_id
+    LIMIT $batch_size
+"""
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class LocalVectorStore:
+    """Memory-mapped float32 chunk embeddings with exact cosine top-k search.
+
+    Args:
+        path: Directory of the store, created on first append.
+        dimensions: Length of the embeddings. Read from an existing store when omitted.
+        block_rows: Rows scored at a time, bounding the memory a search needs.
+    """
+
+    def __init__(self, path: str, dimensions: Optional[int] = None, block_rows: int = DEFAULT_BLOCK_ROWS):
+        self.path = Path(path)
+        self.block_rows = block_rows
+        self.count = 0
+        self.chunks_bytes = 0
+        self.dimensions = dimensions
+        self._matrix: Optional[np.memmap] = None
+        self._chunks: List[Dict[str, Any]] = []
+        if (self.path / "store.json").exists():
+            settings = json.loads((self.path / "store.json").read_text())
+            if dimensions is not None and dimensions != settings["dimensions"]:
+                raise ValueError(f"{path} holds {settings['dimensions']} dimensional vectors, not {dimensions}")
+            self.dimensions, self.count, self.chunks_bytes = settings["dimensions"], settings["count"], settings["chunks_bytes"]
+            with open(self.path / "chunks.jsonl", encoding="utf-8") as f:
+                self._chunks = [json.loads(line) for _, line in zip(range(self.count), f)]
+        if self.dimensions is None:
+            raise ValueError(f"{path} is not a vector store yet, so its dimensions are needed")
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def chunk_ids(self) -> List[str]:
+        return [chunk["chunk_id"] for chunk in self._chunks]
+
+    def matrix(self) -> np.ndarray:
+        """The stored (normalised) embeddings, memory-mapped."""
+        if self.count == 0:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != self.count:
+            self._matrix = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(self.count, self.dimensions))
+        return self._matrix
+
+    def append(self, embeddings: Sequence[Sequence[float]], chunks: Iterable[Dict[str, Any]]) -> int:
+        """Add embeddings and their chunk records (each with a 'chunk_id', and usually 'text' and 'entities').
+
+        Returns:
+            The number of rows appended.
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        chunks = list(chunks)
+        if vectors.size == 0:
+            return 0
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimensions:
+            raise ValueError(f"expected embeddings of {self.dimensions} dimensions, got shape {vectors.shape}")
+        if len(chunks) != len(vectors):
+            raise ValueError(f"{len(vectors)} embeddings but {len(chunks)} chunk records")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        # rows beyond the recorded count are left over from an interrupted append
+        with open(self.path / "vectors.f32", "ab") as f:
+            f.truncate(self.count * self.dimensions * 4)
+            f.write(normalize_rows(vectors).tobytes())
+        lines = "".join(json.dumps(chunk) + "\n" for chunk in chunks).encode("utf-8")
+        with open(self.path / "chunks.jsonl", "ab") as f:
+            f.truncate(self.chunks_bytes)
+            f.write(lines)
+        self.count += len(vectors)
+        self.chunks_bytes += len(lines)
+        self._chunks += chunks
+        (self.path / "store.json").write_text(json.dumps({
+            "dimensions": self.dimensions, "count": self.count, "chunks_bytes": self.chunks_bytes,
+        }))
+        return len(vectors)
+
+    def search_batch(self, query_vectors: Sequence[Sequence[float]], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """The top-k chunks for each query, best first."""
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dimensions:
+            raise ValueError(f"expected query vectors of {self.dimensions} dimensions, got shape {queries.shape}")
+        queries = normalize_rows(queries)
+        k = min(top_k, self.count)
+        if k <= 0:
+            return [[] for _ in queries]
+
+        matrix = self.matrix()
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, self.count, self.block_rows):
+            scores = queries @ matrix[start:start + self.block_rows].T  # (queries, block rows)
+            block_k = min(k, scores.shape[1])
+            rows = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            # merge with the best rows of the previous blocks, keeping the k best
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        results = []
+        for query_scores, query_rows in zip(np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)):
+            results.append([
+                {
+                    "chunk_id": self._chunks[row]["chunk_id"],
+                    "text": self._chunks[row].get("text"),
+                    "score": float((1.0 + score) / 2.0),
+                    "entities": self._chunks[row].get("entities", []),
+                }
+                for score, row in zip(query_scores, query_rows)
+            ])
+        return results
+
+    def search(self, query_vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """The top-k chunks for a query, best first, as returned by ChunkVectorIndex.search."""
+        return self.search_batch([query_vector], top_k)[0]
+
+    def sync_from_neo4j(self, label: str = "Chunk", embedding_property: str = "embedding",
+                        batch_size: int = 1000) -> int:
+        """Append the chunks in Neo4j which the store doesn't have yet.
+
+        Returns:
+            The number of chunks appended.
+        """
+        query = EXPORT_CHUNKS_QUERY_TEMPLATE.format(label=validate_identifier(label), property=validate_identifier(embedding_property))
+        known = set(self.chunk_ids)
+        appended, after = 0, ""
+        while True:
+            result = graphdb.send_query(query, {"after": after, "batch_size": batch_size}, access_mode=READ_ACCESS)
+            if result["status"] == "error":
+                raise ValueError(result["error_message"])
+            records = result["query_result"]
+            if not records:
+                return appended
+            new = [record for record in records if record["chunk_id"] not in known]
+            appended += self.append(
+                [record["embedding"] for record in new],
+                [{"chunk_id": record["chunk_id"], "text": record["text"]} for record in new],
+            )
+            after = records[-1]["chunk_id"]
@@ -0,0 +1,123 @@
+# Deterministic offline model for ADK agents.
+#
+# A ScriptedLlm can be given to any LlmAgent in place of "openai/gpt-4o". It replies with a script
+# of text and function-call steps, optionally recorded from a real run by an AgentTracer, and can
+# simulate model latency, so agent pipelines can be run and benchmarked without network access.
+#
+#   proposal_agent = LlmAgent(name="proposal_agent", model=ScriptedLlm.from_trace("run.jsonl", "proposal_agent"), ...)
+#
+# The step to reply with is the number of model turns already in the request's conversation,
+# so replies don't depend on call order and one model can serve many concurrent sessions.
+
+import json
+import random
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from pydantic import PrivateAttr
+
+from google.genai import types
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+DEFAULT_FALLBACK_TEXT = "Mock response"
+
+
+def text_step(text: str) -> Dict[str, Any]:
+    """A script step replying with text."""
+    return {"text": text}
+
+def function_call_step(name: str, args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """A script step calling one tool."""
+    return {"function_calls": [{"name": name, "args": args or {}}]}
+
+def load_trace_steps(trace_path: str, agent_name: str) -> List[Dict[str, Any]]:
+    """Script steps replaying an agent's model turns from an AgentTracer JSONL export.
+
+    Args:
+        trace_path: File written by AgentTracer.export_jsonl.
+        agent_name: The agent whose replies are replayed.
+
+    Returns:
+        The agent's function calls and text replies, in the order they were recorded.
+    """
+    steps = []
+    with open(trace_path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    for span in sorted(spans, key=lambda span: span["start_ns"]):
+        attributes = span["attributes"]
+        if span["kind"] != "event" or attributes.get("event.author") != agent_name:
+            continue
+        if attributes.get("event.function_call_args"):
+            steps.append({"function_calls": json.loads(attributes["event.function_call_args"])})
+        elif attributes.get("event.text"):
+            steps.append(text_step(attributes["event.text"]))
+    return steps
+
+
+class ScriptedLlm(BaseLlm):
+    """An LLM which replays scripted replies.
+
+    Each step is either {"text": "..."} or {"function_calls": [{"name": ..., "args": {...}}, ...]}.
+    Once the script runs out the fallback text is returned, or the script starts over if repeat is set.
+    """
+    model: str = "mock/scripted"
+    steps: List[Dict[str, Any]] = []
+    fallback_text: str = DEFAULT_FALLBACK_TEXT
+    repeat: bool = False
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr()
+    _calls: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any):
+        self._random = random.Random(self.seed)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"mock/.*"]
+
+    @classmethod
+    def from_trace(cls, trace_path: str, agent_name: str, **kwargs) -> "ScriptedLlm":
+        """Replay the model turns an agent made in a traced run. See load_trace_steps."""
+        return cls(steps=load_trace_steps(trace_path, agent_name), **kwargs)
+
+    @property
+    def calls(self) -> int:
+        """Number of requests answered so far."""
+        return self._calls
+
+    def next_step(self, llm_request: LlmRequest) -> Optional[Dict[str, Any]]:
+        """The step answering this request, or None when the script has run out."""
+        if not self.steps:
+            return None
+        position = sum(1 for content in llm_request.contents if content.role == "model")
+        if self.repeat:
+            return self.steps[position % len(self.steps)]
+        return self.steps[position] if position < len(self.steps) else None
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self._calls += 1
+        delay = self.latency_seconds + self._random.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        step = self.next_step(llm_request) or text_step(self.fallback_text)
+        if "function_calls" in step:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args") or {}))
+                for call in step["function_calls"]
+            ]
+        else:
+            parts = [types.Part(text=step["text"])]
+
+        # rough token counts (~4 characters per token) so usage reporting has something to add up
+        prompt_chars = sum(len(part.text or "") for content in llm_request.contents for part in content.parts or [])
+        completion_chars = len(json.dumps(step))
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4,
+            candidates_token_count=completion_chars // 4,
+            total_token_count=(prompt_chars + completion_chars) // 4,
+        )
+        yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
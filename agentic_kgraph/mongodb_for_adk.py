@@ -0,0 +1,530 @@
+import os
+import csv
+import json
+import time
+import asyncio
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import atexit
+
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from pymongo.errors import PyMongoError, BulkWriteError
+
+from .neo4j_for_adk import tool_success, tool_error
+
+def to_python(value):
+    """Convert MongoDB results to Python-friendly format."""
+    from bson import ObjectId
+    from datetime import datetime
+    
+    if isinstance(value, dict):
+        return {k: to_python(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [to_python(v) for v in value]
+    elif isinstance(value, ObjectId):
+        return str(value)
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    else:
+        return value
+
+
+# find() without a filter or limit only returns this many documents
+DEFAULT_FIND_LIMIT = 100
+# stop converting query results once they reach roughly this many bytes (as JSON), unless MONGODB_MAX_RESULT_BYTES is set
+DEFAULT_MAX_RESULT_BYTES = 1_000_000
+
+@lru_cache(maxsize=1)
+def mongodb_settings() -> Dict[str, Any]:
+    """Connection settings, read from the environment (and .env file) once, when first needed."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        "uri": os.getenv("MONGODB_URI") or "mongodb://localhost:27017/",
+        "database": os.getenv("MONGODB_DATABASE") or "position_management",
+        "import_dir": os.getenv("MONGODB_IMPORT_DIR") or "../../data/data_files",
+        "max_result_bytes": int(os.getenv("MONGODB_MAX_RESULT_BYTES") or DEFAULT_MAX_RESULT_BYTES),
+    }
+
+def read_csv_batches(file_path: Path, batch_size: int) -> Iterator[List[Dict[str, str]]]:
+    """Streams a CSV file as lists of at most batch_size row dictionaries."""
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        batch = []
+        for row in csv.DictReader(file):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+class MongoDBForADK:
+    """
+    A wrapper for querying MongoDB which returns ADK-friendly responses.
+    Similar interface to Neo4jForADK but for MongoDB.
+
+    The client is created on first use, so constructing the wrapper (and importing this module) is free.
+    """
+    _client = None
+
+    def __init__(self, client: Optional[MongoClient] = None):
+        """Connects using MONGODB_URI on first use, unless a client (e.g. a mongomock.MongoClient) is given."""
+        self._client_lock = threading.Lock()
+        self._client = client
+
+    @property
+    def database_name(self) -> str:
+        return mongodb_settings()["database"]
+
+    @property
+    def client(self) -> MongoClient:
+        """The client, connecting on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = MongoClient(mongodb_settings()["uri"])
+        return self._client
+
+    @property
+    def _db(self):
+        return self.client[self.database_name]
+    
+    def get_client(self):
+        return self.client
+    
+    def get_database(self):
+        return self._db
+    
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    def send_query(self, collection_name: str, pipeline: list = None, filter_query: dict = None,
+                   projection: dict = None, sort: list = None, skip: int = 0, limit: int = None,
+                   batch_size: int = None, max_bytes: int = None, allow_disk_use: bool = False) -> Dict[str, Any]:
+        """
+        Execute a MongoDB query, streaming the cursor rather than materializing it.
+        
+        Projection, sort, skip and limit are pushed down to the server: as find()
+        options, or as stages appended to the aggregation pipeline.
+        Results are converted one document at a time until the byte budget is used up,
+        in which case the cursor is closed and the result has 'truncated': True.
+        
+        Args:
+            collection_name: Name of the collection to query
+            pipeline: Aggregation pipeline (for complex queries including $graphLookup)
+            filter_query: Simple filter query (for find operations)
+            projection: Fields to include or exclude, e.g. {"_id": 0, "Trade_ID": 1}
+            sort: List of (field, direction) pairs, e.g. [("Trade_Date", -1)]
+            skip: Number of documents to skip
+            limit: Maximum number of documents. A find() without filter or limit returns at most 100.
+            batch_size: Documents fetched from the server per round trip
+            max_bytes: Budget for the converted results, measured as JSON. Defaults to MONGODB_MAX_RESULT_BYTES.
+            allow_disk_use: Let aggregation stages spill to disk instead of failing on memory limits
+        
+        Returns:
+            Dict with status and results
+        """
+        max_bytes = max_bytes or mongodb_settings()["max_result_bytes"]
+        try:
+            collection = self._db[collection_name]
+            
+            if pipeline:
+                # Use aggregation pipeline (for graph-like queries)
+                stages = list(pipeline)
+                if projection:
+                    stages.append({"$project": projection})
+                if sort:
+                    stages.append({"$sort": dict(sort)})
+                if skip:
+                    stages.append({"$skip": skip})
+                if limit:
+                    stages.append({"$limit": limit})
+                options = {"allowDiskUse": allow_disk_use}
+                if batch_size:
+                    options["batchSize"] = batch_size
+                cursor = collection.aggregate(stages, **options)
+            else:
+                # Use simple find, returning a limited number of documents when there is no filter
+                if limit is None and not filter_query:
+                    limit = DEFAULT_FIND_LIMIT
+                cursor = collection.find(filter_query or {}, projection, skip=skip, limit=limit or 0, sort=sort)
+                if batch_size:
+                    cursor = cursor.batch_size(batch_size)
+            
+            # Convert to Python-friendly format, one document at a time
+            python_results = []
+            result_bytes = 0
+            truncated = False
+            with cursor:
+                for doc in cursor:
+                    python_doc = to_python(doc)
+                    result_bytes += len(json.dumps(python_doc, default=str))
+                    if result_bytes > max_bytes:
+                        truncated = True
+                        break
+                    python_results.append(python_doc)
+            
+            result = tool_success("query_result", python_results)
+            if truncated:
+                result["truncated"] = True
+                result["message"] = f"Results truncated to {len(python_results)} documents ({max_bytes} byte budget). Refine the query or use a projection."
+            return result
+            
+        except PyMongoError as e:
+            return tool_error(f"MongoDB error: {str(e)}")
+        except Exception as e:
+            return tool_error(f"Error: {str(e)}")
+    
+    def graph_lookup(self, collection_name: str, start_with: Any, connect_from: str, 
+                     connect_to: str, as_field: str, max_depth: int = None) -> Dict[str, Any]:
+        """
+        Perform graph traversal using $graphLookup.
+        
+        Example: Find all positions related to a trade through hierarchies
+        
+        Args:
+            collection_name: Collection to traverse
+            start_with: Starting value (e.g., trade_id)
+            connect_from: Field to connect from
+            connect_to: Field to connect to
+            as_field: Output field name
+            max_depth: Maximum recursion depth
+        
+        This traverses from every document in the collection. Prefer traverse_graph,
+        which narrows the start documents and bounds the traversal.
+        """
+        pipeline = [
+            {
+                "$graphLookup": {
+                    "from": collection_name,
+                    "startWith": start_with,
+                    "connectFromField": connect_from,
+                    "connectToField": connect_to,
+                    "as": as_field,
+                    "maxDepth": max_depth if max_depth else 10
+                }
+            }
+        ]
+        
+        return self.send_query(collection_name, pipeline=pipeline)
+    
+    def has_index_on(self, collection_name: str, field: str) -> bool:
+        """Whether some index on the collection can be used to look up documents by field."""
+        index_information = self._db[collection_name].index_information()
+        return any(index["key"][0][0] == field for index in index_information.values())
+
+    def traverse_graph(self, collection_name: str, start_filter: dict, start_with: Any, connect_from: str,
+                       connect_to: str, as_field: str, max_depth: int = 2, from_collection: str = None,
+                       restrict_search_with_match: dict = None, depth_field: str = None,
+                       start_limit: int = None, max_results: int = None, projection: dict = None,
+                       create_index: bool = False, explain: bool = False) -> Dict[str, Any]:
+        """
+        Perform a bounded graph traversal: $match the start documents, then $graphLookup from them.
+        
+        Example: Find the positions and breaks connected to one trade
+            traverse_graph("relationships", {"Source": "T9012"}, "$Target",
+                           connect_from="Target", connect_to="Source", as_field="connected",
+                           max_depth=2, depth_field="depth")
+        
+        Args:
+            collection_name: Collection holding the start documents
+            start_filter: $match filter selecting the start documents
+            start_with: Expression for the values to start from (e.g., "$Trade_ID")
+            connect_from: Field to connect from
+            connect_to: Field to connect to, which should be indexed on the traversed collection
+            as_field: Output field name
+            max_depth: Maximum recursion depth (0 is a single lookup)
+            from_collection: Collection to traverse. Defaults to collection_name.
+            restrict_search_with_match: Filter on the documents visited during the traversal
+            depth_field: Field on each visited document recording its depth
+            start_limit: Maximum number of start documents
+            max_results: Maximum number of visited documents kept per start document
+            projection: Projection applied after the traversal
+            create_index: Create a missing index on connect_to rather than only advising it
+            explain: Also run explain to report the documents the server examined
+        
+        Returns:
+            Dict with status, results and 'traversal_stats'. When connect_to is not indexed,
+            includes an 'index_advice' message.
+        """
+        from_collection = from_collection or collection_name
+        index_advice = None
+        try:
+            if not self.has_index_on(from_collection, connect_to):
+                if create_index:
+                    indexed = self.create_indexes(from_collection, [connect_to])
+                    if indexed["status"] == "error":
+                        return indexed
+                else:
+                    index_advice = (f"{from_collection}.{connect_to} is not indexed, so every traversal step scans the collection. "
+                                    f"Call traverse_graph with create_index=True or create the index.")
+        except PyMongoError as e:
+            return tool_error(f"MongoDB error: {str(e)}")
+
+        graph_lookup = {
+            "from": from_collection,
+            "startWith": start_with,
+            "connectFromField": connect_from,
+            "connectToField": connect_to,
+            "as": as_field,
+            "maxDepth": max_depth,
+        }
+        if restrict_search_with_match:
+            graph_lookup["restrictSearchWithMatch"] = restrict_search_with_match
+        if depth_field:
+            graph_lookup["depthField"] = depth_field
+
+        pipeline = [{"$match": start_filter}]
+        if start_limit:
+            pipeline.append({"$limit": start_limit})
+        pipeline.append({"$graphLookup": graph_lookup})
+        pipeline.append({"$set": {"_visited_count": {"$size": f"${as_field}"}}})
+        if max_results:
+            pipeline.append({"$set": {as_field: {"$slice": [f"${as_field}", max_results]}}})
+        if projection:
+            # an exclusion projection keeps _visited_count already, and can't be mixed with inclusions
+            excludes = all(value in (0, False) for field, value in projection.items() if field != "_id")
+            pipeline.append({"$project": projection if excludes else {**projection, "_visited_count": 1}})
+
+        result = self.send_query(collection_name, pipeline=pipeline)
+        if result["status"] == "error":
+            return result
+
+        visited = sum(doc.pop("_visited_count", 0) for doc in result["query_result"])
+        returned = sum(len(doc.get(as_field, [])) for doc in result["query_result"])
+        stats = {
+            "start_documents": len(result["query_result"]),
+            "visited_documents": visited,
+            "returned_documents": returned,
+        }
+        if explain:
+            stats["documents_examined"] = self._documents_examined(collection_name, pipeline)
+        result["traversal_stats"] = stats
+        if index_advice:
+            result["index_advice"] = index_advice
+        return result
+
+    def _documents_examined(self, collection_name: str, pipeline: list) -> Optional[int]:
+        """Total documents examined according to the server's explain output, if reported."""
+        try:
+            explained = self._db.command(
+                "explain",
+                {"aggregate": collection_name, "pipeline": pipeline, "cursor": {}},
+                verbosity="executionStats"
+            )
+        except Exception:
+            # not every deployment (or mongomock) supports explain for aggregations
+            return None
+
+        def total_examined(value) -> int:
+            if isinstance(value, dict):
+                return sum(v if k == "totalDocsExamined" and isinstance(v, int) else total_examined(v)
+                           for k, v in value.items())
+            if isinstance(value, list):
+                return sum(total_examined(v) for v in value)
+            return 0
+
+        return total_examined(explained)
+
+    def get_import_directory(self):
+        """Returns the import directory path for CSV files."""
+        return tool_success("mongodb_import_dir", mongodb_settings()["import_dir"])
+
+    ### Bulk import ###
+
+    def create_indexes(self, collection_name: str, fields: List[str], unique: bool = False) -> Dict[str, Any]:
+        """
+        Create single-field ascending indexes, e.g. for $graphLookup connectToField lookups.
+        
+        Args:
+            collection_name: Collection to index
+            fields: Field names to index, one index per field
+            unique: Whether the indexes enforce unique values
+        """
+        try:
+            collection = self._db[collection_name]
+            index_names = [collection.create_index([(field, ASCENDING)], unique=unique) for field in fields]
+            return tool_success("index_names", index_names)
+        except PyMongoError as e:
+            return tool_error(f"MongoDB error: {str(e)}")
+
+    def create_key_index(self, collection_name: str, key_columns: List[str]) -> Dict[str, Any]:
+        """
+        Create a unique index on the columns identifying a document, compound when there are several.
+        
+        Args:
+            collection_name: Collection to index
+            key_columns: Columns which together identify a document, as passed to import_csv
+        """
+        try:
+            index_name = self._db[collection_name].create_index([(column, ASCENDING) for column in key_columns], unique=True)
+            return tool_success("index_names", [index_name])
+        except PyMongoError as e:
+            return tool_error(f"MongoDB error: {str(e)}")
+
+    def import_csv(self, collection_name: str, source_file: str, key_columns: List[str],
+                   properties: Optional[List[str]] = None, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Stream a CSV file into a collection with unordered, batched upserts.
+        
+        Each row is upserted on its key columns, so re-importing a file updates
+        documents in place rather than duplicating them.
+        
+        Args:
+            collection_name: Collection to import into
+            source_file: CSV file, relative to the import directory
+            key_columns: Columns which together identify a document (e.g. the unique column)
+            properties: Columns to copy onto the document. Defaults to every column.
+            batch_size: Number of rows per bulk_write
+        
+        Returns:
+            Dict with status and import statistics, including rows_per_second
+        """
+        file_path = Path(self.get_import_directory()["mongodb_import_dir"]) / source_file
+        if not file_path.exists():
+            return tool_error(f"File does not exist in import directory: {source_file}")
+
+        stats = {"collection": collection_name, "source_file": source_file,
+                 "rows": 0, "skipped_rows": 0, "upserted": 0, "modified": 0}
+        started = time.perf_counter()
+        try:
+            collection = self._db[collection_name]
+            for batch in read_csv_batches(file_path, batch_size):
+                operations = []
+                for row in batch:
+                    key = {column: row.get(column) for column in key_columns}
+                    if any(value in (None, "") for value in key.values()):
+                        stats["skipped_rows"] += 1
+                        continue
+                    fields = {k: row.get(k) for k in properties} if properties is not None else row
+                    operations.append(UpdateOne(key, {"$set": {**fields, **key}}, upsert=True))
+                stats["rows"] += len(batch)
+                if not operations:
+                    continue
+                result = collection.bulk_write(operations, ordered=False)
+                stats["upserted"] += result.upserted_count
+                stats["modified"] += result.modified_count
+        except BulkWriteError as e:
+            return tool_error(f"MongoDB bulk write error: {e.details.get('writeErrors', [])[:3]}")
+        except PyMongoError as e:
+            return tool_error(f"MongoDB error: {str(e)}")
+
+        stats["seconds"] = time.perf_counter() - started
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return tool_success("import_stats", stats)
+
+    def _plan_imports(self, construction_plan: dict) -> Dict[str, Dict[str, Any]]:
+        """
+        Map a Neo4j construction plan onto collection imports.
+        
+        Node rules become one collection per label, keyed on the unique column.
+        Relationship rules only need their endpoint columns indexed for $graphLookup,
+        unless their source file is not already imported by a node rule,
+        in which case the file becomes its own collection keyed on both endpoints.
+        """
+        imports = {}
+        indexed_fields = {}
+        collections_by_file = {}
+        for construction in construction_plan.values():
+            if construction["construction_type"] == "node":
+                imports[construction["label"]] = {
+                    "source_file": construction["source_file"],
+                    "key_columns": [construction["unique_column_name"]],
+                    "properties": [construction["unique_column_name"], *construction["properties"]],
+                }
+                collections_by_file[construction["source_file"]] = construction["label"]
+        for construction in construction_plan.values():
+            if construction["construction_type"] != "relationship":
+                continue
+            endpoints = [construction["from_node_column"], construction["to_node_column"]]
+            collection_name = collections_by_file.get(construction["source_file"])
+            if collection_name is None:
+                collection_name = Path(construction["source_file"]).stem
+                collections_by_file[construction["source_file"]] = collection_name
+                imports[collection_name] = {
+                    "source_file": construction["source_file"],
+                    "key_columns": endpoints,
+                    "properties": [*endpoints, *construction["properties"]],
+                }
+            elif imports[collection_name]["properties"] is not None:
+                # make sure the endpoint columns are copied onto the node documents
+                for column in [*endpoints, *construction["properties"]]:
+                    if column not in imports[collection_name]["properties"]:
+                        imports[collection_name]["properties"].append(column)
+            indexed_fields.setdefault(collection_name, set()).update(endpoints)
+        for collection_name, spec in imports.items():
+            # a single key column is already indexed by the key index; each column of a compound key
+            # still needs its own index for $graphLookup, which looks up one field at a time
+            key_fields = set(spec["key_columns"]) if len(spec["key_columns"]) == 1 else set()
+            spec["index_fields"] = sorted(indexed_fields.get(collection_name, set()) - key_fields)
+        return imports
+
+    def _import_collection(self, collection_name: str, spec: Dict[str, Any], batch_size: int) -> Dict[str, Any]:
+        """Index then import one collection of a planned import."""
+        # a unique index on the key makes each upsert an index lookup instead of a collection scan
+        indexed = self.create_key_index(collection_name, spec["key_columns"])
+        if indexed["status"] == "error":
+            return indexed
+        if spec["index_fields"]:
+            indexed = self.create_indexes(collection_name, spec["index_fields"])
+            if indexed["status"] == "error":
+                return indexed
+        return self.import_csv(collection_name, spec["source_file"], spec["key_columns"], spec["properties"], batch_size)
+
+    def _summarize_imports(self, names: List[str], results: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+        errors = {name: result["error_message"] for name, result in zip(names, results) if result["status"] == "error"}
+        if errors:
+            return tool_error(f"Import failed for collections: {errors}")
+
+        collection_stats = {name: result["import_stats"] for name, result in zip(names, results)}
+        total_rows = sum(stats["rows"] for stats in collection_stats.values())
+        return tool_success("import_stats", {
+            "collections": collection_stats,
+            "total_rows": total_rows,
+            "seconds": seconds,
+            "rows_per_second": total_rows / seconds if seconds > 0 else 0.0,
+        })
+
+    def import_construction_plan(self, construction_plan: dict, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Import the files of a construction plan (the same dict construct_domain_graph consumes).
+        
+        Key columns get a unique index before import, and relationship endpoint
+        columns get an index for use as $graphLookup connectFromField/connectToField.
+        
+        Returns:
+            Dict with status and per-collection import statistics, plus totals
+        """
+        imports = self._plan_imports(construction_plan)
+        started = time.perf_counter()
+        names = list(imports.keys())
+        results = [self._import_collection(name, imports[name], batch_size) for name in names]
+        return self._summarize_imports(names, results, time.perf_counter() - started)
+
+    async def import_construction_plan_async(self, construction_plan: dict, batch_size: int = 1000,
+                                             concurrency: int = 4) -> Dict[str, Any]:
+        """
+        Same as import_construction_plan, running up to `concurrency` collection imports at once.
+        """
+        imports = self._plan_imports(construction_plan)
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+
+        async def import_collection(name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self._import_collection, name, imports[name], batch_size)
+
+        names = list(imports.keys())
+        results = await asyncio.gather(*(import_collection(name) for name in names))
+        return self._summarize_imports(names, list(results), time.perf_counter() - started)
+
+
+graphdb = MongoDBForADK()
+
+# Register cleanup function to close database connection on exit
+atexit.register(graphdb.close)
@@ -0,0 +1,514 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional
+import atexit
+
+from .column_types import COERCE_PROPERTY_CYPHER
+from .row_filters import ROW_FILTER_CYPHER
+
+# The neo4j driver is imported, and the .env file read, only when the first query is sent,
+# so importing this module (or tools.py) stays cheap and opens no connections.
+if TYPE_CHECKING:
+    from neo4j import Result
+
+# Same values as neo4j.READ_ACCESS and neo4j.WRITE_ACCESS
+READ_ACCESS = "READ"
+WRITE_ACCESS = "WRITE"
+
+@lru_cache(maxsize=1)
+def neo4j_settings() -> Dict[str, Any]:
+    """Connection settings, read from the environment (and .env file) once."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        "uri": os.getenv("NEO4J_URI"),
+        "username": os.getenv("NEO4J_USERNAME") or "neo4j",
+        "password": os.getenv("NEO4J_PASSWORD"),
+        "database": os.getenv("NEO4J_DATABASE") or os.getenv("NEO4J_USERNAME") or "neo4j",
+        "max_query_retries": int(os.getenv("NEO4J_MAX_QUERY_RETRIES") or 5),
+    }
+
+@lru_cache(maxsize=1)
+def retryable_errors() -> tuple:
+    """Failures worth retrying: deadlocks, lock timeouts and leader switches."""
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+    return (TransientError, ServiceUnavailable, SessionExpired)
+
+RETRY_INITIAL_DELAY_SECONDS = 0.1
+RETRY_MAX_DELAY_SECONDS = 5.0
+
+def tool_success(key:str,result: Any) -> Dict[str, Any]:
+    """Convenience function to return a success result."""
+    return {
+        'status': 'success',
+        key: result
+    }
+
+def tool_error(message: str) -> Dict[str, Any]:
+    """Convenience function to return an error result."""
+    return {
+        'status': 'error',
+        'error_message': message
+    }
+
+def sanitize(cypher_name: str) -> str:
+    """Very basic string sanitization when a query param is not possible."""
+    return re.sub(r"[.,\-:$()><{}[\]'\"`\s]", '', cypher_name)
+
+def to_python(value):
+    from neo4j.graph import Node, Relationship, Path
+    from neo4j import Record
+    import neo4j.time
+    if isinstance(value, Record):
+        return {k: to_python(v) for k, v in value.items()}
+    elif isinstance(value, dict):
+        return {k: to_python(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [to_python(v) for v in value]
+    elif isinstance(value, Node):
+        return {
+            "id": value.id,
+            "labels": list(value.labels),
+            "properties": to_python(dict(value))
+        }
+    elif isinstance(value, Relationship) and value.start_node and value.end_node:
+        return {
+            "id": value.id,
+            "type": value.type,
+            "start_node": value.start_node.element_id,
+            "end_node": value.end_node.element_id,
+            "properties": to_python(dict(value))
+        }
+    elif isinstance(value, Path):
+        return {
+            "nodes": [to_python(node) for node in value.nodes],
+            "relationships": [to_python(rel) for rel in value.relationships]
+        }
+    elif isinstance(value, neo4j.time.DateTime):
+        return value.iso_format()
+    elif isinstance(value, (neo4j.time.Date, neo4j.time.Time, neo4j.time.Duration)):
+        return str(value)
+    else:
+        return value
+
+
+def result_to_adk(result: "Result") -> Dict[str, Any]:
+    eager_result = result.to_eager_result()
+    records = [to_python(record.data()) for record in eager_result.records]
+    return tool_success("query_result",records)
+
+
+# Clauses which modify the graph or the schema.
+# Anything matching is routed to the leader, everything else may be served by a follower.
+WRITE_QUERY_PATTERN = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|LOAD\s+CSV|FOREACH|IN\s+TRANSACTIONS)\b",
+    re.IGNORECASE
+)
+
+# Procedure calls (CALL name.space.procedure, as opposed to CALL { ... } subqueries).
+# Procedures can write (db.index.vector.createNodeIndex, gds.*.write, apoc.do.*, apoc.cypher.doIt, ...),
+# so every procedure counts as a write unless it is one of these known read-only ones.
+PROCEDURE_CALL_PATTERN = re.compile(r"\bCALL\s+([A-Za-z_]\w*(?:\.\w+)+)", re.IGNORECASE)
+READ_PROCEDURE_PATTERN = re.compile(
+    r"^(db\.(labels|relationshipTypes|propertyKeys|indexes|constraints|info|ping|awaitIndex|awaitIndexes"
+    r"|schema\.\w+|index\.(vector|fulltext)\.query\w*)"
+    r"|dbms\.(components|listConfig|showCurrentUser|procedures|functions)"
+    r"|apoc\.meta\.\w+)$",
+    re.IGNORECASE
+)
+
+# `CALL { ... } IN TRANSACTIONS` manages its own transactions, so it must run as an auto-commit query.
+IN_TRANSACTIONS_PATTERN = re.compile(r"\bIN\s+(CONCURRENT\s+)?TRANSACTIONS\b", re.IGNORECASE)
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (zero-based) retry attempt."""
+    ceiling = min(RETRY_MAX_DELAY_SECONDS, RETRY_INITIAL_DELAY_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+def error_class(error: Exception) -> str:
+    """Neo4j status code (e.g. Neo.TransientError.Transaction.DeadlockDetected) or exception name."""
+    return getattr(error, "code", None) or type(error).__name__
+
+def make_idempotency_key(cypher_query: str, parameters: Optional[Dict[str, Any]]) -> str:
+    """Stable key identifying a query and its parameters across retries."""
+    payload = json.dumps([cypher_query, parameters or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def infer_access_mode(cypher_query: str) -> str:
+    """Guess whether a query only reads, returning READ_ACCESS or WRITE_ACCESS.
+
+    The guess errs on the side of WRITE_ACCESS, which is always safe to run on the leader.
+    """
+    if WRITE_QUERY_PATTERN.search(cypher_query):
+        return WRITE_ACCESS
+    if any(not READ_PROCEDURE_PATTERN.match(name) for name in PROCEDURE_CALL_PATTERN.findall(cypher_query)):
+        return WRITE_ACCESS
+    return READ_ACCESS
+
+
+### Query templates ###
+
+# relationship rows with both endpoints, passing $row_filters
+KEEP_RELATIONSHIP_ROW_CYPHER = """row[$from_node_column] IS NOT NULL AND row[$to_node_column] IS NOT NULL
+        AND """ + ROW_FILTER_CYPHER
+
+# rows read and kept by a relationship import, counted in a separate read of the file when asked for
+COUNT_RELATIONSHIP_ROWS_QUERY = """LOAD CSV WITH HEADERS FROM "file:///" + $source_file AS row
+RETURN count(*) AS rows_read, count(CASE WHEN """ + KEEP_RELATIONSHIP_ROW_CYPHER + """ THEN 1 END) AS rows_kept
+"""
+
+def _template_fragment(cypher: str) -> str:
+    """Cypher spliced into a query template, with its braces (e.g. regex quantifiers) escaped for str.format."""
+    return cypher.replace("{", "{{").replace("}", "}}")
+
+COERCE_PROPERTY_TEMPLATE = _template_fragment(COERCE_PROPERTY_CYPHER)
+# the same for values[i], the value of column $properties[i]
+COERCE_VALUE_TEMPLATE = _template_fragment(
+    COERCE_PROPERTY_CYPHER.replace("$property_types[k]", "$property_types[$properties[i]]").replace("row[k]", "values[i]")
+)
+
+# Queries which need label or property key names spliced into the text.
+# Rendering a template always produces the same text for the same identifiers,
+# so repeated imports hit Neo4j's query plan cache instead of being replanned.
+# Everything else (labels via $(...), property values, property lists) is passed as parameters.
+# Property values are converted to the types in $property_types (see column_types).
+QUERY_TEMPLATES: Dict[str, str] = {
+    "create_uniqueness_constraint": """CREATE CONSTRAINT `{label}_{key}_constraint` IF NOT EXISTS
+    FOR (n:`{label}`)
+    REQUIRE n.`{key}` IS UNIQUE""",
+
+    "create_range_index": """CREATE RANGE INDEX `{label}_{key}_range` IF NOT EXISTS
+    FOR (n:`{label}`)
+    ON (n.`{key}`)""",
+
+    # rows with an empty key are skipped, a null can't be merged on
+    "load_nodes_from_csv": """LOAD CSV WITH HEADERS FROM "file:///" + $source_file AS row
+    WITH row WHERE row[$unique_column_name] IS NOT NULL
+    CALL (row) {{
+        MERGE (n:$($label) {{ `{unique_column_name}` : row[$unique_column_name] }})
+        FOREACH (k IN $properties | SET n[k] = """ + COERCE_PROPERTY_TEMPLATE + """)
+    }} IN TRANSACTIONS OF 1000 ROWS
+    """,
+
+    # rows with an empty endpoint, or failing $row_filters, are dropped before the subquery,
+    # so they cost no subquery call or endpoint lookup. The file is read once, so only the
+    # rows merged are counted (see COUNT_RELATIONSHIP_ROWS_QUERY for the rest).
+    "import_relationships": """LOAD CSV WITH HEADERS FROM "file:///" + $source_file AS row
+    WITH row WHERE """ + KEEP_RELATIONSHIP_ROW_CYPHER + """
+    CALL (row) {{
+        MATCH (from_node:$($from_node_label) {{ `{from_node_column}` : row[$from_node_column] }}),
+              (to_node:$($to_node_label) {{ `{to_node_column}` : row[$to_node_column] }} )
+        MERGE (from_node)-[r:$($relationship_type)]->(to_node)
+        FOREACH (k IN $properties | SET r[k] = """ + COERCE_PROPERTY_TEMPLATE + """)
+    }} IN TRANSACTIONS OF 1000 ROWS
+    RETURN count(*) AS rows_merged
+    """,
+
+    # same, skipping rows which repeat the endpoints and property values of an earlier row. DISTINCT streams,
+    # remembering only those projected values rather than whole rows, and rows of a pair with different
+    # property values are all merged in order, so the last row's properties win as without dedupe.
+    "import_relationships_distinct": """LOAD CSV WITH HEADERS FROM "file:///" + $source_file AS row
+    WITH row WHERE """ + KEEP_RELATIONSHIP_ROW_CYPHER + """
+    WITH DISTINCT row[$from_node_column] AS from_key, row[$to_node_column] AS to_key, [k IN $properties | row[k]] AS values
+    CALL (from_key, to_key, values) {{
+        MATCH (from_node:$($from_node_label) {{ `{from_node_column}` : from_key }}),
+              (to_node:$($to_node_label) {{ `{to_node_column}` : to_key }} )
+        MERGE (from_node)-[r:$($relationship_type)]->(to_node)
+        FOREACH (i IN range(0, size($properties) - 1) | SET r[$properties[i]] = """ + COERCE_VALUE_TEMPLATE + """)
+    }} IN TRANSACTIONS OF 1000 ROWS
+    RETURN count(*) AS rows_merged
+    """,
+
+    # batched writes of rows read by the client, used by delta imports
+    "upsert_nodes": """UNWIND $rows AS row
+    MERGE (n:$($label) {{ `{unique_column_name}` : row.key }})
+    SET n += row.properties
+    RETURN count(n) AS count
+    """,
+
+    "delete_nodes": """UNWIND $keys AS key
+    MATCH (n:$($label) {{ `{unique_column_name}` : key }})
+    DETACH DELETE n
+    RETURN count(*) AS count
+    """,
+
+    "upsert_relationships": """UNWIND $rows AS row
+    MATCH (from_node:$($from_node_label) {{ `{from_node_column}` : row.from_key }}),
+          (to_node:$($to_node_label) {{ `{to_node_column}` : row.to_key }})
+    MERGE (from_node)-[r:$($relationship_type)]->(to_node)
+    SET r += row.properties
+    // rows whose endpoints don't both exist merge nothing, and are missing from merged_keys
+    RETURN count(r) AS count, collect([row.from_key, row.to_key]) AS merged_keys
+    """,
+
+    "delete_relationships": """UNWIND $rows AS row
+    MATCH (:$($from_node_label) {{ `{from_node_column}` : row.from_key }})
+          -[r:$($relationship_type)]->
+          (:$($to_node_label) {{ `{to_node_column}` : row.to_key }})
+    DELETE r
+    RETURN count(*) AS count
+    """,
+}
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def validate_identifier(name: str) -> str:
+    """Returns the name if it is safe to splice into a query as a label or property key.
+
+    Raises:
+        ValueError: if the name is not a plain identifier.
+    """
+    if not isinstance(name, str) or not IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid label or property key for a query template: {name!r}")
+    return name
+
+def register_query_template(name: str, template: str):
+    """Adds (or replaces) a named query template."""
+    QUERY_TEMPLATES[name] = template
+    _render_query_template.cache_clear()
+
+@lru_cache(maxsize=256)
+def _render_query_template(name: str, identifiers: tuple) -> str:
+    for _, value in identifiers:
+        validate_identifier(value)
+    return QUERY_TEMPLATES[name].format(**dict(identifiers))
+
+def render_query(name: str, **identifiers: str) -> str:
+    """Renders a named query template, validating the identifiers on first use.
+
+    Args:
+        name: Name of a template in QUERY_TEMPLATES.
+        identifiers: Label and property key names to splice into the template.
+
+    Returns:
+        The query text, identical for identical identifiers.
+    """
+    return _render_query_template(name, tuple(sorted(identifiers.items())))
+
+
+class Neo4jForADK:
+    """
+    A wrapper for querying Neo4j which returns ADK-friendly responses.
+
+    The driver is created on first use, so constructing the wrapper is free.
+    Use the module-level `graphdb` rather than creating another instance,
+    so the whole process shares one driver, connection pool and cache.
+    """
+    _driver = None
+    _bookmark_manager = None
+
+    def __init__(self):
+        self._driver_lock = threading.Lock()
+        self._query_metrics = {
+            READ_ACCESS: {"count": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+            WRITE_ACCESS: {"count": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        }
+        self._error_counts: Dict[str, int] = {}
+        # queries are sent from several threads at once (e.g. parallel_import), so counters are updated under a lock
+        self._metrics_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._query_cache: Dict[tuple, tuple] = {}
+        self._write_generation = 0
+
+    @property
+    def database_name(self) -> str:
+        return neo4j_settings()["database"]
+
+    @property
+    def max_retries(self) -> int:
+        return neo4j_settings()["max_query_retries"]
+
+    def get_driver(self):
+        """Returns the driver, connecting on first use."""
+        if self._driver is None:
+            with self._driver_lock:
+                if self._driver is None:
+                    from neo4j import GraphDatabase
+                    settings = neo4j_settings()
+                    if not settings["uri"]:
+                        raise ValueError("NEO4J_URI environment variable is not set.")
+                    if not settings["password"]:
+                        raise ValueError("NEO4J_PASSWORD environment variable is not set.")
+                    # sessions share a bookmark manager so that reads routed to a follower
+                    # always observe the writes made previously through this wrapper
+                    self._bookmark_manager = GraphDatabase.bookmark_manager()
+                    self._driver = GraphDatabase.driver(
+                        settings["uri"],
+                        auth=(settings["username"], settings["password"]),
+                        # retries are done by send_query, where they can be counted and backed off with jitter
+                        max_transaction_retry_time=0
+                    )
+        return self._driver
+    
+    def close(self):
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
+    
+    def send_query(self, cypher_query, parameters=None, access_mode: Optional[str] = None,
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Send a query to Neo4j, returning an ADK-friendly result.
+
+        Reads run in execute_read and writes in execute_write, except for
+        `CALL { ... } IN TRANSACTIONS` queries which must be auto-commit.
+        Transient failures such as deadlocks are retried with exponential backoff.
+
+        Args:
+            cypher_query: The Cypher query to run.
+            parameters: Optional query parameters.
+            access_mode: READ_ACCESS ("READ") or WRITE_ACCESS ("WRITE").
+                When omitted, the mode is inferred from the query text.
+                Reads are routed to followers in a cluster.
+            idempotency_key: Optional key attached as transaction metadata to every attempt.
+                Defaults to a hash of the query and its parameters.
+        """
+        access_mode = access_mode or infer_access_mode(cypher_query)
+        if access_mode not in (READ_ACCESS, WRITE_ACCESS):
+            return tool_error(f"Unknown access mode: {access_mode}. Use {READ_ACCESS!r} or {WRITE_ACCESS!r}.")
+        parameters = parameters or {}
+        metadata = {
+            "idempotency_key": idempotency_key or make_idempotency_key(cypher_query, parameters),
+            "access_mode": access_mode,
+        }
+        started = time.perf_counter()
+        failed = False
+        session = None
+        try:
+            session = self.get_driver().session(
+                database=self.database_name,
+                default_access_mode=access_mode,
+                bookmark_manager=self._bookmark_manager
+            )
+            return self._run_with_retries(session, cypher_query, parameters, access_mode, metadata)
+        except Exception as e:
+            failed = True
+            return tool_error(str(e))
+        finally:
+            if session is not None:
+                session.close()
+            if access_mode == WRITE_ACCESS:
+                # even a failed write may have committed some batches
+                self.invalidate_cache()
+            self._record_query_metrics(access_mode, time.perf_counter() - started, failed)
+
+    def _run_with_retries(self, session, cypher_query, parameters, access_mode, metadata) -> Dict[str, Any]:
+        from neo4j import Query, unit_of_work
+        from neo4j.exceptions import Neo4jError
+        attempt = 0
+        while True:
+            attempt_metadata = {**metadata, "attempt": attempt}
+            try:
+                if IN_TRANSACTIONS_PATTERN.search(cypher_query):
+                    result = session.run(Query(cypher_query, metadata=attempt_metadata), parameters)
+                    return result_to_adk(result)
+
+                @unit_of_work(metadata=attempt_metadata)
+                def work(tx):
+                    return result_to_adk(tx.run(cypher_query, parameters))
+
+                if access_mode == READ_ACCESS:
+                    return session.execute_read(work)
+                return session.execute_write(work)
+            except retryable_errors() as e:
+                self._count_error(e)
+                if attempt >= self.max_retries:
+                    raise
+                with self._metrics_lock:
+                    self._query_metrics[access_mode]["retries"] += 1
+                time.sleep(retry_delay(attempt))
+                attempt += 1
+            except Neo4jError as e:
+                self._count_error(e)
+                raise
+
+    def _count_error(self, error: Exception):
+        key = error_class(error)
+        with self._metrics_lock:
+            self._error_counts[key] = self._error_counts.get(key, 0) + 1
+
+    def _record_query_metrics(self, access_mode: str, seconds: float, failed: bool):
+        with self._metrics_lock:
+            metrics = self._query_metrics[access_mode]
+            metrics["count"] += 1
+            metrics["total_seconds"] += seconds
+            metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+            if failed:
+                metrics["errors"] += 1
+
+    def get_query_metrics(self) -> Dict[str, Any]:
+        """Returns query counts and latency per access mode (READ and WRITE)."""
+        summary = {}
+        with self._metrics_lock:
+            for access_mode, metrics in self._query_metrics.items():
+                count = metrics["count"]
+                summary[access_mode] = {
+                    **metrics,
+                    "mean_seconds": metrics["total_seconds"] / count if count else 0.0,
+                }
+            summary["errors_by_class"] = dict(self._error_counts)
+        return tool_success("query_metrics", summary)
+
+    def reset_query_metrics(self):
+        with self._metrics_lock:
+            for metrics in self._query_metrics.values():
+                metrics.update(count=0, errors=0, retries=0, total_seconds=0.0, max_seconds=0.0)
+            self._error_counts.clear()
+
+    ### Cache ###
+
+    def cached_query(self, cypher_query, parameters=None) -> Dict[str, Any]:
+        """Send a read query, reusing the previous result until a write goes through this wrapper.
+
+        The cache is shared by everything in the process, since there is a single graphdb.
+        Only successful results are cached.
+        """
+        key = (cypher_query, json.dumps(parameters or {}, sort_keys=True, default=str))
+        with self._cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None and cached[0] == self._write_generation:
+                return cached[1]
+            generation = self._write_generation
+        result = self.send_query(cypher_query, parameters, access_mode=READ_ACCESS)
+        if result["status"] == "success":
+            with self._cache_lock:
+                self._query_cache[key] = (generation, result)
+        return result
+
+    def invalidate_cache(self):
+        """Forget all cached results, e.g. after writing to the database through another driver."""
+        with self._cache_lock:
+            self._write_generation += 1
+            self._query_cache.clear()
+
+    @property
+    def write_generation(self) -> int:
+        """Incremented by every write sent through this wrapper, for caches built on top of it."""
+        return self._write_generation
+
+    def get_import_directory(self):
+        """Returns the Neo4j import directory, as configured on the server or by NEO4J_IMPORT_DIR."""
+        results = self.cached_query("""
+            Call dbms.listConfig() YIELD name, value
+            WHERE name CONTAINS 'server.directories.import'
+            RETURN value as import_dir
+            """)
+        if results["status"] == "success" and results["query_result"]:
+            return tool_success("neo4j_import_dir",results["query_result"][0]["import_dir"])
+        neo4j_import_dir = os.getenv("NEO4J_IMPORT_DIR")
+        if neo4j_import_dir:
+            return tool_success("neo4j_import_dir", neo4j_import_dir)
+        if results["status"] == "error":
+            return tool_error(results["error_message"])
+        return tool_error("The Neo4j import directory is not configured.")
+
+
+graphdb = Neo4jForADK()
+
+# Register cleanup function to close database connection on exit
+atexit.register(graphdb.close)
\ No newline at end of file
@@ -0,0 +1,229 @@
+# Validation of construction plans against their source files, before anything is written to Neo4j.
+#
+# Every source file is read once, however many rules use it. The checks mirror how the loaders behave:
+#   - node rules MERGE on the unique column, so empty keys are skipped and duplicate keys collapse
+#   - relationship rules MATCH each endpoint on the node property named by the endpoint column,
+#     so rows with empty values, or values no node has, silently create nothing
+#     (rows failing the rule's row_filters are left out of the checks, like the loaders skip them)
+# Problems which would make a rule import nothing (or fail) are errors, data quality issues are warnings.
+# Keys, endpoint values and endpoint pairs are staged in a temporary SQLite file rather than held in memory,
+# so validating large files takes disk space rather than memory.
+
+import os
+import csv
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from .neo4j_for_adk import tool_success
+from .row_filters import check_row_filters, row_passes_filters
+
+MAX_EXAMPLES = 5
+STAGING_BATCH_SIZE = 10000
+
+NODE_KEYS_QUERY = "SELECT count(*), count(CASE WHEN count > 1 THEN 1 END) FROM node_keys WHERE rule = ?"
+DUPLICATE_KEYS_QUERY = "SELECT key FROM node_keys WHERE rule = ? AND count > 1 LIMIT ?"
+ESTIMATED_NODES_QUERY = "SELECT count(*) FROM (SELECT DISTINCT label, key FROM node_keys)"
+
+# whether a pair's endpoints are values some node of the endpoint label has
+RESOLVED_PAIR_SQL = """EXISTS(SELECT 1 FROM node_values WHERE label = :from_label AND property = :from_column AND value = p.start_key)
+    AND EXISTS(SELECT 1 FROM node_values WHERE label = :to_label AND property = :to_column AND value = p.end_key)"""
+
+RELATIONSHIP_PAIRS_QUERY = """SELECT count(*), count(CASE WHEN resolved THEN 1 END), coalesce(sum(CASE WHEN resolved THEN 0 ELSE count END), 0)
+FROM (SELECT p.count, """ + RESOLVED_PAIR_SQL + """ AS resolved FROM pairs p WHERE p.rule = :rule)"""
+
+DANGLING_EXAMPLES_QUERY = """SELECT DISTINCT CASE WHEN EXISTS(SELECT 1 FROM node_values WHERE label = :from_label AND property = :from_column AND value = p.start_key)
+    THEN p.end_key ELSE p.start_key END
+FROM pairs p WHERE p.rule = :rule AND NOT (""" + RESOLVED_PAIR_SQL + """) LIMIT :limit"""
+
+
+def _required_columns(construction: Dict[str, Any]) -> List[str]:
+    if construction["construction_type"] == "node":
+        return [construction["unique_column_name"]] + list(construction["properties"])
+    filter_columns = [row_filter["column"] for row_filter in construction.get("row_filters") or []]
+    return [construction["from_node_column"], construction["to_node_column"]] + list(construction["properties"]) + filter_columns
+
+def _endpoint_properties(construction_plan: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """For each node label, the node rules (by name) providing each property, unique column included."""
+    provided: Dict[str, Dict[str, List[str]]] = {}
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] == "node":
+            label_properties = provided.setdefault(construction["label"], {})
+            for column in [construction["unique_column_name"]] + list(construction["properties"]):
+                label_properties.setdefault(column, []).append(name)
+    return provided
+
+def _open_staging() -> Tuple[sqlite3.Connection, str]:
+    """A scratch SQLite database for the values being checked, removed by the caller."""
+    handle, staging_path = tempfile.mkstemp(prefix="plan_validation_", suffix=".sqlite")
+    os.close(handle)
+    connection = sqlite3.connect(staging_path)
+    # scratch data, so no journal or syncing
+    connection.execute("PRAGMA journal_mode = OFF")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.execute("PRAGMA cache_size = -262144")  # 256 MiB
+    connection.execute("CREATE TABLE node_keys (rule TEXT NOT NULL, label TEXT NOT NULL, key TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (rule, key)) WITHOUT ROWID")
+    connection.execute("CREATE TABLE node_values (label TEXT NOT NULL, property TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (label, property, value)) WITHOUT ROWID")
+    connection.execute("CREATE TABLE pairs (rule TEXT NOT NULL, start_key TEXT NOT NULL, end_key TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (rule, start_key, end_key)) WITHOUT ROWID")
+    return connection, staging_path
+
+def _stage(connection: sqlite3.Connection, keys: List[Tuple[str, str, str]], values: List[Tuple[str, str, str]], pairs: List[Tuple[str, str, str]]) -> None:
+    """Adds a batch of node keys, endpoint values and endpoint pairs to the staging database, and empties the batch."""
+    connection.executemany("INSERT INTO node_keys VALUES (?, ?, ?, 1) ON CONFLICT (rule, key) DO UPDATE SET count = count + 1", keys)
+    connection.executemany("INSERT OR IGNORE INTO node_values VALUES (?, ?, ?)", values)
+    connection.executemany("INSERT INTO pairs VALUES (?, ?, ?, 1) ON CONFLICT (rule, start_key, end_key) DO UPDATE SET count = count + 1", pairs)
+    keys.clear()
+    values.clear()
+    pairs.clear()
+
+def validate_construction_plan(construction_plan: Dict[str, Any], import_dir: str) -> Dict[str, Any]:
+    """Check a construction plan against its source files.
+
+    Args:
+        construction_plan: Construction rules keyed by name, as for construct_domain_graph.
+        import_dir: Directory the rules' source files are relative to.
+
+    Returns:
+        Success with a 'validation' report: 'valid' (no errors), 'errors', 'warnings',
+        per-rule statistics, and the estimated numbers of nodes and relationships.
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    provided = _endpoint_properties(construction_plan)
+
+    # which (label, property) value sets the relationship rules need to check their endpoints against
+    needed: Set[Tuple[str, str]] = set()
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] != "relationship":
+            continue
+        filter_problems = check_row_filters(construction.get("row_filters"))
+        if filter_problems:
+            errors += [f"{name}: {problem}" for problem in filter_problems]
+            continue
+        for side in ("from", "to"):
+            label, column = construction[f"{side}_node_label"], construction[f"{side}_node_column"]
+            if label not in provided:
+                errors.append(f"{name}: no node rule creates {label} nodes, so no {construction['relationship_type']} relationships can be created")
+            elif column not in provided[label]:
+                errors.append(f"{name}: {label} nodes have no {column} property to match the {side} column on")
+            else:
+                needed.add((label, column))
+                if not any(construction_plan[rule]["unique_column_name"] == column for rule in provided[label][column]):
+                    warnings.append(f"{name}: {label} nodes are matched on {column}, which isn't their unique column (and isn't indexed)")
+
+    node_rules: List[str] = []
+    relationship_rules: List[str] = []
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    rules_by_file: Dict[str, List[str]] = {}
+    for name, construction in construction_plan.items():
+        rules_by_file.setdefault(construction["source_file"], []).append(name)
+
+    staging, staging_path = _open_staging()
+    try:
+        # one pass over each file, for all of its rules
+        for source_file, rule_names in rules_by_file.items():
+            file_path = Path(import_dir) / source_file
+            try:
+                with open(file_path, newline="", encoding="utf-8") as f:
+                    reader = csv.DictReader(f)
+                    header = set(reader.fieldnames or [])
+                    active = []
+                    for name in rule_names:
+                        if check_row_filters(construction_plan[name].get("row_filters")):
+                            stats[name] = {"rows": 0, "empty_keys": 0}
+                            relationship_rules.append(name)
+                            continue  # already reported
+                        missing = [column for column in _required_columns(construction_plan[name]) if column not in header]
+                        if missing:
+                            errors.append(f"{name}: {source_file} has no column(s) {', '.join(missing)}")
+                        else:
+                            active.append(name)
+                        stats[name] = {"rows": 0, "empty_keys": 0}
+                        if construction_plan[name]["construction_type"] == "node":
+                            node_rules.append(name)
+                        else:
+                            relationship_rules.append(name)
+
+                    keys, values, pairs = [], [], []
+                    for row in reader:
+                        for name in active:
+                            construction = construction_plan[name]
+                            rule_stats = stats[name]
+                            rule_stats["rows"] += 1
+                            if construction["construction_type"] == "node":
+                                key = row[construction["unique_column_name"]]
+                                if not key:
+                                    rule_stats["empty_keys"] += 1
+                                    continue
+                                keys.append((name, construction["label"], key))
+                                for column in [construction["unique_column_name"]] + list(construction["properties"]):
+                                    if (construction["label"], column) in needed and row[column]:
+                                        values.append((construction["label"], column, row[column]))
+                            else:
+                                if not row_passes_filters(row, construction.get("row_filters")):
+                                    rule_stats["filtered"] = rule_stats.get("filtered", 0) + 1
+                                    continue
+                                start, end = row[construction["from_node_column"]], row[construction["to_node_column"]]
+                                if not start or not end:
+                                    rule_stats["empty_keys"] += 1
+                                    continue
+                                pairs.append((name, start, end))
+                        if len(keys) + len(values) + len(pairs) >= STAGING_BATCH_SIZE:
+                            _stage(staging, keys, values, pairs)
+                    _stage(staging, keys, values, pairs)
+            except (OSError, csv.Error, UnicodeDecodeError) as e:
+                for name in rule_names:
+                    errors.append(f"{name}: could not read {source_file}: {e}")
+                    stats.setdefault(name, {"rows": 0, "empty_keys": 0})
+
+        # node rules: key uniqueness
+        for name in node_rules:
+            construction = construction_plan[name]
+            distinct_keys, duplicate_keys = staging.execute(NODE_KEYS_QUERY, (name,)).fetchone()
+            stats[name].update(distinct_keys=distinct_keys, duplicate_keys=duplicate_keys)
+            if stats[name]["empty_keys"]:
+                warnings.append(f"{name}: {stats[name]['empty_keys']} rows have an empty {construction['unique_column_name']} and will be skipped")
+            if duplicate_keys:
+                duplicates = [key for (key,) in staging.execute(DUPLICATE_KEYS_QUERY, (name, MAX_EXAMPLES))]
+                warnings.append(f"{name}: {duplicate_keys} {construction['unique_column_name']} values appear more than once "
+                                f"(e.g. {', '.join(duplicates)}), the last row wins")
+            if stats[name]["rows"] and not distinct_keys:
+                errors.append(f"{name}: every row has an empty {construction['unique_column_name']}")
+        (estimated_nodes,) = staging.execute(ESTIMATED_NODES_QUERY).fetchone()
+
+        # relationship rules: empty join values and referential integrity
+        estimated_relationships = 0
+        for name in relationship_rules:
+            construction = construction_plan[name]
+            endpoints = {
+                "rule": name,
+                "from_label": construction["from_node_label"], "from_column": construction["from_node_column"],
+                "to_label": construction["to_node_label"], "to_column": construction["to_node_column"],
+            }
+            if (endpoints["from_label"], endpoints["from_column"]) not in needed or (endpoints["to_label"], endpoints["to_column"]) not in needed:
+                continue  # already reported
+            distinct_pairs, resolved, dangling_rows = staging.execute(RELATIONSHIP_PAIRS_QUERY, endpoints).fetchone()
+            stats[name].update(distinct_pairs=distinct_pairs, dangling_rows=dangling_rows, estimated_relationships=resolved)
+            estimated_relationships += resolved
+            if stats[name]["empty_keys"]:
+                warnings.append(f"{name}: {stats[name]['empty_keys']} rows have an empty {construction['from_node_column']} "
+                                f"or {construction['to_node_column']} and will be skipped")
+            if dangling_rows:
+                dangling_examples = [value for (value,) in staging.execute(DANGLING_EXAMPLES_QUERY, dict(endpoints, limit=MAX_EXAMPLES))]
+                warnings.append(f"{name}: {dangling_rows} rows refer to nodes which won't exist (e.g. {', '.join(dangling_examples)})")
+            if stats[name]["rows"] and not resolved:
+                errors.append(f"{name}: no row connects two existing nodes, no relationships would be created")
+    finally:
+        staging.close()
+        os.remove(staging_path)
+
+    return tool_success("validation", {
+        "valid": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "rules": stats,
+        "estimated_nodes": estimated_nodes,
+        "estimated_relationships": estimated_relationships,
+    })
@@ -0,0 +1,170 @@
+# Vector retrieval over the chunks written by the KG builder (SimpleKGPipeline in kg_construction_2),
+# expanded into the graph:
+#
+#   (chunk:Chunk {text, embedding}) <-[:FROM_CHUNK]- (entity:__Entity__) -[:CORRESPONDS_TO]-> (domain node)
+#
+# ChunkVectorIndex creates a Neo4j vector index on the chunk embeddings and answers top-k queries with
+# db.index.vector.queryNodes, an approximate (HNSW) search, instead of comparing against every chunk.
+# brute_force_search is the exact equivalent, used to measure recall (benchmarks/retrieval_benchmark.py).
+#
+# Anything with a search(query_vector, top_k) method returning the same records (e.g. LocalVectorStore in
+# local_vectors.py, for offline use) can back the ADK tool made by make_chunk_search_tool.
+
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+from .neo4j_for_adk import graphdb, tool_success, tool_error, validate_identifier, READ_ACCESS, WRITE_ACCESS
+
+# matches the text-embedding-3-large embedder used in kg_construction_2
+DEFAULT_DIMENSIONS = 3072
+SIMILARITY_FUNCTIONS = ("cosine", "euclidean")
+
+# chunks found by a search, with the entities extracted from them and the domain nodes those correspond to
+EXPAND_CHUNKS_CYPHER = """
+    OPTIONAL MATCH (entity:`__Entity__`)-[:FROM_CHUNK]->(chunk)
+    OPTIONAL MATCH (entity)-[:CORRESPONDS_TO]->(domain)
+    WITH chunk, score, entity, collect(domain {.*, labels: labels(domain)}) AS domain_nodes
+    WITH chunk, score, collect(CASE WHEN entity IS NOT NULL THEN entity {
+        .*,
+        labels: [label IN labels(entity) WHERE NOT label STARTS WITH '__'],
+        domain_nodes: domain_nodes
+    } END) AS entities
+    RETURN elementId(chunk) AS chunk_id, chunk.text AS text, score, entities
+    ORDER BY score DESC
+"""
+
+VECTOR_SEARCH_QUERY = """
+    CALL db.index.vector.queryNodes($index_name, $top_k, $query_vector) YIELD node AS chunk, score
+    RETURN elementId(chunk) AS chunk_id, chunk.text AS text, score
+"""
+
+VECTOR_SEARCH_EXPANDED_QUERY = """
+    CALL db.index.vector.queryNodes($index_name, $top_k, $query_vector) YIELD node AS chunk, score
+""" + EXPAND_CHUNKS_CYPHER
+
+# exact top-k, comparing the query with every chunk. vector.similarity.* is normalised to [0, 1]
+# like the scores of the vector index, so the two are directly comparable.
+BRUTE_FORCE_SEARCH_TEMPLATE = """
+    MATCH (chunk:`{label}`) WHERE chunk.`{property}` IS NOT NULL
+    WITH chunk, vector.similarity.{similarity}(chunk.`{property}`, $query_vector) AS score
+    ORDER BY score DESC
+    LIMIT $top_k
+    RETURN elementId(chunk) AS chunk_id, chunk.text AS text, score
+"""
+
+
+class ChunkVectorIndex:
+    """A Neo4j vector index over chunk embeddings.
+
+    Args:
+        index_name: Name of the vector index.
+        label: Label of the chunk nodes.
+        embedding_property: Property holding each chunk's embedding.
+        dimensions: Length of the embeddings.
+        similarity: "cosine" or "euclidean".
+    """
+
+    def __init__(self, index_name: str = "chunk_embeddings", label: str = "Chunk",
+                 embedding_property: str = "embedding", dimensions: int = DEFAULT_DIMENSIONS,
+                 similarity: str = "cosine"):
+        if similarity not in SIMILARITY_FUNCTIONS:
+            raise ValueError(f"similarity must be one of {', '.join(SIMILARITY_FUNCTIONS)}, not {similarity!r}")
+        if not isinstance(dimensions, int) or dimensions <= 0:
+            raise ValueError(f"dimensions must be a positive integer, not {dimensions!r}")
+        self.index_name = validate_identifier(index_name)
+        self.label = validate_identifier(label)
+        self.embedding_property = validate_identifier(embedding_property)
+        self.dimensions = dimensions
+        self.similarity = similarity
+
+    def create(self, wait_seconds: int = 300) -> Dict[str, Any]:
+        """Create the index if it doesn't exist, and wait for it to be populated."""
+        result = graphdb.send_query(f"""
+            CREATE VECTOR INDEX `{self.index_name}` IF NOT EXISTS
+            FOR (chunk:`{self.label}`) ON (chunk.`{self.embedding_property}`)
+            OPTIONS {{ indexConfig: {{
+                `vector.dimensions`: {self.dimensions},
+                `vector.similarity_function`: '{self.similarity}'
+            }} }}
+            """, access_mode=WRITE_ACCESS)
+        if result["status"] == "error":
+            return result
+        if wait_seconds:
+            result = graphdb.send_query("CALL db.awaitIndex($index_name, $wait_seconds)",
+                                        {"index_name": self.index_name, "wait_seconds": wait_seconds},
+                                        access_mode=READ_ACCESS)
+            if result["status"] == "error":
+                return result
+        return tool_success("vector_index", self.index_name)
+
+    def drop(self) -> Dict[str, Any]:
+        return graphdb.send_query(f"DROP INDEX `{self.index_name}` IF EXISTS", access_mode=WRITE_ACCESS)
+
+    def _check_query_vector(self, query_vector: Sequence[float]):
+        if len(query_vector) != self.dimensions:
+            raise ValueError(f"query vector has {len(query_vector)} dimensions, the index has {self.dimensions}")
+
+    def search(self, query_vector: Sequence[float], top_k: int = 5, expand: bool = True) -> List[Dict[str, Any]]:
+        """Top-k chunks by approximate nearest neighbour search, best first.
+
+        With expand, each chunk has the 'entities' extracted from it, each with the 'domain_nodes' it corresponds to.
+
+        Raises:
+            ValueError: if the query vector doesn't match the index, or the query fails.
+        """
+        self._check_query_vector(query_vector)
+        result = graphdb.send_query(
+            VECTOR_SEARCH_EXPANDED_QUERY if expand else VECTOR_SEARCH_QUERY,
+            {"index_name": self.index_name, "top_k": top_k, "query_vector": list(query_vector)},
+            access_mode=READ_ACCESS,
+        )
+        if result["status"] == "error":
+            raise ValueError(result["error_message"])
+        return result["query_result"]
+
+    def brute_force_search(self, query_vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Exact top-k chunks, scanning every chunk. For measuring the recall of search()."""
+        self._check_query_vector(query_vector)
+        query = BRUTE_FORCE_SEARCH_TEMPLATE.format(label=self.label, property=self.embedding_property, similarity=self.similarity)
+        result = graphdb.send_query(query, {"top_k": top_k, "query_vector": list(query_vector)}, access_mode=READ_ACCESS)
+        if result["status"] == "error":
+            raise ValueError(result["error_message"])
+        return result["query_result"]
+
+
+def recall_at_k(found: List[Dict[str, Any]], exact: List[Dict[str, Any]]) -> float:
+    """Fraction of the exact top-k chunks which a search found."""
+    if not exact:
+        return 1.0
+    found_ids = {record["chunk_id"] for record in found}
+    return sum(1 for record in exact if record["chunk_id"] in found_ids) / len(exact)
+
+def make_chunk_search_tool(retriever: Any, embedder: Union[Callable[[str], List[float]], Any],
+                           default_top_k: int = 5) -> Callable[..., Dict[str, Any]]:
+    """Make an ADK tool searching the chunks extracted from the approved documents.
+
+    Args:
+        retriever: A ChunkVectorIndex, LocalVectorStore or anything else with search(query_vector, top_k).
+        embedder: Embeds the question, either a function or an object with embed_query
+            (like the neo4j_graphrag embedders). It has to be the embedder the chunks were embedded with.
+        default_top_k: Chunks returned when the agent doesn't ask for a number.
+    """
+    embed = getattr(embedder, "embed_query", embedder)
+
+    def search_document_chunks(question: str, top_k: int = default_top_k) -> Dict[str, Any]:
+        """Finds the passages of the source documents (emails, chats, SOPs, SLAs) most similar to a question,
+        with the entities mentioned in each passage and the domain graph nodes they correspond to.
+
+        Args:
+            question: What to look for, in natural language.
+            top_k: How many passages to return.
+
+        Returns:
+            Success with 'chunks', best match first, each with its text, similarity score and entities.
+        """
+        try:
+            chunks = retriever.search(embed(question), top_k)
+        except Exception as e:
+            return tool_error(f"Chunk search failed: {e}")
+        return tool_success("chunks", chunks)
+
+    return search_document_chunks
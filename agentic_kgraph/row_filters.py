@@ -0,0 +1,60 @@
+# Row filters for relationship construction rules.
+#
+# A relationship rule may carry "row_filters", a list of predicates every row has to pass, e.g.
+#
+#   "row_filters": [{"column": "Settlement_ID", "op": "non_empty"},
+#                   {"column": "Status", "op": "in", "values": ["Open", "Investigating"]}]
+#
+# and "dedupe": true to skip rows repeating the endpoints and property values of an earlier row,
+# so a pair listed many times is merged once and ends with the properties of its last row.
+# Rows with an empty endpoint are always skipped, since they can never match a node.
+# The loaders evaluate the filters before looking up the endpoints, and can report how many rows were skipped.
+
+from typing import Any, Dict, List, Optional
+
+ROW_FILTER_OPS = ("non_empty", "equals", "not_equals", "in", "not_in")
+
+# Cypher predicate: does `row` pass every filter in $row_filters?
+ROW_FILTER_CYPHER = """all(f IN $row_filters WHERE CASE f.op
+            WHEN 'non_empty' THEN row[f.column] IS NOT NULL AND trim(row[f.column]) <> ''
+            WHEN 'equals' THEN coalesce(row[f.column] = f.value, false)
+            WHEN 'not_equals' THEN coalesce(row[f.column] <> f.value, true)
+            WHEN 'in' THEN coalesce(row[f.column] IN f.values, false)
+            WHEN 'not_in' THEN NOT coalesce(row[f.column] IN f.values, false)
+            ELSE false END)"""
+
+
+def check_row_filters(row_filters: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """Problems with a rule's row filters, empty if they are all well formed."""
+    problems = []
+    for row_filter in row_filters or []:
+        if not isinstance(row_filter, dict) or not row_filter.get("column"):
+            problems.append(f"row filter needs a column: {row_filter!r}")
+        elif row_filter.get("op") not in ROW_FILTER_OPS:
+            problems.append(f"row filter op must be one of {', '.join(ROW_FILTER_OPS)}: {row_filter!r}")
+        elif row_filter["op"] in ("equals", "not_equals") and "value" not in row_filter:
+            problems.append(f"row filter needs a value: {row_filter!r}")
+        elif row_filter["op"] in ("in", "not_in") and not isinstance(row_filter.get("values"), list):
+            problems.append(f"row filter needs a list of values: {row_filter!r}")
+    return problems
+
+def row_passes_filters(row: Dict[str, str], row_filters: Optional[List[Dict[str, Any]]]) -> bool:
+    """Evaluate the filters on a csv.DictReader row, the same way ROW_FILTER_CYPHER does on a LOAD CSV row."""
+    for row_filter in row_filters or []:
+        value = row.get(row_filter["column"]) or None  # LOAD CSV reads empty fields as null
+        op = row_filter["op"]
+        if op == "non_empty":
+            passed = value is not None and value.strip() != ""
+        elif op == "equals":
+            passed = value is not None and value == row_filter["value"]
+        elif op == "not_equals":
+            passed = value is None or value != row_filter["value"]
+        elif op == "in":
+            passed = value is not None and value in row_filter["values"]
+        elif op == "not_in":
+            passed = value is None or value not in row_filter["values"]
+        else:
+            passed = False
+        if not passed:
+            return False
+    return True
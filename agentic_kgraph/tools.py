@@ -0,0 +1,518 @@
+import csv
+import logging
+from pathlib import Path
+from itertools import islice
+
+from typing import Dict, Any, Optional
+
+from google.adk.tools import ToolContext
+
+from .neo4j_for_adk import graphdb,tool_success, tool_error, render_query, READ_ACCESS, COUNT_RELATIONSHIP_ROWS_QUERY
+
+from .helper import get_neo4j_import_dir
+
+from .delta_import import construct_domain_graph_delta, reset_fingerprints
+
+from .column_types import infer_property_types
+
+from .row_filters import check_row_filters
+
+from .admin_import import compile_admin_import
+
+from .plan_validation import validate_construction_plan
+
+from .parallel_import import import_relationships_parallel
+
+from .edge_list import load_edge_list
+
+from .graph_stats import get_graph_statistics
+
+from .entity_resolution import resolve_entities
+
+def get_approved_user_goal(tool_context: ToolContext):
+    """Returns the user's goal, which is a dictionary containing the kind of graph and its description."""
+    if "approved_user_goal" not in tool_context.state:
+        return tool_error("approved_user_goal not set. Ask the user to clarify their goal (kind of graph and description).")  
+    
+    user_goal_data = tool_context.state["approved_user_goal"]
+
+    return tool_success("approved_user_goal", user_goal_data)
+
+def get_approved_files(tool_context: ToolContext):
+    """Returns the files that have been approved for import."""
+    if "approved_files" not in tool_context.state:
+        return tool_error("approved_files not set. Ask the user to approve the file suggestions.")
+    
+    files = tool_context.state["approved_files"]
+    
+    return tool_success("approved_files", files)
+    
+def get_import_dir() -> Dict[str, Any]:
+    """Returns the local import directory: NEO4J_IMPORT_DIR, or else the directory configured in Neo4j."""
+    neo4j_import_dir = get_neo4j_import_dir()
+    if neo4j_import_dir:
+        return tool_success("neo4j_import_dir", neo4j_import_dir)
+    return graphdb.get_import_directory()
+
+# Tool: Sample File
+def sample_file(file_path: str) -> dict:
+    """Samples a file by reading its content as text.
+    
+    Treats any file as text and reads up to a maximum of 100 lines.
+    
+    Args:
+      file_path: file to sample, relative to the import directory
+      
+    Returns:
+        dict: A dictionary containing metadata about the content,
+              along with a sampling of the file.
+              Includes a 'status' key ('success' or 'error').
+              If 'success', includes a 'content' key with textual file content.
+              If 'error', includes an 'error_message' key.
+    """
+    import_dir_result = get_import_dir()
+    if import_dir_result["status"] == "error": return import_dir_result
+    import_dir = Path(import_dir_result["neo4j_import_dir"])
+
+    if not import_dir.exists():
+        return tool_error(f"NEO4J_IMPORT_DIR does not exist or is undefined: {import_dir}")
+
+    full_path_to_file = import_dir / file_path
+
+    if not full_path_to_file.exists():
+        return tool_error(f"File does not exist in import directory: {file_path}")
+    
+    try:
+        # Treat all files as text
+        with open(full_path_to_file, 'r', encoding='utf-8') as file:
+            # Read up to 100 lines
+            lines = list(islice(file, 100))
+            content = ''.join(lines)
+            return tool_success("content", content)
+    
+    except Exception as e:
+        return tool_error(f"Error reading or processing file {file_path}: {e}")
+
+
+### Neo4j Tools ###
+def neo4j_is_ready():
+    return graphdb.send_query("RETURN 'Neo4j is Ready!' as message", access_mode=READ_ACCESS)
+
+def drop_neo4j_indexes() -> Dict[str, Any]:
+    """Drops and constraints and indexes present on the neo4j graph database
+
+    Returns:
+        Success or an error.
+    """
+    # remove all constraints
+    list_constraints = graphdb.send_query(
+        """SHOW CONSTRAINTS YIELD name"""
+    )
+    if (list_constraints == "error"):
+        return list_constraints
+    constraint_names = [row["name"] for row in list_constraints["query_result"]]
+    for constraint_name in constraint_names:
+        dropped_constraint = graphdb.send_query("""DROP CONSTRAINT $constraint_name""", {"constraint_name": constraint_name})
+        if (dropped_constraint["status"] == "error"):
+            return dropped_constraint
+
+    # remove all indexes
+    list_indexes = graphdb.send_query(
+        """SHOW INDEXES YIELD name"""
+    )
+    if (list_indexes == "error"):
+        return list_indexes
+    index_names = [row["name"] for row in list_indexes["query_result"]]
+    for index_name in index_names:
+        dropped_index = graphdb.send_query("""DROP INDEX $index_name""", {"index_name": index_name})
+        if (dropped_index["status"] == "error"):
+            return dropped_index
+
+    return tool_success("message", "Neo4j constraints and indexes have been dropped.")
+
+def clear_neo4j_data() -> Dict[str, Any]:
+    """Clears all data from the neo4j graph database.
+
+    Use with caution! Confirm with the user
+    that they know this will completely reset the database.
+
+    Returns:
+        Success or an error.
+    """
+    # First, remove all nodes and relationships in batches
+    data_removed = graphdb.send_query("""MATCH (n) CALL (n) { DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS""")
+    if (data_removed["status"] == "error") :
+        return data_removed
+
+    # the next delta import has to send everything again
+    reset_fingerprints()
+
+    return tool_success("message", "Neo4j graph has been reset.")
+
+def get_apoc_procedure_names() -> Dict[str, Any]:
+    """List all APOC procedure names.
+    APOC (Awesome Procedures on Cypher) is a library of procedures and functions that extends the capabilities of Neo4j.
+
+    Returns:
+        Success with a list of APOC procedure names or an error.
+    """
+    cypher = "SHOW PROCEDURES YIELD name WHERE name STARTS WITH 'apoc' RETURN name"
+
+    result = graphdb.send_query(cypher, access_mode=READ_ACCESS)
+    
+    if result["status"] == "error":
+        return result
+    apoc_procedure_names = [row["name"] for row in result["query_result"]]
+
+    if len(apoc_procedure_names) == 0:
+        return tool_error("APOC procedures not found. Please ensure APOC is installed in your Neo4j database.")
+    
+    return tool_success("apoc_procedure_names", apoc_procedure_names)
+
+def get_apoc_version() -> Dict[str, Any]:
+    """Get the version of APOC installed in the Neo4j database.
+
+    Returns:
+        Success with the APOC version or an error.
+    """
+    cypher = "RETURN apoc.version() AS apoc_version"
+
+    result = graphdb.send_query(cypher, access_mode=READ_ACCESS)
+    
+    if result["status"] == "error":
+        return result
+    
+    apoc_version = result["query_result"][0]["apoc_version"]
+
+    return tool_success("apoc_version", apoc_version)
+
+def get_neo4j_version() -> Dict[str, Any]:
+    """Get the version and edition of the Neo4j database.
+    
+    """
+    cypher = "CALL dbms.components() yield name, versions, edition unwind versions as version return name, version, edition"
+
+    result = graphdb.send_query(cypher, access_mode=READ_ACCESS)
+
+    if result["status"] == "error":
+        return result
+    
+    return tool_success("neo4j_version", result["query_result"][0])
+
+def get_graph_summary(include_properties: bool = True) -> Dict[str, Any]:
+    """Summarizes the graph: node and relationship counts per label and type,
+    which labels each relationship type connects, and optionally the property keys of each.
+
+    Cheap to call repeatedly, the summary is cached until the graph is written to.
+
+    Args:
+        include_properties: Also list the property keys and their types per label and relationship type.
+    """
+    return get_graph_statistics(include_properties)
+
+def create_uniqueness_constraint(
+    label: str,
+    unique_property_key: str,
+) -> Dict[str, Any]:
+    """Creates a uniqueness constraint for a node label and property key.
+    A uniqueness constraint ensures that no two nodes with the same label and property key have the same value.
+    This improves the performance and integrity of data import and later queries.
+
+    Args:
+        label: The label of the node to create a constraint for.
+        unique_property_key: The property key that should have a unique value.
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On error, includes an 'error_message' key.
+    """    
+    # Use a query template since Neo4j doesn't support parameterization of labels and property keys when creating a constraint
+    try:
+        query = render_query("create_uniqueness_constraint", label=label, key=unique_property_key)
+    except ValueError as e:
+        return tool_error(str(e))
+    results = graphdb.send_query(query)
+    return results
+
+def create_range_index(label: str, property_key: str) -> Dict[str, Any]:
+    """Creates a range index on a node property, for range predicates and ordering on typed values.
+
+    Args:
+        label: The label of the nodes to index.
+        property_key: The property to index.
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+    """
+    try:
+        query = render_query("create_range_index", label=label, key=property_key)
+    except ValueError as e:
+        return tool_error(str(e))
+    return graphdb.send_query(query)
+
+def load_nodes_from_csv(
+    source_file: str,
+    label: str,
+    unique_column_name: str,
+    properties: list[str],
+    property_types: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Batch loading of nodes from a CSV file
+
+    property_types maps properties to 'integer', 'float', 'date' or 'datetime',
+    untyped properties are loaded as strings.
+    """
+
+    # load nodes from CSV file by merging on the unique_column_name value
+    try:
+        query = render_query("load_nodes_from_csv", unique_column_name=unique_column_name)
+    except ValueError as e:
+        return tool_error(str(e))
+
+    results = graphdb.send_query(query, {
+        "source_file": source_file,
+        "label": label,
+        "unique_column_name": unique_column_name,
+        "properties": properties,
+        "property_types": property_types or {}
+    })
+    return results
+
+def import_nodes(node_construction: dict) -> dict:
+    """Import nodes as defined by a node construction rule."""
+
+    # create a uniqueness constraint for the unique_column
+    uniqueness_result = create_uniqueness_constraint(
+        node_construction["label"],
+        node_construction["unique_column_name"]
+    )
+
+    if (uniqueness_result["status"] == "error"):
+        return uniqueness_result
+
+    # import nodes from csv
+    load_nodes_result = load_nodes_from_csv(
+        node_construction["source_file"],
+        node_construction["label"],
+        node_construction["unique_column_name"],
+        node_construction["properties"],
+        node_construction.get("property_types")
+    )
+    if (load_nodes_result["status"] == "error"):
+        return load_nodes_result
+
+    # range indexes on typed properties, e.g. for date range queries
+    for property_key in node_construction.get("range_indexes", []):
+        index_result = create_range_index(node_construction["label"], property_key)
+        if (index_result["status"] == "error"):
+            return index_result
+
+    return load_nodes_result
+
+def import_relationships(relationship_construction: dict, count_rows: bool = False) -> Dict[str, Any]:
+    """Import relationships as defined by a relationship construction rule.
+
+    Rows with an empty endpoint, or failing the rule's optional 'row_filters', are skipped
+    before the endpoints are looked up. With 'dedupe' set, rows repeating the endpoints and
+    property values of an earlier row are skipped.
+    The query result has rows_merged, the rows sent to MERGE. With count_rows, the file is read
+    a second time to add the rows_read, rows_kept and duplicate_rows counts.
+    """
+    problems = check_row_filters(relationship_construction.get("row_filters"))
+    if problems:
+        return tool_error("; ".join(problems))
+
+    # match both endpoints by their key columns, then merge the relationship between them
+    try:
+        query = render_query(
+            "import_relationships_distinct" if relationship_construction.get("dedupe") else "import_relationships",
+            from_node_column=relationship_construction["from_node_column"],
+            to_node_column=relationship_construction["to_node_column"]
+        )
+    except ValueError as e:
+        return tool_error(str(e))
+
+    parameters = {
+        "source_file": relationship_construction["source_file"],
+        "from_node_label": relationship_construction["from_node_label"],
+        "from_node_column": relationship_construction["from_node_column"],
+        "to_node_label": relationship_construction["to_node_label"],
+        "to_node_column": relationship_construction["to_node_column"],
+        "relationship_type": relationship_construction["relationship_type"],
+        "properties": relationship_construction["properties"],
+        "property_types": relationship_construction.get("property_types") or {},
+        "row_filters": relationship_construction.get("row_filters") or []
+    }
+    results = graphdb.send_query(query, parameters)
+    if results["status"] == "error" or not count_rows:
+        return results
+
+    counts = graphdb.send_query(COUNT_RELATIONSHIP_ROWS_QUERY, parameters, access_mode=READ_ACCESS)
+    if counts["status"] == "error":
+        return counts
+    record = {**results["query_result"][0], **counts["query_result"][0]}
+    record["duplicate_rows"] = record["rows_kept"] - record["rows_merged"]
+    return tool_success("query_result", [record])
+
+def import_edge_list(edge_list: dict) -> Dict[str, Any]:
+    """Import the relationships of an edge list file with a type column, like relationships.csv.
+
+    The file is read once for all relationship types. Each row's endpoints are resolved to a node label
+    and key property by the longest matching ID prefix in 'node_id_prefixes', e.g.
+    {"T": {"label": "Trade", "key": "Trade_ID"}, "ITSM": {"label": "ITSMTicket", "key": "Ticket_ID"}},
+    or for a type listed in 'type_endpoints', by its 'from' and 'to' endpoints.
+    The columns default to 'Source', 'Target' and 'Type' ('source_column', 'target_column', 'type_column').
+    Import the nodes first.
+
+    Returns:
+        Success with rows read, rows sent per relationship type, and skipped rows, or an error.
+    """
+    import_dir_result = get_import_dir()
+    if import_dir_result["status"] == "error":
+        return import_dir_result
+    return load_edge_list(edge_list, import_dir_result["neo4j_import_dir"])
+
+def profile_property_types(construction_plan: dict) -> Dict[str, Any]:
+    """Infers the types of each construction rule's properties from its source file.
+
+    Every rule gets a 'property_types' entry mapping properties to 'integer', 'float',
+    'date' or 'datetime', which the loaders then use to store native values instead of strings.
+
+    Returns:
+        Success with the construction plan including property types, or an error.
+    """
+    import_dir_result = get_import_dir()
+    if import_dir_result["status"] == "error":
+        return import_dir_result
+
+    typed_plan = {}
+    for name, construction in construction_plan.items():
+        try:
+            property_types = infer_property_types(construction, import_dir_result["neo4j_import_dir"])
+        except (OSError, KeyError, csv.Error) as e:
+            return tool_error(f"Could not profile {name}: {e}")
+        typed_plan[name] = {**construction, "property_types": property_types}
+
+    return tool_success("construction_plan", typed_plan)
+
+def validate_plan(construction_plan: dict) -> Dict[str, Any]:
+    """Checks a construction plan against its source files, without writing anything to the database.
+
+    Reports missing columns, empty and duplicate keys, relationship rows whose endpoints
+    won't exist, and estimates how many nodes and relationships the plan will create.
+
+    Returns:
+        Success with a 'validation' report whose 'valid' key is False if the plan has errors, or an error.
+    """
+    import_dir_result = get_import_dir()
+    if import_dir_result["status"] == "error":
+        return import_dir_result
+    return validate_construction_plan(construction_plan, import_dir_result["neo4j_import_dir"])
+
+def construct_domain_graph(construction_plan: dict, mode: str = "full", validate: bool = False,
+                           parallelism: int = 1) -> Dict[str, Any]:
+    """Construct a domain graph according to a construction plan.
+
+    Args:
+        construction_plan: Construction rules keyed by name.
+        mode: "full" re-imports every row of every source file.
+            "delta" only sends the rows inserted, updated or deleted since the previous delta import.
+        validate: Check the plan against its source files first, and import nothing if it has errors.
+        parallelism: In full mode, the number of concurrent sessions relationships are merged over.
+            Rows are partitioned by both endpoints so concurrent transactions never lock the same node.
+
+    Returns:
+        Success with the result of each construction rule, keyed by rule name.
+    """
+    if validate:
+        validation_result = validate_plan(construction_plan)
+        if validation_result["status"] == "error":
+            return validation_result
+        if not validation_result["validation"]["valid"]:
+            return tool_error("Construction plan is not valid: " + "; ".join(validation_result["validation"]["errors"]))
+
+    if mode == "delta":
+        import_dir_result = get_import_dir()
+        if import_dir_result["status"] == "error":
+            return import_dir_result
+        return construct_domain_graph_delta(construction_plan, import_dir_result["neo4j_import_dir"])
+    if mode != "full":
+        return tool_error(f"Unknown construction mode: {mode}. Use 'full' or 'delta'.")
+
+    construction_results = {}
+    import_dir = None
+    if parallelism > 1:
+        import_dir_result = get_import_dir()
+        if import_dir_result["status"] == "error":
+            return import_dir_result
+        import_dir = import_dir_result["neo4j_import_dir"]
+
+    # first, import nodes
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] == "node":
+            construction_results[name] = import_nodes(construction)
+
+    # second, import relationships
+    for name, construction in construction_plan.items():
+        if construction["construction_type"] == "relationship":
+            if import_dir:
+                construction_results[name] = import_relationships_parallel(construction, import_dir, parallelism)
+            else:
+                construction_results[name] = import_relationships(construction)
+
+    return tool_success("construction_results", construction_results)
+
+def resolve_duplicate_entities(similarity: float = 0.9, dry_run: bool = False) -> Dict[str, Any]:
+    """Merges duplicate entities extracted from the documents, e.g. the same trade mentioned in several emails.
+
+    Entities of the same label are clustered by their normalized name (or id), exactly and then fuzzily,
+    and each cluster is merged into one node keeping all of its relationships.
+    Run this after extracting entities, before correlating them with the domain graph.
+
+    Args:
+        similarity: How similar (0 to 1) two distinct names have to be to count as the same entity.
+            1 only merges names which are equal after normalization.
+        dry_run: Only report the clusters, without merging anything.
+
+    Returns:
+        Success with per label counts of entities, clusters and merged entities, and cluster sizes.
+    """
+    return resolve_entities(similarity=similarity, dry_run=dry_run)
+
+def prepare_admin_import(construction_plan: dict, output_dir: str, database: str = "neo4j") -> Dict[str, Any]:
+    """Compiles a construction plan into files for the offline `neo4j-admin database import full` command.
+
+    Use this for the first build of a large graph, instead of construct_domain_graph.
+    The command has to be run by an administrator while the database is stopped, and the
+    returned post_import_statements (constraints and range indexes) once it is started again.
+
+    Args:
+        construction_plan: Construction rules keyed by name.
+        output_dir: Directory for the neo4j-admin header and data files.
+        database: Name of the database to create.
+
+    Returns:
+        Success with the command to run and row counts per rule, or an error.
+    """
+    import_dir_result = get_import_dir()
+    if import_dir_result["status"] == "error":
+        return import_dir_result
+    return compile_admin_import(construction_plan, import_dir_result["neo4j_import_dir"], output_dir, database)
+
+def load_product_nodes() -> Dict[str, Any]:
+    """Load the product nodes from products.csv"""
+    return load_nodes_from_csv(
+        "products.csv",
+        "Product",
+        "product_id",
+        ["product_name", "price", "description"]
+    )
+
+def load_position_nodes() -> Dict[str, Any]:
+    """Load the position nodes from positions.csv"""
+    return load_nodes_from_csv(
+        "data_files/positions.csv",
+        "Position",
+        "Position_ID",
+        ["Trade_ID", "Snapshot", "Valuation_Date", "Quantity", "Market_Value", "Book"]
+    )
\ No newline at end of file
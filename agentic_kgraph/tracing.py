@@ -0,0 +1,270 @@
+# Structured tracing of ADK agent runs.
+#
+# An AgentTracer attaches callbacks to an agent (and all of its sub-agents) which record
+# timed spans for agent runs, LLM calls and tool calls, plus every event seen by an AgentCaller.
+# Spans can be exported as JSONL, or as OpenTelemetry (OTLP/JSON) resource spans.
+
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, LoopAgent
+
+
+def _payload_size(value: Any) -> int:
+    """Approximate size of a payload in bytes, measured as JSON."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class AgentTracer:
+    """Records timed spans for agent, LLM and tool activity during agent runs."""
+
+    def __init__(self, service_name: str = "agentic_kgraph"):
+        self.service_name = service_name
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Dict[str, Any]] = []
+        self._open_spans: Dict[tuple, Dict[str, Any]] = {}
+        self._parent_agent: Dict[str, str] = {}
+        # first sub-agent name -> loop agent name, used to count loop iterations
+        self._loop_entry_agent: Dict[str, str] = {}
+        self._loop_iterations: Dict[tuple, int] = {}
+
+    ### Instrumentation ###
+
+    def instrument(self, agent: BaseAgent) -> BaseAgent:
+        """Attach tracing callbacks to the agent and all of its sub-agents. Returns the agent."""
+        self._attach(agent, "before_agent_callback", self.before_agent)
+        self._attach(agent, "after_agent_callback", self.after_agent)
+        if isinstance(agent, LlmAgent):
+            self._attach(agent, "before_model_callback", self.before_model)
+            self._attach(agent, "after_model_callback", self.after_model)
+            self._attach(agent, "before_tool_callback", self.before_tool)
+            self._attach(agent, "after_tool_callback", self.after_tool)
+        if isinstance(agent, LoopAgent) and agent.sub_agents:
+            self._loop_entry_agent[agent.sub_agents[0].name] = agent.name
+        for sub_agent in agent.sub_agents:
+            self._parent_agent[sub_agent.name] = agent.name
+            self.instrument(sub_agent)
+        return agent
+
+    @staticmethod
+    def _attach(agent: BaseAgent, field_name: str, callback):
+        # tracing callbacks go first, because ADK stops at the first callback returning a value
+        existing = getattr(agent, field_name)
+        if existing is None:
+            callbacks = []
+        elif isinstance(existing, list):
+            callbacks = list(existing)
+        else:
+            callbacks = [existing]
+        if callback not in callbacks:
+            callbacks.insert(0, callback)
+        setattr(agent, field_name, callbacks)
+
+    ### Spans ###
+
+    def _start_span(self, key: tuple, name: str, kind: str, parent_key: Optional[tuple],
+                    attributes: Dict[str, Any]) -> Dict[str, Any]:
+        parent = self._open_spans.get(parent_key) if parent_key else None
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_span_id": parent["span_id"] if parent else None,
+            "name": name,
+            "kind": kind,
+            "start_ns": time.time_ns(),
+            "end_ns": None,
+            "attributes": attributes,
+        }
+        self._open_spans[key] = span
+        return span
+
+    def _end_span(self, key: tuple, attributes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        span = self._open_spans.pop(key, None)
+        if span is None:
+            return None
+        span["end_ns"] = time.time_ns()
+        span["duration_ms"] = (span["end_ns"] - span["start_ns"]) / 1e6
+        span["attributes"].update(attributes)
+        self.spans.append(span)
+        return span
+
+    ### ADK callbacks ###
+
+    def before_agent(self, callback_context):
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        attributes = {"agent.name": agent_name}
+        loop_name = self._loop_entry_agent.get(agent_name)
+        if loop_name:
+            iteration = self._loop_iterations.get((invocation_id, loop_name), 0) + 1
+            self._loop_iterations[(invocation_id, loop_name)] = iteration
+            attributes["loop.name"] = loop_name
+            attributes["loop.iteration"] = iteration
+        parent_name = self._parent_agent.get(agent_name)
+        self._start_span(
+            ("agent", invocation_id, agent_name), f"agent {agent_name}", "agent",
+            ("agent", invocation_id, parent_name) if parent_name else None, attributes
+        )
+        return None
+
+    def after_agent(self, callback_context):
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        attributes = {}
+        if (invocation_id, agent_name) in self._loop_iterations:
+            attributes["loop.iterations"] = self._loop_iterations[(invocation_id, agent_name)]
+        self._end_span(("agent", invocation_id, agent_name), attributes)
+        return None
+
+    def before_model(self, callback_context, llm_request):
+        invocation_id = callback_context.invocation_id
+        agent_name = callback_context.agent_name
+        self._start_span(
+            ("llm", invocation_id, agent_name), f"llm {llm_request.model or ''}".strip(), "llm",
+            ("agent", invocation_id, agent_name),
+            {
+                "agent.name": agent_name,
+                "llm.model": llm_request.model or "",
+                "llm.request.contents": len(llm_request.contents),
+                "llm.request.bytes": _payload_size([content.model_dump(exclude_none=True) for content in llm_request.contents]),
+            }
+        )
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        attributes = {
+            "llm.response.bytes": _payload_size(llm_response.content.model_dump(exclude_none=True)) if llm_response.content else 0,
+        }
+        usage = llm_response.usage_metadata
+        if usage:
+            attributes["llm.usage.prompt_tokens"] = usage.prompt_token_count or 0
+            attributes["llm.usage.completion_tokens"] = usage.candidates_token_count or 0
+        if llm_response.error_code:
+            attributes["error"] = llm_response.error_message or llm_response.error_code
+        self._end_span(("llm", callback_context.invocation_id, callback_context.agent_name), attributes)
+        return None
+
+    def before_tool(self, tool, args, tool_context):
+        self._start_span(
+            ("tool", tool_context.function_call_id or tool.name), f"tool {tool.name}", "tool",
+            ("agent", tool_context.invocation_id, tool_context.agent_name),
+            {
+                "agent.name": tool_context.agent_name,
+                "tool.name": tool.name,
+                "tool.args.bytes": _payload_size(args),
+            }
+        )
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        attributes = {"tool.response.bytes": _payload_size(tool_response)}
+        if isinstance(tool_response, dict) and tool_response.get("status") == "error":
+            attributes["error"] = tool_response.get("error_message", "")
+        self._end_span(("tool", tool_context.function_call_id or tool.name), attributes)
+        return None
+
+    def record_event(self, event):
+        """Record an ADK event (as yielded by runner.run_async) as an instant span."""
+        timestamp_ns = int(event.timestamp * 1e9) if event.timestamp else time.time_ns()
+        parent = self._open_spans.get(("agent", event.invocation_id, event.author))
+        function_calls = event.get_function_calls()
+        text = "".join(part.text or "" for part in event.content.parts or []) if event.content else ""
+        self.spans.append({
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_span_id": parent["span_id"] if parent else None,
+            "name": f"event {event.author}",
+            "kind": "event",
+            "start_ns": timestamp_ns,
+            "end_ns": timestamp_ns,
+            "duration_ms": 0.0,
+            "attributes": {
+                "event.author": event.author,
+                "event.final": event.is_final_response(),
+                "event.function_calls": ",".join(call.name for call in function_calls),
+                "event.function_responses": ",".join(response.name for response in event.get_function_responses()),
+                # enough to replay the run with mock_llm.ScriptedLlm.from_trace
+                "event.function_call_args": json.dumps(
+                    [{"name": call.name, "args": call.args or {}} for call in function_calls], default=str
+                ) if function_calls else "",
+                "event.text": text,
+            },
+        })
+
+    ### Reporting ###
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency breakdown: count, total, mean and max milliseconds per span kind and name."""
+        breakdown: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            if span["kind"] == "event":
+                continue
+            name = span["attributes"].get("tool.name") or span["attributes"].get("llm.model") or span["attributes"].get("agent.name")
+            entry = breakdown.setdefault(f"{span['kind']}:{name}", {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += span["duration_ms"]
+            entry["max_ms"] = max(entry["max_ms"], span["duration_ms"])
+        for entry in breakdown.values():
+            entry["mean_ms"] = entry["total_ms"] / entry["count"]
+        loop_iterations = {}
+        for (_, loop_name), iterations in self._loop_iterations.items():
+            loop_iterations.setdefault(loop_name, []).append(iterations)
+        return {"spans": breakdown, "loop_iterations": loop_iterations}
+
+    def export_jsonl(self, path: str):
+        """Write one finished span per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            for span in sorted(self.spans, key=lambda span: span["start_ns"]):
+                f.write(json.dumps(span, default=str) + "\n")
+
+    def to_otel(self) -> Dict[str, Any]:
+        """Finished spans in the OTLP/JSON format accepted by OpenTelemetry collectors."""
+        otel_spans = []
+        for span in sorted(self.spans, key=lambda span: span["start_ns"]):
+            otel_span = {
+                "traceId": span["trace_id"],
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": 1, # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span["end_ns"]),
+                "attributes": [
+                    {"key": key, "value": _otel_value(value)}
+                    for key, value in {"span.kind": span["kind"], **span["attributes"]}.items()
+                ],
+            }
+            if span["parent_span_id"]:
+                otel_span["parentSpanId"] = span["parent_span_id"]
+            if "error" in span["attributes"]:
+                otel_span["status"] = {"code": 2, "message": str(span["attributes"]["error"])}
+            otel_spans.append(otel_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "agentic_kgraph.tracing"}, "spans": otel_spans}],
+            }]
+        }
+
+    def export_otel(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_otel(), f)
+
+    def reset(self):
+        self.spans.clear()
+        self._open_spans.clear()
+        self._loop_iterations.clear()
+        self.trace_id = uuid.uuid4().hex
@@ -0,0 +1,120 @@
+# Offline benchmark of the agent pipeline overhead: runner, session service, tool layer and database calls.
+#
+# An LlmAgent with the tools from agentic_kgraph.tools is driven by a ScriptedLlm, so no model is called.
+# The script is either a default tool-calling sequence, or replayed from an AgentTracer JSONL trace of a
+# real run (--trace run.jsonl --agent proposal_agent). Many jobs are run concurrently with run_agent_jobs,
+# and job latency percentiles, per-span breakdowns and database query metrics are reported.
+#
+# usage: python benchmarks/agent_pipeline.py --jobs 200 --concurrency 16 --latency-ms 50 [--stub] [--session-db sqlite:///bench.db]
+
+import sys
+import json
+import asyncio
+import inspect
+import argparse
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from google.adk.agents import LlmAgent
+
+from agentic_kgraph import tools
+from agentic_kgraph.helper import make_session_service, run_agent_jobs
+from agentic_kgraph.mock_llm import ScriptedLlm, function_call_step, text_step
+from agentic_kgraph.neo4j_for_adk import graphdb
+from agentic_kgraph.tracing import AgentTracer
+
+DEFAULT_SCRIPT = [
+    function_call_step("get_approved_user_goal"),
+    function_call_step("neo4j_is_ready"),
+    text_step("The database is ready for the approved goal."),
+]
+
+DEFAULT_STATE = {
+    "approved_user_goal": {"kind_of_graph": "trade settlements", "description": "Trades, settlements and their breaks."},
+}
+
+
+def tool_functions():
+    """Every public function defined in agentic_kgraph.tools."""
+    return [
+        function for name, function in vars(tools).items()
+        if inspect.isfunction(function) and function.__module__ == tools.__name__ and not name.startswith("_")
+    ]
+
+
+async def run(args) -> dict:
+    if args.trace:
+        model = ScriptedLlm.from_trace(args.trace, args.agent, latency_seconds=args.latency_ms / 1000,
+                                       jitter_seconds=args.jitter_ms / 1000, seed=args.seed)
+    else:
+        model = ScriptedLlm(steps=DEFAULT_SCRIPT, latency_seconds=args.latency_ms / 1000,
+                            jitter_seconds=args.jitter_ms / 1000, seed=args.seed)
+
+    agent = LlmAgent(
+        name=args.agent,
+        model=model,
+        instruction="Benchmark agent.",
+        tools=tool_functions(),
+    )
+    tracer = AgentTracer()
+    initial_state = json.loads(Path(args.state).read_text()) if args.state else DEFAULT_STATE
+    jobs = [(initial_state, f"benchmark job {index}") for index in range(args.jobs)]
+
+    results = await run_agent_jobs(
+        agent,
+        jobs,
+        concurrency=args.concurrency,
+        session_service=make_session_service(args.session_db),
+        tracer=tracer,
+    )
+    return {
+        "summary": results["summary"],
+        "errors": sorted({job["error"] for job in results["jobs"] if "error" in job}),
+        "spans": tracer.summary()["spans"],
+        "query_metrics": graphdb.get_query_metrics()["query_metrics"],
+        "model_calls": model.calls,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark agent runs offline with a scripted model.")
+    parser.add_argument("--jobs", type=int, default=50, help="number of sessions to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="sessions running at once")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated model latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency, up to this much")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the latency jitter")
+    parser.add_argument("--trace", help="replay the model turns recorded in this AgentTracer JSONL file")
+    parser.add_argument("--agent", default="benchmark_agent", help="agent name (the agent to replay with --trace)")
+    parser.add_argument("--state", help="JSON file with the initial session state")
+    parser.add_argument("--session-db", help="session database url, e.g. sqlite:///bench.db (default: in memory)")
+    parser.add_argument("--stub", action="store_true", help="record database queries instead of sending them to Neo4j")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    if args.stub:
+        from import_benchmark import RecordingDriver
+        graphdb._driver = RecordingDriver()
+
+    results = asyncio.run(run(args))
+
+    summary = results["summary"]
+    latency = summary["latency_seconds"]
+    print(f"{summary['jobs']} jobs ({summary['failed']} failed) in {summary['wall_seconds']:.2f}s, "
+          f"{results['model_calls']} model calls")
+    print(f"job latency p50 {latency['p50']:.4f}s  p95 {latency['p95']:.4f}s  p99 {latency['p99']:.4f}s  max {latency['max']:.4f}s")
+    for error in results["errors"]:
+        print(f"    error: {error}")
+    for name, span in sorted(results["spans"].items()):
+        print(f"    {name:<40} {span['count']:>6}  mean {span['mean_ms']:>8.2f} ms  max {span['max_ms']:>8.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
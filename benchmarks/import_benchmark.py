@@ -0,0 +1,315 @@
+# End-to-end import benchmark for the knowledge graph construction tools.
+#
+# Datasets are generated at several scale factors with data/Data.py, then each import stage
+# (load_nodes_from_csv, import_relationships, construct_domain_graph and the entity correlation query)
+# is run `--repeat` times. Rows/sec, p50/p95 stage latency and the peak RSS of this process are reported,
+# and optionally compared against a previous run's JSON results.
+#
+# By default the stages run against the Neo4j configured in the environment (NEO4J_URI etc.), with the
+# datasets written below its import directory. With --stub, a recording driver stands in for Neo4j, which
+# measures only the client-side costs (query rendering, transaction handling, result conversion).
+#
+# With --parallelism N, relationships are merged over N concurrent sessions (see agentic_kgraph/parallel_import.py).
+#
+# usage: python benchmarks/import_benchmark.py --scales 1 10 100 [--stub] [--parallelism 4] [--json results.json] [--baseline previous.json]
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from agentic_kgraph.neo4j_for_adk import graphdb
+from agentic_kgraph.helper import percentile
+from agentic_kgraph import tools
+from agentic_kgraph.parallel_import import import_relationships_parallel
+
+DATA_GENERATOR = REPO_ROOT / "data" / "Data.py"
+
+STAGES = ["load_nodes_from_csv", "import_relationships", "construct_domain_graph", "correlate_entities"]
+
+# domain graph of the generated GPM dataset
+GPM_NODES = {
+    "Trade": ("trades.csv", "Trade_ID", ["Scenario", "Trade_Date", "Trader", "Desk", "Instrument", "Asset_Class", "Quantity", "Price", "Currency", "Counterparty", "Book"]),
+    "Position": ("positions.csv", "Position_ID", ["Trade_ID", "Snapshot", "Valuation_Date", "Quantity", "Market_Value", "Book"]),
+    "Settlement": ("settlements.csv", "Settlement_ID", ["Trade_ID", "Settlement_Date", "Quantity", "Currency", "Amount", "Settlement_Status", "Fail_Reason", "Custodian"]),
+    "Break": ("breaks.csv", "Break_ID", ["Trade_ID", "Settlement_ID", "Break_Type", "Break_Reason", "Detected_Date", "Status", "Assigned_To", "Severity"]),
+    "ITSMTicket": ("itsm_tickets.csv", "Ticket_ID", ["Linked_Break", "System", "Priority", "Summary", "Created_On", "Status", "Assigned_To"]),
+}
+GPM_RELATIONSHIPS = {
+    "HAS_POSITION": ("positions.csv", "Trade", "Trade_ID", "Position", "Position_ID"),
+    "HAS_SETTLEMENT": ("settlements.csv", "Trade", "Trade_ID", "Settlement", "Settlement_ID"),
+    "BREAK_OF": ("breaks.csv", "Break", "Break_ID", "Trade", "Trade_ID"),
+    # TICKET_FOR_BREAK can't be expressed as a rule: endpoints are matched on the node property named
+    # like the column, and itsm_tickets.csv's Linked_Break column holds the Break_ID of the break
+}
+
+SEED_ENTITIES_QUERY = """
+MATCH (trade:Trade) WHERE trade.Trade_ID IS NOT NULL
+WITH trade LIMIT $count
+CREATE (:Trade:`__Entity__` {name: trade.Trade_ID})
+"""
+
+CORRELATE_QUERY = """
+MATCH (entity:$($entityLabel):`__Entity__`),(domain:$($entityLabel))
+WHERE apoc.text.jaroWinklerDistance(entity[$entityKey], domain[$domainKey]) < $distance
+MERGE (entity)-[r:CORRESPONDS_TO]->(domain)
+ON CREATE SET r.created_at = datetime()
+ON MATCH SET r.updated_at = datetime()
+RETURN $entityLabel as entityLabel, count(r) as relationshipCount
+"""
+
+
+def gpm_construction_plan(source_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Construction plan for the generated dataset, with source files relative to the import directory."""
+    plan = {}
+    for label, (file_name, key, properties) in GPM_NODES.items():
+        plan[label] = {
+            "construction_type": "node",
+            "source_file": f"{source_dir}/{file_name}",
+            "label": label,
+            "unique_column_name": key,
+            "properties": properties,
+        }
+    for rel_type, (file_name, from_label, from_column, to_label, to_column) in GPM_RELATIONSHIPS.items():
+        plan[rel_type] = {
+            "construction_type": "relationship",
+            "source_file": f"{source_dir}/{file_name}",
+            "relationship_type": rel_type,
+            "from_node_label": from_label,
+            "from_node_column": from_column,
+            "to_node_label": to_label,
+            "to_node_column": to_column,
+            "properties": [],
+        }
+    return plan
+
+
+### Recording driver stub ###
+
+class RecordedResult:
+    def __init__(self):
+        self.records = []
+
+    def to_eager_result(self):
+        return self
+
+
+class RecordingSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, parameters=None, **kwargs):
+        self.driver.queries.append((getattr(query, "text", query), parameters))
+        return RecordedResult()
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def close(self):
+        pass
+
+
+class RecordingDriver:
+    """Stands in for the neo4j driver, recording every query instead of sending it."""
+
+    def __init__(self):
+        self.queries: List[tuple] = []
+
+    def session(self, **kwargs):
+        return RecordingSession(self)
+
+    def close(self):
+        pass
+
+
+### Benchmark ###
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_rows(csv_path: Path) -> int:
+    with open(csv_path, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def generate(scale: float, out_dir: Path, seed: int) -> float:
+    """Generate a dataset in a separate process, so it doesn't count towards our peak RSS."""
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(DATA_GENERATOR), "--scale", str(scale), "--out-dir", str(out_dir), "--seed", str(seed)],
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - started
+
+
+def check(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result["status"] == "error":
+        raise RuntimeError(result["error_message"])
+    if result.get("construction_results"):
+        for name, rule_result in result["construction_results"].items():
+            if rule_result["status"] == "error":
+                raise RuntimeError(f"{name}: {rule_result['error_message']}")
+    return result
+
+
+def timed(stage: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    stage()
+    return time.perf_counter() - started
+
+
+def run_scale(scale: float, import_dir: Path, seed: int, repeat: int, entities: int, parallelism: int = 1) -> Dict[str, Any]:
+    source_dir = f"import_benchmark/scale_{scale:g}"
+    data_dir = import_dir / source_dir
+    generate_seconds = generate(scale, data_dir, seed)
+
+    plan = gpm_construction_plan(source_dir)
+    node_rules = [rule for rule in plan.values() if rule["construction_type"] == "node"]
+    relationship_rules = [rule for rule in plan.values() if rule["construction_type"] == "relationship"]
+    file_rows = {file_name: count_rows(data_dir / file_name) for file_name, *_ in GPM_NODES.values()}
+    stage_rows = {
+        "load_nodes_from_csv": sum(file_rows[Path(rule["source_file"]).name] for rule in node_rules),
+        "import_relationships": sum(file_rows[Path(rule["source_file"]).name] for rule in relationship_rules),
+        "correlate_entities": min(entities, file_rows["trades.csv"]),
+    }
+    stage_rows["construct_domain_graph"] = stage_rows["load_nodes_from_csv"] + stage_rows["import_relationships"]
+
+    def import_relationship_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+        if parallelism > 1:
+            return import_relationships_parallel(rule, str(import_dir), parallelism)
+        return tools.import_relationships(rule)
+
+    latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        check(tools.clear_neo4j_data())
+        latencies["load_nodes_from_csv"].append(timed(lambda: [check(tools.import_nodes(rule)) for rule in node_rules]))
+        latencies["import_relationships"].append(timed(lambda: [check(import_relationship_rule(rule)) for rule in relationship_rules]))
+
+        check(tools.clear_neo4j_data())
+        latencies["construct_domain_graph"].append(timed(lambda: check(tools.construct_domain_graph(plan, parallelism=parallelism))))
+
+        check(graphdb.send_query(SEED_ENTITIES_QUERY, {"count": entities}))
+        latencies["correlate_entities"].append(timed(lambda: check(graphdb.send_query(CORRELATE_QUERY, {
+            "entityLabel": "Trade",
+            "entityKey": "name",
+            "domainKey": "Trade_ID",
+            "distance": 0.1,
+        }))))
+
+    stages = {}
+    for stage, values in latencies.items():
+        p50 = percentile(values, 50)
+        stages[stage] = {
+            "rows": stage_rows[stage],
+            "p50_seconds": p50,
+            "p95_seconds": percentile(values, 95),
+            "rows_per_second": stage_rows[stage] / p50 if p50 else 0.0,
+        }
+    return {
+        "scale": scale,
+        "parallelism": parallelism,
+        "generate_seconds": generate_seconds,
+        "file_rows": file_rows,
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Stages whose p50 latency regressed by more than `tolerance` against the baseline."""
+    baseline_by_scale = {run["scale"]: run for run in baseline}
+    regressions = []
+    for run in results:
+        previous = baseline_by_scale.get(run["scale"])
+        if previous is None:
+            continue
+        for stage, metrics in run["stages"].items():
+            before = previous["stages"].get(stage, {}).get("p50_seconds")
+            if before and metrics["p50_seconds"] > before * (1 + tolerance):
+                regressions.append(f"scale {run['scale']:g} {stage}: p50 {before:.4f}s -> {metrics['p50_seconds']:.4f}s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CSV import stages at several dataset scales.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100], help="scale factors, 1 is ~50 trades")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each stage per scale")
+    parser.add_argument("--seed", type=int, default=2025, help="seed for the data generator")
+    parser.add_argument("--entities", type=int, default=100, help="entity nodes to correlate with trades")
+    parser.add_argument("--parallelism", type=int, default=1, help="concurrent sessions for relationships (default: 1, one LOAD CSV query)")
+    parser.add_argument("--stub", action="store_true", help="use a recording driver instead of Neo4j (client-side costs only)")
+    parser.add_argument("--import-dir", help="Neo4j import directory (default: NEO4J_IMPORT_DIR or the server's setting)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results previously written with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.stub:
+        graphdb._driver = RecordingDriver()
+        temp_dir = tempfile.mkdtemp(prefix="import_benchmark_")
+        import_dir = Path(args.import_dir or temp_dir)
+    elif args.import_dir:
+        import_dir = Path(args.import_dir)
+    else:
+        import_dir_result = tools.get_import_dir()
+        if import_dir_result["status"] == "error":
+            print(f"Could not find the Neo4j import directory: {import_dir_result['error_message']}")
+            return 1
+        import_dir = Path(import_dir_result["neo4j_import_dir"])
+    # the parallel loader reads the source files itself
+    os.environ["NEO4J_IMPORT_DIR"] = str(import_dir)
+
+    try:
+        results = []
+        for scale in args.scales:
+            run = run_scale(scale, import_dir, args.seed, args.repeat, args.entities, args.parallelism)
+            results.append(run)
+            print(f"scale {scale:g}: generated in {run['generate_seconds']:.1f}s, peak RSS {run['peak_rss_mb']:.0f} MB")
+            for stage, metrics in run["stages"].items():
+                print(f"    {stage:<24} {metrics['rows']:>10,} rows  p50 {metrics['p50_seconds']:>8.4f}s  "
+                      f"p95 {metrics['p95_seconds']:>8.4f}s  {metrics['rows_per_second']:>12,.0f} rows/s")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    output = {"target": "stub" if args.stub else "neo4j", "runs": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("target") != output["target"]:
+            print(f"Baseline was measured against {baseline.get('target')}, not {output['target']}")
+        regressions = compare(results, baseline["runs"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
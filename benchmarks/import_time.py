@@ -0,0 +1,118 @@
+# Import-time benchmark for the modules agents and CLI tools start from.
+#
+# Each module is imported in a fresh interpreter with `python -X importtime`,
+# and the cumulative import time of the module, its slowest dependencies,
+# and whether heavy packages (the neo4j driver, google.adk) were pulled in are reported.
+#
+# usage: python benchmarks/import_time.py [--module agentic_kgraph.neo4j_for_adk ...] [--max-ms 200] [--json results.json]
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["agentic_kgraph.neo4j_for_adk", "agentic_kgraph.helper", "agentic_kgraph.tools"]
+
+# packages which should only be imported when they are actually used
+HEAVY_PACKAGES = ["neo4j", "google.adk", "pymongo"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_import(module: str, repeat: int = 3) -> Dict[str, Any]:
+    """Import a module in fresh interpreters, keeping the fastest of `repeat` runs."""
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        if completed.returncode != 0:
+            error_lines = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+            return {"module": module, "error": "\n".join(error_lines[-5:])}
+
+        imports: List[Dict[str, Any]] = []
+        for line in completed.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                imports.append({
+                    "package": match.group(4),
+                    "self_us": int(match.group(1)),
+                    "cumulative_us": int(match.group(2)),
+                    "depth": len(match.group(3)) // 2,
+                })
+        # -X importtime prints children before their parent, so the module's own
+        # dependencies are the entries between it and the previous top-level import
+        own_index = max((i for i, entry in enumerate(imports) if entry["package"] == module), default=None)
+        own = imports[own_index] if own_index is not None else None
+        cumulative_ms = own["cumulative_us"] / 1000 if own else 0.0
+        dependencies = []
+        for entry in reversed(imports[:own_index] if own_index is not None else []):
+            if entry["depth"] == own["depth"]:
+                break
+            if entry["depth"] == own["depth"] + 1:
+                dependencies.append(entry)
+        if best is None or cumulative_ms < best["cumulative_ms"]:
+            imported = {entry["package"] for entry in imports}
+            best = {
+                "module": module,
+                "cumulative_ms": cumulative_ms,
+                "modules_imported": len(imports),
+                "slowest": [
+                    {"package": entry["package"], "cumulative_ms": entry["cumulative_us"] / 1000}
+                    for entry in sorted(
+                        dependencies,
+                        key=lambda entry: entry["cumulative_us"],
+                        reverse=True
+                    )[:5]
+                ],
+                "heavy_packages": [
+                    package for package in HEAVY_PACKAGES
+                    if any(name == package or name.startswith(package + ".") for name in imported)
+                ],
+            }
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure module import times with python -X importtime.")
+    parser.add_argument("--module", action="append", help="module to import (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module, fastest is kept")
+    parser.add_argument("--max-ms", type=float, help="fail if any module takes longer to import")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = [measure_import(module, args.repeat) for module in (args.module or DEFAULT_MODULES)]
+
+    failed = False
+    for result in results:
+        if "error" in result:
+            failed = True
+            print(f"{result['module']:<32} FAILED\n{result['error']}")
+            continue
+        heavy = ", ".join(result["heavy_packages"]) or "none"
+        print(f"{result['module']:<32} {result['cumulative_ms']:>9.1f} ms  {result['modules_imported']:>5} modules  heavy: {heavy}")
+        for slow in result["slowest"]:
+            print(f"    {slow['package']:<40} {slow['cumulative_ms']:>9.1f} ms")
+        if args.max_ms is not None and result["cumulative_ms"] > args.max_ms:
+            failed = True
+            print(f"    exceeds budget of {args.max_ms} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# Recall and latency of chunk retrieval: the Neo4j vector index (approximate, HNSW) against an exact
+# brute-force scan with vector.similarity.*.
+#
+# Synthetic chunk embeddings, drawn around a number of cluster centres like the embeddings of related
+# passages, are written to the Neo4j configured in the environment (NEO4J_URI etc.) under their own label
+# and index, so an existing graph is left alone. Queries are perturbed copies of random chunks. For each
+# query both searches are timed, and the recall@k of the index is measured against the exact result.
+# The benchmark's nodes and index are removed at the end.
+#
+# With --backend local, the same embeddings go into a LocalVectorStore (agentic_kgraph/local_vectors.py) in a
+# temporary directory instead, searched in batches of --query-batch, and compared with an exact NumPy scan.
+# This needs no database.
+#
+# usage: python benchmarks/retrieval_benchmark.py --chunks 20000 --dimensions 256 --queries 200 --top-k 10
+#            [--backend neo4j|local] [--json results.json]
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from agentic_kgraph.neo4j_for_adk import graphdb, WRITE_ACCESS
+from agentic_kgraph.helper import percentile
+from agentic_kgraph.retrieval import ChunkVectorIndex, recall_at_k
+from agentic_kgraph.local_vectors import LocalVectorStore
+
+LABEL = "RetrievalBenchmarkChunk"
+INDEX_NAME = "retrieval_benchmark_embeddings"
+
+WRITE_CHUNKS_QUERY = f"""
+UNWIND $rows AS row
+CREATE (chunk:`{LABEL}` {{ text: row.text, embedding: row.embedding }})
+"""
+
+DELETE_CHUNKS_QUERY = f"""
+MATCH (chunk:`{LABEL}`)
+CALL (chunk) {{ DELETE chunk }} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+
+def synthetic_embeddings(count: int, dimensions: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.normal(size=(clusters, dimensions))
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.normal(size=(count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def write_chunks(embeddings: np.ndarray, batch_size: int):
+    for start in range(0, len(embeddings), batch_size):
+        rows = [{"text": f"chunk {start + i}", "embedding": vector.tolist()}
+                for i, vector in enumerate(embeddings[start:start + batch_size])]
+        result = graphdb.send_query(WRITE_CHUNKS_QUERY, {"rows": rows}, access_mode=WRITE_ACCESS)
+        if result["status"] == "error":
+            raise RuntimeError(result["error_message"])
+
+
+def latency_summary(values) -> Dict[str, float]:
+    return {"p50_seconds": percentile(values, 50), "p95_seconds": percentile(values, 95)}
+
+
+def synthetic_queries(embeddings: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    return embeddings[rng.integers(0, len(embeddings), count)] + 0.1 * rng.normal(size=(count, embeddings.shape[1]))
+
+
+def run_local(args, embeddings: np.ndarray, queries: np.ndarray) -> Dict[str, Any]:
+    store_dir = tempfile.mkdtemp(prefix="retrieval_benchmark_")
+    try:
+        store = LocalVectorStore(store_dir, args.dimensions)
+        started = time.perf_counter()
+        for start in range(0, len(embeddings), args.batch_size):
+            batch = embeddings[start:start + args.batch_size]
+            store.append(batch, [{"chunk_id": str(start + i), "text": f"chunk {start + i}"} for i in range(len(batch))])
+        write_seconds = time.perf_counter() - started
+
+        latencies, recalls = [], []
+        for start in range(0, len(queries), args.query_batch):
+            batch = queries[start:start + args.query_batch]
+            started = time.perf_counter()
+            found = store.search_batch(batch, args.top_k)
+            # per query, so the percentiles are comparable with single queries against Neo4j
+            latencies += [(time.perf_counter() - started) / len(batch)] * len(batch)
+
+            scores = batch @ embeddings.T / np.linalg.norm(batch, axis=1, keepdims=True)
+            exact_rows = np.argsort(-scores, axis=1)[:, :args.top_k]
+            for query_found, rows in zip(found, exact_rows):
+                recalls.append(recall_at_k(query_found, [{"chunk_id": str(row)} for row in rows]))
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    return {
+        "write_seconds": write_seconds,
+        "index_seconds": 0.0,
+        "local_store": latency_summary(latencies),
+        "mean_recall": sum(recalls) / len(recalls),
+        "min_recall": min(recalls),
+    }
+
+
+def run_neo4j(args, embeddings: np.ndarray, queries: np.ndarray) -> Dict[str, Any]:
+    index = ChunkVectorIndex(INDEX_NAME, LABEL, "embedding", args.dimensions, args.similarity)
+
+    started = time.perf_counter()
+    write_chunks(embeddings, args.batch_size)
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = index.create()
+    if result["status"] == "error":
+        raise RuntimeError(result["error_message"])
+    index_seconds = time.perf_counter() - started
+
+    index_latencies, brute_force_latencies, recalls = [], [], []
+    for query_vector in queries.tolist():
+        started = time.perf_counter()
+        found = index.search(query_vector, args.top_k, expand=False)
+        index_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        exact = index.brute_force_search(query_vector, args.top_k)
+        brute_force_latencies.append(time.perf_counter() - started)
+
+        recalls.append(recall_at_k(found, exact))
+
+    return {
+        "write_seconds": write_seconds,
+        "index_seconds": index_seconds,
+        "vector_index": latency_summary(index_latencies),
+        "brute_force": latency_summary(brute_force_latencies),
+        "mean_recall": sum(recalls) / len(recalls),
+        "min_recall": min(recalls),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    rng = np.random.default_rng(args.seed)
+    embeddings = synthetic_embeddings(args.chunks, args.dimensions, args.clusters, rng)
+    queries = synthetic_queries(embeddings, args.queries, rng)
+    results = run_local(args, embeddings, queries) if args.backend == "local" else run_neo4j(args, embeddings, queries)
+    return {
+        "backend": args.backend,
+        "chunks": args.chunks,
+        "dimensions": args.dimensions,
+        "top_k": args.top_k,
+        "similarity": args.similarity,
+        **results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark vector index recall and latency against brute force.")
+    parser.add_argument("--chunks", type=int, default=20000, help="chunks to write")
+    parser.add_argument("--dimensions", type=int, default=256, help="embedding dimensions")
+    parser.add_argument("--clusters", type=int, default=50, help="clusters the embeddings are drawn around")
+    parser.add_argument("--queries", type=int, default=200, help="queries to run")
+    parser.add_argument("--top-k", type=int, default=10, help="chunks per query")
+    parser.add_argument("--similarity", choices=["cosine", "euclidean"], default="cosine")
+    parser.add_argument("--batch-size", type=int, default=1000, help="chunks written per transaction")
+    parser.add_argument("--backend", choices=["neo4j", "local"], default="neo4j", help="vector index in Neo4j, or a LocalVectorStore")
+    parser.add_argument("--query-batch", type=int, default=1, help="queries per search with the local backend")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    if args.backend == "local" and args.similarity != "cosine":
+        parser.error("the local backend only supports cosine similarity")
+    try:
+        results = run(args)
+    finally:
+        if args.backend == "neo4j":
+            ChunkVectorIndex(INDEX_NAME, LABEL, "embedding", args.dimensions, args.similarity).drop()
+            graphdb.send_query(DELETE_CHUNKS_QUERY, access_mode=WRITE_ACCESS)
+
+    print(f"{results['chunks']:,} chunks x {results['dimensions']} dimensions, top {results['top_k']} by {results['similarity']}")
+    print(f"    written in {results['write_seconds']:.1f}s, indexed in {results['index_seconds']:.1f}s")
+    for name in ("vector_index", "brute_force", "local_store"):
+        if name not in results:
+            continue
+        print(f"    {name:<14} p50 {results[name]['p50_seconds'] * 1000:>8.2f} ms  p95 {results[name]['p95_seconds'] * 1000:>8.2f} ms")
+    print(f"    recall@{results['top_k']}: mean {results['mean_recall']:.3f}, min {results['min_recall']:.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
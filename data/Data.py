@@ -1,284 +1,434 @@
-# Generating compact, realistic GPM PoC dataset (Option A: ~50 rows per CSV, Unstructured depth Option 1: ~10 documents)
-import os, random, zipfile, textwrap
-from datetime import datetime, timedelta
-import pandas as pd
-
-random.seed(2025)
-out_dir = "/mnt/data/gpm_poc_compact"
-os.makedirs(out_dir, exist_ok=True)
-
-# Time window
-start_dt = datetime(2025,1,1)
-end_dt = datetime(2025,10,1)
-def rand_ts(start=start_dt, end=end_dt):
-    delta = end - start
-    return start + timedelta(seconds=random.randint(0, int(delta.total_seconds())))
-
-# Scenarios mapping
-scenarios = [
-    {"id":"SCEN1","name":"Equity SSI Late Update","tag":"SSI"},
-    {"id":"SCEN2","name":"FI FX Conversion Mismatch","tag":"FX"},
-    {"id":"SCEN3","name":"Corporate Action Sync Failure","tag":"CA"},
-    {"id":"SCEN4","name":"Interbook Transfer Mapping Error","tag":"IB"},
-    {"id":"SCEN5","name":"Nostro Shortfall - Funding Issue","tag":"NS"}
-]
-
-# 1) Trades - 50 rows, distributed across scenarios
-instruments = ["MSFT.O","AAPL.O","DBR.X","JPM.N","NIKK.N","GOVBOND10Y","EURUSDSPOT","USDJPYSPOT","SPX_OPT","CDS_UK"]
-trades = []
-for i in range(50):
-    sc = scenarios[i % len(scenarios)]
-    tdt = rand_ts()
-    qty = random.choice([50,100,200,500,1000])
-    price = round(random.uniform(5,300),2)
-    trades.append({
-        "Trade_ID": f"T{9000+i}",
-        "Scenario": sc["id"],
-        "Trade_Date": tdt.strftime("%Y-%m-%d %H:%M:%S"),
-        "Trader": random.choice(["joe.trader","li.chen","maria.g","omar.khan","sara.r"]),
-        "Desk": random.choice(["Equities-APAC","FI-EMEA","FX-NA","Derivatives-APAC"]),
-        "Instrument": random.choice(instruments),
-        "Asset_Class": "",
-        "Quantity": qty,
-        "Price": price,
-        "Currency": random.choice(["USD","EUR","JPY","GBP"]),
-        "Counterparty": random.choice([f"CP{str(x).zfill(3)}" for x in range(1,21)]),
-        "Book": random.choice([f"Book{n}" for n in range(1,8)]),
-        "Notes": ""
-    })
-# fill Asset_Class based on instrument
-for r in trades:
-    instr = r["Instrument"]
-    if "." in instr or "SPX" in instr:
-        r["Asset_Class"] = "Equity"
-    elif "GOVBOND" in instr or "DBR" in instr:
-        r["Asset_Class"] = "Fixed Income"
-    elif "SPOT" in instr or "FX" in instr:
-        r["Asset_Class"] = "FX"
-    else:
-        r["Asset_Class"] = "Derivatives"
-
-df_trades = pd.DataFrame(trades)
-df_trades.to_csv(os.path.join(out_dir,"trades.csv"), index=False)
-
-# 2) Positions - one snapshot per trade + 20% corrected snapshots (~60 rows)
-positions = []
-for idx, row in df_trades.iterrows():
-    pos_dt = datetime.strptime(row["Trade_Date"], "%Y-%m-%d %H:%M:%S") + timedelta(hours=6)
-    positions.append({
-        "Position_ID": f"P{10000+idx}",
-        "Trade_ID": row["Trade_ID"],
-        "Snapshot": "T+0",
-        "Valuation_Date": pos_dt.strftime("%Y-%m-%d %H:%M:%S"),
-        "Quantity": row["Quantity"],
-        "Market_Value": round(row["Quantity"] * row["Price"],2),
-        "Book": row["Book"]
-    })
-    if random.random() < 0.2:
-        pos_dt2 = pos_dt + timedelta(days=1)
-        corr = row["Quantity"] + random.choice([-int(row["Quantity"]*0.1), int(row["Quantity"]*0.2), 0])
-        positions.append({
-            "Position_ID": f"P{10000+idx}_1",
-            "Trade_ID": row["Trade_ID"],
-            "Snapshot": "T+1",
-            "Valuation_Date": pos_dt2.strftime("%Y-%m-%d %H:%M:%S"),
-            "Quantity": max(0, corr),
-            "Market_Value": round(max(0,corr) * row["Price"],2),
-            "Book": row["Book"]
-        })
-df_positions = pd.DataFrame(positions)
-df_positions.to_csv(os.path.join(out_dir,"positions.csv"), index=False)
-
-# 3) Settlements - 40 rows subset; inject scenario-specific failures
-settlements = []
-sample_idxs = random.sample(range(len(df_trades)), 40)
-for idx in sample_idxs:
-    t = df_trades.iloc[idx]
-    settle_dt = datetime.strptime(t["Trade_Date"], "%Y-%m-%d %H:%M:%S") + timedelta(days=random.choice([1,2]))
-    fail = False; fail_reason = ""
-    if t["Scenario"]=="SCEN1" and random.random()<0.3:
-        fail = True; fail_reason = "SSI_Mismatch"
-    if t["Scenario"]=="SCEN2" and random.random()<0.2:
-        fail = True; fail_reason = "FX_Conversion_Error"
-    if t["Scenario"]=="SCEN3" and random.random()<0.15:
-        fail = True; fail_reason = "CA_Not_Applied"
-    if t["Scenario"]=="SCEN5" and random.random()<0.25:
-        fail = True; fail_reason = "Insufficient_Funds"
-    status = "Failed" if fail else random.choices(["Confirmed","Pending"], weights=[0.8,0.2])[0]
-    settlements.append({
-        "Settlement_ID": f"S{20000+idx}",
-        "Trade_ID": t["Trade_ID"],
-        "Settlement_Date": settle_dt.strftime("%Y-%m-%d %H:%M:%S"),
-        "Quantity": t["Quantity"] - (0 if status=="Confirmed" else random.choice([0,5,10])),
-        "Currency": t["Currency"],
-        "Amount": round(t["Quantity"] * t["Price"],2),
-        "Settlement_Status": status,
-        "Fail_Reason": fail_reason,
-        "Custodian": random.choice(["JPM","CITI","BOFA","BNP","HSBC"])
-    })
-df_settlements = pd.DataFrame(settlements)
-df_settlements.to_csv(os.path.join(out_dir,"settlements.csv"), index=False)
-
-# 4) Corporate Actions - 10 rows relevant to SCEN3
-cas = []
-for i in range(10):
-    ca_dt = rand_ts()
-    cas.append({
-        "CA_ID": f"CA{500+i}",
-        "Instrument": random.choice(instruments),
-        "CA_Type": random.choice(["Split","Dividend","SpinOff","RightsIssue"]),
-        "Effective_Date": ca_dt.strftime("%Y-%m-%d"),
-        "Notes": "Feed update required across subledgers"
-    })
-df_cas = pd.DataFrame(cas)
-df_cas.to_csv(os.path.join(out_dir,"corporate_actions.csv"), index=False)
-
-# 5) Breaks - 30 rows, linked to trades/settlements where applicable
-breaks = []
-for i in range(30):
-    t = df_trades.sample(1).iloc[0]
-    detected = datetime.strptime(t["Trade_Date"], "%Y-%m-%d %H:%M:%S") + timedelta(hours=random.randint(1,72))
-    linked_settle = df_settlements[df_settlements["Trade_ID"]==t["Trade_ID"]]
-    settle_id = linked_settle.iloc[0]["Settlement_ID"] if not linked_settle.empty and random.random()<0.7 else ""
-    reason = linked_settle.iloc[0]["Fail_Reason"] if (not linked_settle.empty and linked_settle.iloc[0]["Fail_Reason"]) else random.choice(["AutoDetected","StaticDataError","IntegrationError","ToleranceExceeded"])
-    breaks.append({
-        "Break_ID": f"B{30000+i}",
-        "Trade_ID": t["Trade_ID"],
-        "Settlement_ID": settle_id,
-        "Break_Type": random.choice(["Cash_Break","Quantity_Mismatch","Documentation_Gap","Pricing_Mismatch","SSI_Issue","Feed_Delay","CA_Mismatch"]),
-        "Break_Reason": reason,
-        "Detected_Date": detected.strftime("%Y-%m-%d %H:%M:%S"),
-        "Status": random.choice(["Open","Investigating","Resolved"]),
-        "Assigned_To": random.choice(["GPM_Analyst1","GPM_Analyst2","GPM_Analyst3","CustodyOps","StaticDataTeam"]),
-        "Severity": random.choice(["High","Medium","Low"])
-    })
-df_breaks = pd.DataFrame(breaks)
-df_breaks.to_csv(os.path.join(out_dir,"breaks.csv"), index=False)
-
-# 6) ITSM tickets - 25 rows, rich descriptions, linked to breaks
-itsm = []
-systems = ["ReconciliationEngine","MQGateway","SettlementHub","PositionEngine","CAFeed","SSIService","TreasurySystem"]
-for i in range(25):
-    b = df_breaks.sample(1).iloc[0]
-    created = rand_ts()
-    itsm.append({
-        "Ticket_ID": f"ITSM{7000+i}",
-        "Linked_Break": b["Break_ID"],
-        "System": random.choice(systems),
-        "Priority": random.choice(["Low","Medium","High","Critical"]),
-        "Summary": f"{b['Break_Type']} for trade {b['Trade_ID']}",
-        "Description": ("Detailed: " + b["Break_Reason"] + ". Steps: Investigate static data, verify custodian confirmation, check MQ queues, apply manual fix if required."),
-        "Created_On": created.strftime("%Y-%m-%d %H:%M:%S"),
-        "Status": random.choice(["Open","In Progress","Resolved","Pending RCA"]),
-        "Assigned_To": random.choice(["Infra Team","Middleware","Custody Team","GPM Support","Treasury Ops"])
-    })
-df_itsm = pd.DataFrame(itsm)
-df_itsm.to_csv(os.path.join(out_dir,"itsm_tickets.csv"), index=False)
-
-# 7) Change tickets - 8 rows (postmortem fixes)
-changes = []
-for i in range(8):
-    created = rand_ts()
-    changes.append({
-        "Change_ID": f"CHG{900+i}",
-        "Change_Date": created.strftime("%Y-%m-%d"),
-        "Description": random.choice(["SSI table update","MQ consumer tuning","Reconciliation tolerance change","CA feed parser fix","Schedule adjustment"]),
-        "Impact": random.choice(["Low","Medium","High"]),
-        "Related_System": random.choice(systems),
-        "Status": random.choice(["Planned","Completed","RolledBack"])
-    })
-df_changes = pd.DataFrame(changes)
-df_changes.to_csv(os.path.join(out_dir,"change_tickets.csv"), index=False)
-
-# 8) Audit trail - 50 rows (actions)
-audits = []
-actions = ["CREATE_BREAK","ASSIGN_ANALYST","UPDATE_POSITION","ESCALATE_TO_IT","RESOLVE_BREAK"]
-for i in range(50):
-    b = df_breaks.sample(1).iloc[0]
-    ts = rand_ts()
-    audits.append({
-        "Audit_ID": f"AUD{4000+i}",
-        "Entity_ID": b["Break_ID"],
-        "Action": random.choice(actions),
-        "User": random.choice(["GPM_Analyst1","GPM_Analyst2","GPM_Lead","CustodyOps","StaticDataTeam"]),
-        "Timestamp": ts.strftime("%Y-%m-%d %H:%M:%S"),
-        "Notes": random.choice(["Logged by automation","Manual update after counterparty confirmation","Escalated following SLA breach","Resolved after SSI update"])
-    })
-df_audits = pd.DataFrame(audits)
-df_audits.to_csv(os.path.join(out_dir,"audit_trail.csv"), index=False)
-
-# 9) Emails - 10 multi-line realistic threads (Option1 depth)
-email_threads = []
-for i in range(10):
-    b = df_breaks.sample(1).iloc[0]
-    trade = df_trades[df_trades["Trade_ID"]==b["Trade_ID"]].iloc[0]
-    t0 = datetime.strptime(trade["Trade_Date"], "%Y-%m-%d %H:%M:%S")
-    subj = f"[Action Required] Settlement Break {b['Break_ID']} for {trade['Trade_ID']}"
-    body = (
-        f"From: {trade['Trader']}@bank.com\nTo: gpm_ops@bank.com\nCC: staticdata@bank.com,custody@bank.com,it_support@bank.com\nDate: {t0.strftime('%Y-%m-%d %H:%M:%S')}\nSubject: {subj}\n\n"
-        f"Team,\n\nWe have a settlement failure for trade {trade['Trade_ID']} ({trade['Instrument']}). Reason: {b['Break_Reason']}. This affects client P&L reporting and may impact T+1 regulatory submission. Please advise corrective action and timeline.\n\nRegards,\n{trade['Trader']}\n\n"
-        "-----Forwarded Message-----\n"
-        f"From: custody@custodian.com\nTo: gpm_ops@bank.com\nDate: {(t0+timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')}\nSubject: Re: {subj}\n\nCustodian: We see SSI mismatch. Provide updated instructions.\n\n"
-        f"Ops Reply: Assigned to {b['Assigned_To']}. ITSM ticket created: ITSM{random.randint(7000,7025)}\n"
-    )
-    email_threads.append(body)
-with open(os.path.join(out_dir,"emails.txt"), "w") as f:
-    f.write("\n\n".join(email_threads))
-
-# 10) Chats - 10 threads (Option1 depth)
-chat_threads = []
-for i in range(10):
-    b = df_breaks.sample(1).iloc[0]
-    trade = df_trades[df_trades["Trade_ID"]==b["Trade_ID"]].iloc[0]
-    t0 = datetime.strptime(trade["Trade_Date"], "%Y-%m-%d %H:%M:%S")
-    chat = (
-        f"[{(t0+timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')}] ops_analyst: Created break {b['Break_ID']} for trade {trade['Trade_ID']}\n"
-        f"[{(t0+timedelta(hours=1,minutes=10)).strftime('%Y-%m-%d %H:%M:%S')}] custody_ops: Checking SSI registry for CP {trade['Counterparty']}\n"
-        f"[{(t0+timedelta(hours=1,minutes=25)).strftime('%Y-%m-%d %H:%M:%S')}] it_support: Observed MQ lag; creating ticket ITSM{random.randint(7000,7025)}\n"
-        f"[{(t0+timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')}] ops_lead: If not resolved within SLA ({b['Severity']}), escalate to Treasury\n"
-    )
-    chat_threads.append(chat)
-with open(os.path.join(out_dir,"chats.txt"), "w") as f:
-    f.write("\n\n".join(chat_threads))
-
-# 11) SOP and SLA documents (text)
-sop_text = textwrap.dedent("""
-SOP: GPM Break Handling - Key Steps
-1. Detection: Automated reconciliation at T+0 flags exceptions in ReconciliationEngine.
-2. Classification: Break types include Cash_Break, Quantity_Mismatch, SSI_Issue, CA_Mismatch, Others.
-3. Assignment: Breaks auto-route to GPM queue; critical ones assigned to GPM_Lead.
-4. Resolution: Engage StaticData, CustodyOps, or IT (MQGateway) depending on root cause.
-5. Escalation: SLA breaches escalate to Treasury and Compliance; ITSM tickets must include RCA.
-""")
-with open(os.path.join(out_dir,"sop.txt"), "w") as f:
-    f.write(sop_text)
-
-sla_text = textwrap.dedent("""
-SLA: GPM Breaks
-- High severity: Resolve within 1 business hour.
-- Medium severity: Resolve within T+1 business day.
-- Low severity: Resolve within T+3 business days.
-- ITSM tickets created by GPM must include Root Cause Analysis prior to closure.
-""")
-with open(os.path.join(out_dir,"sla.txt"), "w") as f:
-    f.write(sla_text)
-
-# 12) Relationships CSV (for Neo4j ingestion)
-rels = []
-for _, t in df_trades.iterrows():
-    rels.append({"Source": t["Trade_ID"], "Target": f"P{10000+int(t.name)}", "Type": "HAS_POSITION"})
-for _, s in df_settlements.iterrows():
-    rels.append({"Source": s["Trade_ID"], "Target": s["Settlement_ID"], "Type": "HAS_SETTLEMENT"})
-for _, b in df_breaks.iterrows():
-    rels.append({"Source": b["Break_ID"], "Target": b["Trade_ID"], "Type": "BREAK_OF"})
-for _, it in df_itsm.iterrows():
-    rels.append({"Source": it["Ticket_ID"], "Target": it["Linked_Break"], "Type": "TICKET_FOR_BREAK"})
-df_rels = pd.DataFrame(rels)
-df_rels.to_csv(os.path.join(out_dir,"relationships.csv"), index=False)
-
-# Zip up the folder
-zip_path = "/mnt/data/gpm_poc_compact.zip"
-with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-    for fname in sorted(os.listdir(out_dir)):
-        zf.write(os.path.join(out_dir, fname), arcname=fname)
-
+# Generating a realistic GPM PoC dataset (structured CSVs plus unstructured email/chat/SOP/SLA documents)
+#
+# The default scale (1.0) matches the original compact dataset: ~50 trades, ~60 positions, 40 settlements,
+# 30 breaks, 25 ITSM tickets and ~10 documents. Larger scale factors produce proportionally larger files.
+# Rows are generated with vectorized NumPy/pandas code one chunk of trades at a time, and appended to the
+# output files chunk by chunk, so memory use stays flat even for 10M-row trades/positions files.
+# Every dependent row (positions, settlements, breaks, tickets, audits, relationships) is generated in the
+# same chunk as the trades it refers to, so references across files are always consistent.
+#
+# usage: python data/Data.py --scale 1000 --out-dir /tmp/gpm_scale_1000 --seed 2025 --scenarios 5
+
+import os
+import random
+import zipfile
+import argparse
+import textwrap
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Time window
+start_dt = np.datetime64("2025-01-01T00:00:00")
+end_dt = np.datetime64("2025-10-01T00:00:00")
+window_seconds = int((end_dt - start_dt) / np.timedelta64(1, "s"))
+
+# Rows per scale factor of 1.0
+TRADES_PER_SCALE = 50
+SETTLEMENT_RATE = 0.8               # 40 of 50 trades settle
+CORRECTED_POSITION_RATE = 0.2       # ~20% of trades get a T+1 corrected position snapshot
+BREAKS_PER_TRADE = 30 / 50
+TICKETS_PER_BREAK = 25 / 30
+AUDITS_PER_BREAK = 50 / 30
+CORPORATE_ACTIONS_PER_SCALE = 10
+CHANGES_PER_SCALE = 8
+
+# Scenario templates. With more scenarios than templates, the templates repeat (SCEN6 behaves like SCEN1).
+SCENARIO_TEMPLATES = [
+    {"name":"Equity SSI Late Update","tag":"SSI","fail_reason":"SSI_Mismatch","fail_rate":0.3},
+    {"name":"FI FX Conversion Mismatch","tag":"FX","fail_reason":"FX_Conversion_Error","fail_rate":0.2},
+    {"name":"Corporate Action Sync Failure","tag":"CA","fail_reason":"CA_Not_Applied","fail_rate":0.15},
+    {"name":"Interbook Transfer Mapping Error","tag":"IB","fail_reason":"","fail_rate":0.0},
+    {"name":"Nostro Shortfall - Funding Issue","tag":"NS","fail_reason":"Insufficient_Funds","fail_rate":0.25},
+]
+
+instruments = np.array(["MSFT.O","AAPL.O","DBR.X","JPM.N","NIKK.N","GOVBOND10Y","EURUSDSPOT","USDJPYSPOT","SPX_OPT","CDS_UK"])
+
+def asset_class(instr: str) -> str:
+    if "." in instr or "SPX" in instr:
+        return "Equity"
+    elif "GOVBOND" in instr or "DBR" in instr:
+        return "Fixed Income"
+    elif "SPOT" in instr or "FX" in instr:
+        return "FX"
+    else:
+        return "Derivatives"
+
+asset_classes = np.array([asset_class(instr) for instr in instruments])
+
+traders = np.array(["joe.trader","li.chen","maria.g","omar.khan","sara.r"])
+desks = np.array(["Equities-APAC","FI-EMEA","FX-NA","Derivatives-APAC"])
+currencies = np.array(["USD","EUR","JPY","GBP"])
+counterparties = np.array([f"CP{str(x).zfill(3)}" for x in range(1,21)])
+books = np.array([f"Book{n}" for n in range(1,8)])
+custodians = np.array(["JPM","CITI","BOFA","BNP","HSBC"])
+break_types = np.array(["Cash_Break","Quantity_Mismatch","Documentation_Gap","Pricing_Mismatch","SSI_Issue","Feed_Delay","CA_Mismatch"])
+break_reasons = np.array(["AutoDetected","StaticDataError","IntegrationError","ToleranceExceeded"])
+break_statuses = np.array(["Open","Investigating","Resolved"])
+analysts = np.array(["GPM_Analyst1","GPM_Analyst2","GPM_Analyst3","CustodyOps","StaticDataTeam"])
+severities = np.array(["High","Medium","Low"])
+systems = np.array(["ReconciliationEngine","MQGateway","SettlementHub","PositionEngine","CAFeed","SSIService","TreasurySystem"])
+priorities = np.array(["Low","Medium","High","Critical"])
+ticket_statuses = np.array(["Open","In Progress","Resolved","Pending RCA"])
+ticket_teams = np.array(["Infra Team","Middleware","Custody Team","GPM Support","Treasury Ops"])
+ca_types = np.array(["Split","Dividend","SpinOff","RightsIssue"])
+change_descriptions = np.array(["SSI table update","MQ consumer tuning","Reconciliation tolerance change","CA feed parser fix","Schedule adjustment"])
+impacts = np.array(["Low","Medium","High"])
+change_statuses = np.array(["Planned","Completed","RolledBack"])
+audit_actions = np.array(["CREATE_BREAK","ASSIGN_ANALYST","UPDATE_POSITION","ESCALATE_TO_IT","RESOLVE_BREAK"])
+audit_users = np.array(["GPM_Analyst1","GPM_Analyst2","GPM_Lead","CustodyOps","StaticDataTeam"])
+audit_notes = np.array(["Logged by automation","Manual update after counterparty confirmation","Escalated following SLA breach","Resolved after SSI update"])
+
+TICKET_STEPS = ". Steps: Investigate static data, verify custodian confirmation, check MQ queues, apply manual fix if required."
+
+def make_scenarios(count: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {"id": f"SCEN{i+1}", **SCENARIO_TEMPLATES[i % len(SCENARIO_TEMPLATES)]}
+        for i in range(count)
+    ])
+
+def ids(prefix: str, numbers: np.ndarray) -> np.ndarray:
+    return np.char.add(prefix, numbers.astype(str))
+
+def rand_ts(rng: np.random.Generator, n: int) -> np.ndarray:
+    return start_dt + rng.integers(0, window_seconds + 1, n).astype("timedelta64[s]")
+
+def fmt_ts(values: np.ndarray) -> np.ndarray:
+    """'%Y-%m-%d %H:%M:%S' formatting for datetime64[s] arrays."""
+    return np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ")
+
+def fmt_date(values: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(values, unit="D")
+
+def pick(rng: np.random.Generator, choices: np.ndarray, n: int, p=None) -> np.ndarray:
+    return choices[rng.choice(len(choices), n, p=p)]
+
+def scaled_count(rng: np.random.Generator, n: int, rate: float) -> int:
+    """n * rate rounded, with the fractional part kept as a probability so totals stay proportional."""
+    expected = n * rate
+    return int(expected) + int(rng.random() < expected - int(expected))
+
+
+class CsvAppender:
+    """Appends DataFrames to CSV files, writing the header with the first chunk."""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.rows: Dict[str, int] = {}
+
+    def write(self, file_name: str, df: pd.DataFrame):
+        first = file_name not in self.rows
+        df.to_csv(os.path.join(self.out_dir, file_name), mode="w" if first else "a", header=first, index=False)
+        self.rows[file_name] = self.rows.get(file_name, 0) + len(df)
+
+
+def generate_chunk(rng: np.random.Generator, scenarios: pd.DataFrame, offsets: Dict[str, int], n_trades: int) -> Dict[str, pd.DataFrame]:
+    """Generate all structured rows belonging to one chunk of trades.
+
+    offsets holds the next id number per entity, and is advanced past the rows generated.
+    """
+    # 1) Trades, distributed across scenarios
+    trade_index = offsets["trade"] + np.arange(n_trades)
+    scenario_index = trade_index % len(scenarios)
+    trade_dt = rand_ts(rng, n_trades)
+    qty = rng.choice(np.array([50,100,200,500,1000]), n_trades)
+    price = np.round(rng.uniform(5, 300, n_trades), 2)
+    instrument_index = rng.integers(0, len(instruments), n_trades)
+    trade_ids = ids("T", 9000 + trade_index)
+    trade_book = pick(rng, books, n_trades)
+    trader = pick(rng, traders, n_trades)
+    trade_currency = pick(rng, currencies, n_trades)
+    counterparty = pick(rng, counterparties, n_trades)
+    trades = pd.DataFrame({
+        "Trade_ID": trade_ids,
+        "Scenario": scenarios["id"].to_numpy()[scenario_index],
+        "Trade_Date": fmt_ts(trade_dt),
+        "Trader": trader,
+        "Desk": pick(rng, desks, n_trades),
+        "Instrument": instruments[instrument_index],
+        "Asset_Class": asset_classes[instrument_index],
+        "Quantity": qty,
+        "Price": price,
+        "Currency": trade_currency,
+        "Counterparty": counterparty,
+        "Book": trade_book,
+        "Notes": "",
+    })
+
+    # 2) Positions - one snapshot per trade + ~20% corrected snapshots, listed right after the original
+    pos_dt = trade_dt + np.timedelta64(6, "h")
+    position_ids = ids("P", 10000 + trade_index)
+    base_positions = pd.DataFrame({
+        "Position_ID": position_ids,
+        "Trade_ID": trade_ids,
+        "Snapshot": "T+0",
+        "Valuation_Date": fmt_ts(pos_dt),
+        "Quantity": qty,
+        "Market_Value": np.round(qty * price, 2),
+        "Book": trade_book,
+        "_order": np.arange(n_trades) * 2,
+    })
+    corrected = rng.random(n_trades) < CORRECTED_POSITION_RATE
+    adjustment = np.stack([-(qty * 0.1).astype(int), (qty * 0.2).astype(int), np.zeros(n_trades, dtype=int)])
+    corr_qty = np.maximum(0, qty + adjustment[rng.integers(0, 3, n_trades), np.arange(n_trades)])
+    corrected_positions = pd.DataFrame({
+        "Position_ID": np.char.add(position_ids, "_1"),
+        "Trade_ID": trade_ids,
+        "Snapshot": "T+1",
+        "Valuation_Date": fmt_ts(pos_dt + np.timedelta64(1, "D")),
+        "Quantity": corr_qty,
+        "Market_Value": np.round(corr_qty * price, 2),
+        "Book": trade_book,
+        "_order": np.arange(n_trades) * 2 + 1,
+    })[corrected]
+    positions = pd.concat([base_positions, corrected_positions]).sort_values("_order", kind="stable").drop(columns="_order")
+
+    # 3) Settlements - a subset of trades; inject scenario-specific failures
+    settled = rng.random(n_trades) < SETTLEMENT_RATE
+    fail_rate = scenarios["fail_rate"].to_numpy()[scenario_index]
+    fail = rng.random(n_trades) < fail_rate
+    fail_reason = np.where(fail, scenarios["fail_reason"].to_numpy()[scenario_index], "")
+    status = np.where(fail, "Failed", pick(rng, np.array(["Confirmed","Pending"]), n_trades, p=[0.8, 0.2]))
+    settle_shortfall = np.where(status == "Confirmed", 0, rng.choice(np.array([0,5,10]), n_trades))
+    settlement_ids = ids("S", 20000 + trade_index)
+    settlements = pd.DataFrame({
+        "Settlement_ID": settlement_ids,
+        "Trade_ID": trade_ids,
+        "Settlement_Date": fmt_ts(trade_dt + rng.integers(1, 3, n_trades).astype("timedelta64[D]")),
+        "Quantity": qty - settle_shortfall,
+        "Currency": trade_currency,
+        "Amount": np.round(qty * price, 2),
+        "Settlement_Status": status,
+        "Fail_Reason": fail_reason,
+        "Custodian": pick(rng, custodians, n_trades),
+    })[settled]
+
+    # 4) Breaks - linked to trades, and to their settlement (when there is one) 70% of the time
+    n_breaks = scaled_count(rng, n_trades, BREAKS_PER_TRADE)
+    break_trade = rng.integers(0, n_trades, n_breaks)
+    break_index = offsets["break"] + np.arange(n_breaks)
+    break_ids = ids("B", 30000 + break_index)
+    has_settlement = settled[break_trade]
+    settlement_fail_reason = np.where(has_settlement, fail_reason[break_trade], "")
+    break_reason = np.where(settlement_fail_reason != "", settlement_fail_reason, pick(rng, break_reasons, n_breaks))
+    break_type = pick(rng, break_types, n_breaks)
+    break_assignee = pick(rng, analysts, n_breaks)
+    break_severity = pick(rng, severities, n_breaks)
+    breaks = pd.DataFrame({
+        "Break_ID": break_ids,
+        "Trade_ID": trade_ids[break_trade],
+        "Settlement_ID": np.where(has_settlement & (rng.random(n_breaks) < 0.7), settlement_ids[break_trade], ""),
+        "Break_Type": break_type,
+        "Break_Reason": break_reason,
+        "Detected_Date": fmt_ts(trade_dt[break_trade] + rng.integers(1, 73, n_breaks).astype("timedelta64[h]")),
+        "Status": pick(rng, break_statuses, n_breaks),
+        "Assigned_To": break_assignee,
+        "Severity": break_severity,
+    })
+
+    # 5) ITSM tickets - rich descriptions, linked to breaks
+    n_tickets = scaled_count(rng, n_breaks, TICKETS_PER_BREAK) if n_breaks else 0
+    ticket_break = rng.integers(0, max(n_breaks, 1), n_tickets)
+    ticket_index = offsets["ticket"] + np.arange(n_tickets)
+    ticket_ids = ids("ITSM", 7000 + ticket_index)
+    itsm = pd.DataFrame({
+        "Ticket_ID": ticket_ids,
+        "Linked_Break": break_ids[ticket_break] if n_tickets else np.array([], dtype=str),
+        "System": pick(rng, systems, n_tickets),
+        "Priority": pick(rng, priorities, n_tickets),
+        "Summary": np.char.add(np.char.add(break_type[ticket_break], " for trade "), trades["Trade_ID"].to_numpy()[break_trade[ticket_break]]) if n_tickets else np.array([], dtype=str),
+        "Description": np.char.add(np.char.add("Detailed: ", break_reason[ticket_break]), TICKET_STEPS) if n_tickets else np.array([], dtype=str),
+        "Created_On": fmt_ts(rand_ts(rng, n_tickets)),
+        "Status": pick(rng, ticket_statuses, n_tickets),
+        "Assigned_To": pick(rng, ticket_teams, n_tickets),
+    })
+
+    # 6) Audit trail - actions on breaks
+    n_audits = scaled_count(rng, n_breaks, AUDITS_PER_BREAK) if n_breaks else 0
+    audit_index = offsets["audit"] + np.arange(n_audits)
+    audits = pd.DataFrame({
+        "Audit_ID": ids("AUD", 4000 + audit_index),
+        "Entity_ID": break_ids[rng.integers(0, max(n_breaks, 1), n_audits)] if n_audits else np.array([], dtype=str),
+        "Action": pick(rng, audit_actions, n_audits),
+        "User": pick(rng, audit_users, n_audits),
+        "Timestamp": fmt_ts(rand_ts(rng, n_audits)),
+        "Notes": pick(rng, audit_notes, n_audits),
+    })
+
+    # 7) Relationships (for Neo4j ingestion)
+    relationships = pd.concat([
+        pd.DataFrame({"Source": trade_ids, "Target": position_ids, "Type": "HAS_POSITION"}),
+        pd.DataFrame({"Source": settlements["Trade_ID"], "Target": settlements["Settlement_ID"], "Type": "HAS_SETTLEMENT"}),
+        pd.DataFrame({"Source": breaks["Break_ID"], "Target": breaks["Trade_ID"], "Type": "BREAK_OF"}),
+        pd.DataFrame({"Source": itsm["Ticket_ID"], "Target": itsm["Linked_Break"], "Type": "TICKET_FOR_BREAK"}),
+    ])
+
+    offsets["trade"] += n_trades
+    offsets["break"] += n_breaks
+    offsets["ticket"] += n_tickets
+    offsets["audit"] += n_audits
+
+    # context needed to write the unstructured documents
+    breaks_context = breaks.assign(
+        Trader=trader[break_trade],
+        Instrument=trades["Instrument"].to_numpy()[break_trade],
+        Counterparty=counterparty[break_trade],
+        Trade_Date=trades["Trade_Date"].to_numpy()[break_trade],
+    )
+
+    return {
+        "trades.csv": trades,
+        "positions.csv": positions,
+        "settlements.csv": settlements,
+        "breaks.csv": breaks,
+        "itsm_tickets.csv": itsm,
+        "audit_trail.csv": audits,
+        "relationships.csv": relationships,
+        "_breaks_context": breaks_context,
+    }
+
+def generate_corporate_actions(rng: np.random.Generator, offset: int, n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "CA_ID": ids("CA", 500 + offset + np.arange(n)),
+        "Instrument": pick(rng, instruments, n),
+        "CA_Type": pick(rng, ca_types, n),
+        "Effective_Date": fmt_date(rand_ts(rng, n)),
+        "Notes": "Feed update required across subledgers",
+    })
+
+def generate_changes(rng: np.random.Generator, offset: int, n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Change_ID": ids("CHG", 900 + offset + np.arange(n)),
+        "Change_Date": fmt_date(rand_ts(rng, n)),
+        "Description": pick(rng, change_descriptions, n),
+        "Impact": pick(rng, impacts, n),
+        "Related_System": pick(rng, systems, n),
+        "Status": pick(rng, change_statuses, n),
+    })
+
+def write_documents(out_dir: str, breaks_context: pd.DataFrame, n_documents: int, seed: int, ticket_count: int):
+    """Emails and chats about a sample of breaks, plus the SOP and SLA documents."""
+    text_random = random.Random(seed)
+    max_ticket = 7000 + max(ticket_count - 1, 0)
+    sample = breaks_context.sample(n=min(n_documents * 2, len(breaks_context)), replace=len(breaks_context) < n_documents * 2, random_state=seed) if len(breaks_context) else breaks_context
+
+    # Emails - multi-line realistic threads
+    email_threads = []
+    for _, b in sample.iloc[:n_documents].iterrows():
+        t0 = pd.Timestamp(b["Trade_Date"])
+        subj = f"[Action Required] Settlement Break {b['Break_ID']} for {b['Trade_ID']}"
+        body = (
+            f"From: {b['Trader']}@bank.com\nTo: gpm_ops@bank.com\nCC: staticdata@bank.com,custody@bank.com,it_support@bank.com\nDate: {t0.strftime('%Y-%m-%d %H:%M:%S')}\nSubject: {subj}\n\n"
+            f"Team,\n\nWe have a settlement failure for trade {b['Trade_ID']} ({b['Instrument']}). Reason: {b['Break_Reason']}. This affects client P&L reporting and may impact T+1 regulatory submission. Please advise corrective action and timeline.\n\nRegards,\n{b['Trader']}\n\n"
+            "-----Forwarded Message-----\n"
+            f"From: custody@custodian.com\nTo: gpm_ops@bank.com\nDate: {(t0+pd.Timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')}\nSubject: Re: {subj}\n\nCustodian: We see SSI mismatch. Provide updated instructions.\n\n"
+            f"Ops Reply: Assigned to {b['Assigned_To']}. ITSM ticket created: ITSM{text_random.randint(7000, max_ticket)}\n"
+        )
+        email_threads.append(body)
+    with open(os.path.join(out_dir,"emails.txt"), "w") as f:
+        f.write("\n\n".join(email_threads))
+
+    # Chats - short ops threads
+    chat_threads = []
+    for _, b in sample.iloc[n_documents:2 * n_documents].iterrows():
+        t0 = pd.Timestamp(b["Trade_Date"])
+        chat = (
+            f"[{(t0+pd.Timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')}] ops_analyst: Created break {b['Break_ID']} for trade {b['Trade_ID']}\n"
+            f"[{(t0+pd.Timedelta(hours=1,minutes=10)).strftime('%Y-%m-%d %H:%M:%S')}] custody_ops: Checking SSI registry for CP {b['Counterparty']}\n"
+            f"[{(t0+pd.Timedelta(hours=1,minutes=25)).strftime('%Y-%m-%d %H:%M:%S')}] it_support: Observed MQ lag; creating ticket ITSM{text_random.randint(7000, max_ticket)}\n"
+            f"[{(t0+pd.Timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')}] ops_lead: If not resolved within SLA ({b['Severity']}), escalate to Treasury\n"
+        )
+        chat_threads.append(chat)
+    with open(os.path.join(out_dir,"chats.txt"), "w") as f:
+        f.write("\n\n".join(chat_threads))
+
+    # SOP and SLA documents (text)
+    sop_text = textwrap.dedent("""
+    SOP: GPM Break Handling - Key Steps
+    1. Detection: Automated reconciliation at T+0 flags exceptions in ReconciliationEngine.
+    2. Classification: Break types include Cash_Break, Quantity_Mismatch, SSI_Issue, CA_Mismatch, Others.
+    3. Assignment: Breaks auto-route to GPM queue; critical ones assigned to GPM_Lead.
+    4. Resolution: Engage StaticData, CustodyOps, or IT (MQGateway) depending on root cause.
+    5. Escalation: SLA breaches escalate to Treasury and Compliance; ITSM tickets must include RCA.
+    """)
+    with open(os.path.join(out_dir,"sop.txt"), "w") as f:
+        f.write(sop_text)
+
+    sla_text = textwrap.dedent("""
+    SLA: GPM Breaks
+    - High severity: Resolve within 1 business hour.
+    - Medium severity: Resolve within T+1 business day.
+    - Low severity: Resolve within T+3 business days.
+    - ITSM tickets created by GPM must include Root Cause Analysis prior to closure.
+    """)
+    with open(os.path.join(out_dir,"sla.txt"), "w") as f:
+        f.write(sla_text)
+
+def generate_dataset(out_dir: str, scale: float = 1.0, seed: int = 2025, num_scenarios: int = 5,
+                     chunk_size: int = 500_000, documents: int = 10) -> Dict[str, int]:
+    """Generate the dataset into out_dir.
+
+    Args:
+        out_dir: Directory for the CSV and text files (created if needed).
+        scale: Scale factor; 1.0 is ~50 trades.
+        seed: Random seed, the same seed and arguments always produce the same files.
+        num_scenarios: Number of scenarios trades are spread across.
+        chunk_size: Trades generated (and held in memory) at a time.
+        documents: Number of emails, and of chats.
+
+    Returns:
+        Rows written per CSV file.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    scenarios = make_scenarios(num_scenarios)
+    writer = CsvAppender(out_dir)
+    offsets = {"trade": 0, "break": 0, "ticket": 0, "audit": 0}
+
+    n_trades = max(1, round(TRADES_PER_SCALE * scale))
+    documents_context = None
+    for chunk_start in range(0, n_trades, chunk_size):
+        chunk = generate_chunk(rng, scenarios, offsets, min(chunk_size, n_trades - chunk_start))
+        if documents_context is None:
+            documents_context = chunk["_breaks_context"]
+        for file_name, df in chunk.items():
+            if not file_name.startswith("_"):
+                writer.write(file_name, df)
+
+    n_cas = max(1, round(CORPORATE_ACTIONS_PER_SCALE * scale))
+    for chunk_start in range(0, n_cas, chunk_size):
+        writer.write("corporate_actions.csv", generate_corporate_actions(rng, chunk_start, min(chunk_size, n_cas - chunk_start)))
+
+    n_changes = max(1, round(CHANGES_PER_SCALE * scale))
+    for chunk_start in range(0, n_changes, chunk_size):
+        writer.write("change_tickets.csv", generate_changes(rng, chunk_start, min(chunk_size, n_changes - chunk_start)))
+
+    write_documents(out_dir, documents_context, documents, seed, offsets["ticket"])
+    return writer.rows
+
+def zip_dataset(out_dir: str, zip_path: str):
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for fname in sorted(os.listdir(out_dir)):
+            zf.write(os.path.join(out_dir, fname), arcname=fname)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the GPM PoC dataset at any scale.")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale factor, 1.0 is ~50 trades (default: 1.0)")
+    parser.add_argument("--out-dir", default="gpm_poc_compact", help="output directory (default: ./gpm_poc_compact)")
+    parser.add_argument("--seed", type=int, default=2025, help="random seed (default: 2025)")
+    parser.add_argument("--scenarios", type=int, default=5, help="number of scenarios (default: 5)")
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="trades generated per chunk (default: 500000)")
+    parser.add_argument("--documents", type=int, default=10, help="number of emails and of chats (default: 10)")
+    parser.add_argument("--zip", help="also zip the output directory into this file")
+    args = parser.parse_args()
+
+    rows = generate_dataset(args.out_dir, args.scale, args.seed, args.scenarios, args.chunk_size, args.documents)
+    for file_name, count in sorted(rows.items()):
+        print(f"{file_name:<24} {count:>12,} rows")
+
+    if args.zip:
+        zip_dataset(args.out_dir, args.zip)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# Kept so notebooks can `import tracing`: the implementation lives in agentic_kgraph.tracing.
+# Both names refer to the same module object, so state such as the driver is shared.
+import sys
+import agentic_kgraph.tracing
+
+sys.modules[__name__] = agentic_kgraph.tracing